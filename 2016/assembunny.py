@@ -0,0 +1,575 @@
+import unittest
+from collections import namedtuple
+
+from hamcrest import assert_that, is_
+
+DEFAULT_REGISTRY = lambda: {'a': 0, 'b': 0, 'c': 0, 'd': 0}
+
+NOP, CPY, CPYI, INC, DEC, JNZ, JMP, JNZV, TGL, OUT, ADD, MUL = range(12)
+
+AddLoop = namedtuple("AddLoop", "counter deltas length")
+MulLoop = namedtuple("MulLoop", "source inner outer deltas extras inner_length length")
+
+
+class Interpreter(object):
+    """Assembunny compiled to (opcode, x, y) tuples over a list of registers.
+
+    Registers are the keys of `registry`, which is written back whenever
+    `run` returns. A jnz jumps when its value is positive.
+
+    Loops made only of inc/dec and closed by a jnz on a register they
+    decrement once are replaced, at their first line, by a single ADD; such
+    a loop reloaded by a cpy inside an outer loop of the same kind becomes a
+    single MUL. The other lines stay as they are so jumping into a loop still
+    works, and `tgl` recompiles the whole program.
+
+    `executed` counts the instructions retired, fused loops included.
+    """
+
+    def __init__(self, program, registry=None, optimize=True):
+        self.registry = registry or DEFAULT_REGISTRY()
+        self.program = split(program)
+        self.optimize = optimize
+        self.line = 0
+        self.executed = 0
+        self.transmitted = []
+        self._registers = {name: i for i, name in enumerate(self.registry)}
+        self._ops = self._compile()
+
+    @property
+    def halted(self):
+        return not 0 <= self.line < len(self.program)
+
+    def run(self, until_output=False):
+        registers = [self.registry[name] for name in self._registers]
+        ops = self._ops
+        size = len(ops)
+        line = self.line
+        executed = 0
+
+        while 0 <= line < size:
+            op, x, y = ops[line]
+            executed += 1
+
+            if op == INC:
+                registers[x] += 1
+            elif op == DEC:
+                registers[x] -= 1
+            elif op == JNZ:
+                if registers[x] > 0:
+                    line += y
+                    continue
+            elif op == CPY:
+                registers[y] = registers[x]
+            elif op == CPYI:
+                registers[y] = x
+            elif op == ADD:
+                times = max(registers[x.counter], 1)
+                for register, delta in x.deltas:
+                    registers[register] += delta * times
+                registers[x.counter] -= times
+                executed += times * x.length - 1
+                line = y
+            elif op == MUL:
+                value = registers[x.source[1]] if x.source[0] else x.source[1]
+                inner = max(value, 1)
+                outer = max(registers[x.outer], 1)
+                for register, delta in x.deltas:
+                    registers[register] += delta * inner * outer
+                for register, delta in x.extras:
+                    registers[register] += delta * outer
+                registers[x.inner] = value - inner
+                registers[x.outer] -= outer
+                executed += outer * (inner * x.inner_length + x.length) - 1
+                line = y
+            elif op == JMP:
+                line += x
+                continue
+            elif op == JNZV:
+                if _read(registers, x) > 0:
+                    line += _read(registers, y)
+                    continue
+            elif op == OUT:
+                self.transmitted.append(_read(registers, x))
+                if until_output:
+                    line += 1
+                    break
+            elif op == TGL:
+                self._toggle(line + _read(registers, x))
+                ops = self._ops
+
+            line += 1
+
+        self.line = line
+        self.executed += executed
+        for name, i in self._registers.items():
+            self.registry[name] = registers[i]
+
+    def _toggle(self, target):
+        if 0 <= target < len(self.program) and self.program[target]:
+            cmd = self.program[target]
+            if len(cmd) == 3:
+                cmd[0] = "cpy" if cmd[0] == "jnz" else "jnz"
+            else:
+                cmd[0] = "dec" if cmd[0] == "inc" else "inc"
+            self._ops = self._compile()
+
+    def _compile(self):
+        ops = [self._compile_line(cmd) for cmd in self.program]
+        if self.optimize:
+            optimize(ops)
+        return ops
+
+    def _compile_line(self, cmd):
+        if not cmd:
+            return NOP, None, None
+
+        args = [self._operand(arg) for arg in cmd[1:]]
+        name = cmd[0]
+
+        if name in ("inc", "dec") and args[0][0]:
+            return (INC if name == "inc" else DEC), args[0][1], None
+        if name == "cpy" and args[1][0]:
+            source, target = args
+            return (CPY, source[1], target[1]) if source[0] else (CPYI, source[1], target[1])
+        if name == "jnz":
+            condition, offset = args
+            if not offset[0]:
+                if condition[0]:
+                    return JNZ, condition[1], offset[1]
+                if condition[1] > 0:
+                    return JMP, offset[1], None
+                return NOP, None, None
+            return JNZV, condition, offset
+        if name == "tgl":
+            return TGL, args[0], None
+        if name == "out":
+            return OUT, args[0], None
+
+        return NOP, None, None
+
+    def _operand(self, token):
+        if token in self._registers:
+            return True, self._registers[token]
+
+        return False, int(token)
+
+
+def optimize(ops):
+    """Peephole pass replacing recognizable loops in place, see Interpreter."""
+    adds = {}
+    for end, (op, counter, offset) in enumerate(ops):
+        if op == JNZ and offset < 0:
+            loop = _match_add(ops, end + offset, end, counter)
+            if loop is not None:
+                adds[end + offset] = (loop, end)
+
+    for start, (loop, end) in adds.items():
+        ops[start] = ADD, loop, end
+
+    for end, (op, outer, offset) in enumerate(ops):
+        if op == JNZ and offset < 0:
+            start = end + offset
+            if start + 1 in adds:
+                loop = _match_mul(ops, start, end, outer, *adds[start + 1])
+                if loop is not None:
+                    ops[start] = MUL, loop, end
+
+
+def _match_add(ops, start, end, counter):
+    if start < 0:
+        return None
+    deltas = _deltas(ops[start:end])
+    if deltas is None or deltas.pop(counter, None) != -1 or _touches(ops[start:end], counter) != 1:
+        return None
+
+    return AddLoop(counter, tuple(deltas.items()), end - start + 1)
+
+
+def _match_mul(ops, start, end, outer, inner_loop, inner_end):
+    op, source, inner = ops[start]
+    if op not in (CPY, CPYI) or inner != inner_loop.counter or inner == outer:
+        return None
+    source = (op == CPY, source)
+
+    extras = _deltas(ops[inner_end + 1:end])
+    if extras is None or extras.pop(outer, None) != -1 or _touches(ops[inner_end + 1:end], outer) != 1:
+        return None
+
+    deltas = dict(inner_loop.deltas)
+    read = {outer, inner} | ({source[1]} if source[0] else set())
+    if read & (deltas.keys() | extras.keys()):
+        return None
+
+    return MulLoop(source, inner, outer, inner_loop.deltas, tuple(extras.items()),
+                   inner_loop.length, 1 + (end - inner_end))
+
+
+def _deltas(ops):
+    deltas = {}
+    for op, register, _ in ops:
+        if op not in (INC, DEC):
+            return None
+        deltas[register] = deltas.get(register, 0) + (1 if op == INC else -1)
+    return deltas
+
+
+def _touches(ops, register):
+    return sum(1 for _, r, _ in ops if r == register)
+
+
+def _read(registers, operand):
+    is_register, value = operand
+    return registers[value] if is_register else value
+
+
+def split(l):
+    return [e.split() for e in l]
+
+
+class CPYTest(unittest.TestCase):
+    def test_copy_int(self):
+        interpreter = Interpreter([
+            "cpy 1 a"
+        ])
+
+        interpreter.run()
+
+        assert_that(interpreter.registry['a'], is_(1))
+
+    def test_copy_registry(self):
+        interpreter = Interpreter([
+            "cpy 2 b",
+            "cpy b c",
+        ])
+
+        interpreter.run()
+
+        assert_that(interpreter.registry['b'], is_(2))
+        assert_that(interpreter.registry['c'], is_(2))
+
+
+class IncDecTest(unittest.TestCase):
+    def test_inc(self):
+        interpreter = Interpreter([
+            "inc a",
+            "inc a"
+        ])
+
+        interpreter.run()
+
+        assert_that(interpreter.registry['a'], is_(2))
+
+    def test_dev(self):
+        interpreter = Interpreter([
+            "dec a",
+            "dec a"
+        ])
+
+        interpreter.run()
+
+        assert_that(interpreter.registry['a'], is_(-2))
+
+
+class JnzTest(unittest.TestCase):
+    def test_jump_if_true(self):
+        interpreter = Interpreter([
+            "inc a",
+            "jnz a 2",
+            "inc a",
+            "dec a"
+        ])
+
+        interpreter.run()
+
+        assert_that(interpreter.registry['a'], is_(0))
+
+    def test_dont_jump_if_0(self):
+        interpreter = Interpreter([
+            "jnz a 2",
+            "inc a"
+        ])
+
+        interpreter.run()
+
+        assert_that(interpreter.registry['a'], is_(1))
+
+    def test_jump_backwards(self):
+        interpreter = Interpreter([
+            "cpy 2 a",
+            "dec a",
+            "jnz a -1",
+        ])
+
+        interpreter.run()
+
+        assert_that(interpreter.registry['a'], is_(0))
+
+    def test_jump_past_final_line_ends(self):
+        interpreter = Interpreter([
+            "inc a",
+            "jnz a 2"
+        ])
+
+        interpreter.run()
+
+        assert_that(interpreter.registry['a'], is_(1))
+        assert_that(interpreter.halted, is_(True))
+
+    def test_can_read_int(self):
+        interpreter = Interpreter([
+            "jnz 1 2",
+            "inc a"
+        ])
+
+        interpreter.run()
+
+        assert_that(interpreter.registry['a'], is_(0))
+
+    def test_can_jump_of_var(self):
+        interpreter = Interpreter([
+            "inc a",
+            "inc a",
+            "jnz 1 a",
+            "inc a"
+        ])
+
+        interpreter.run()
+
+        assert_that(interpreter.registry['a'], is_(2))
+
+    def test_empty_lines_are_skipped(self):
+        interpreter = Interpreter([
+            "",
+            "jnz 1 2",
+            "",
+            "inc a",
+            "",
+        ])
+
+        interpreter.run()
+
+        assert_that(interpreter.registry['a'], is_(1))
+
+
+class TglTest(unittest.TestCase):
+    def test_tgl_one_args(self):
+        interpreter = Interpreter([
+            "tgl a",
+            "tgl 2",
+            "tgl 2",
+            "dec a",
+            "inc a",
+        ])
+
+        interpreter.run()
+
+        assert_that(interpreter.program, is_([l.split() for l in [
+            "inc a",
+            "tgl 2",
+            "tgl 2",
+            "inc a",
+            "dec a",
+        ]]))
+
+    def test_tgl_two_args(self):
+        interpreter = Interpreter([
+            "cpy a b",
+            "tgl -1",
+            "tgl 1",
+            "jnz 0 1",
+        ])
+
+        interpreter.run()
+
+        assert_that(interpreter.program, is_([l.split() for l in [
+            "jnz a b",
+            "tgl -1",
+            "tgl 1",
+            "cpy 0 1",
+        ]]))
+
+    def test_out_of_bound(self):
+        interpreter = Interpreter([
+            "tgl -1",
+            "tgl 1",
+        ])
+
+        interpreter.run()
+
+    def test_toggle_into_a_loop_is_optimized(self):
+        interpreter = Interpreter([
+            "cpy 1000000000 d",
+            "tgl 2",
+            "inc a",
+            "inc d",
+            "jnz d -2",
+        ])
+
+        interpreter.run()
+
+        assert_that(interpreter.registry, is_({'a': 1000000000, 'b': 0, 'c': 0, 'd': 0}))
+
+    def test_toggle_inside_a_loop_is_seen(self):
+        interpreter = Interpreter([
+            "cpy 3 c",
+            "tgl 1",
+            "inc a",
+            "dec c",
+            "jnz c -2",
+        ])
+
+        interpreter.run()
+
+        assert_that(interpreter.registry['a'], is_(-3))
+
+
+class OutTest(unittest.TestCase):
+    def test_transmits(self):
+        interpreter = Interpreter([
+            "out 1",
+            "out a",
+            "inc a",
+            "out a",
+        ])
+
+        interpreter.run()
+
+        assert_that(interpreter.transmitted, is_([1, 0, 1]))
+
+    def test_can_pause_on_output(self):
+        interpreter = Interpreter([
+            "inc a",
+            "out a",
+            "inc a",
+            "out a",
+        ])
+
+        interpreter.run(until_output=True)
+
+        assert_that(interpreter.transmitted, is_([1]))
+        assert_that(interpreter.line, is_(2))
+
+        interpreter.run(until_output=True)
+
+        assert_that(interpreter.transmitted, is_([1, 2]))
+        assert_that(interpreter.halted, is_(True))
+
+
+class OptimizationTest(unittest.TestCase):
+    MULTIPLICATION = [
+        "inc e",
+        "cpy a d",
+        "dec b",
+        "cpy b c",
+        "inc a",
+        "dec c",
+        "jnz c -2",
+        "dec d",
+        "jnz d -5",
+        "inc e",
+    ]
+
+    def test_addition(self):
+        interpreter1 = Interpreter([
+            "inc c",
+            "inc a",
+            "dec b",
+            "jnz b -2",
+            "inc c",
+        ], {'a': 1000000, 'b': 1000000, 'c': 0})
+
+        interpreter1.run()
+
+        assert_that(interpreter1.registry, is_({'a': 2000000, 'b': 0, 'c': 2}))
+
+    def test_multiplication10(self):
+        interpreter1 = Interpreter(self.MULTIPLICATION, {'a': 10, 'b': 10, 'c': 0, 'd': 0, 'e': 0})
+
+        interpreter1.run()
+
+        assert_that(interpreter1.registry, is_({'a': 100, 'b': 9, 'c': 0, 'd': 0, 'e': 2}))
+
+    def test_multiplication100(self):
+        interpreter1 = Interpreter(self.MULTIPLICATION, {'a': 100, 'b': 100, 'c': 0, 'd': 0, 'e': 0})
+
+        interpreter1.run()
+
+        assert_that(interpreter1.registry, is_({'a': 10000, 'b': 99, 'c': 0, 'd': 0, 'e': 2}))
+
+    def test_multiplication10000000(self):
+        interpreter1 = Interpreter(self.MULTIPLICATION, {'a': 10000000, 'b': 10000000, 'c': 0, 'd': 0, 'e': 0})
+
+        interpreter1.run()
+
+        assert_that(interpreter1.registry, is_({'a': 100000000000000, 'b': 9999999, 'c': 0, 'd': 0, 'e': 2}))
+
+    def test_multiplication_inverted_sub(self):
+        interpreter1 = Interpreter([
+            "inc e",
+            "cpy a d",
+            "dec b",
+            "cpy b c",
+            "dec c",
+            "inc a",
+            "jnz c -2",
+            "dec d",
+            "jnz d -5",
+            "inc e",
+        ], {'a': 10000000, 'b': 10000000, 'c': 0, 'd': 0, 'e': 0})
+
+        interpreter1.run()
+
+        assert_that(interpreter1.registry, is_({'a': 100000000000000, 'b': 9999999, 'c': 0, 'd': 0, 'e': 2}))
+
+    def test_multiplication_by_constant_with_extras(self):
+        interpreter1 = Interpreter([
+            "cpy 14 c",
+            "cpy 182 b",
+            "inc d",
+            "dec b",
+            "jnz b -2",
+            "inc a",
+            "dec c",
+            "jnz c -6",
+        ])
+
+        interpreter1.run()
+
+        assert_that(interpreter1.registry, is_({'a': 14, 'b': 0, 'c': 0, 'd': 2548}))
+
+    def test_jump_into_a_loop(self):
+        interpreter1 = Interpreter([
+            "cpy 3 c",
+            "jnz 1 2",
+            "inc a",
+            "dec c",
+            "jnz c -2",
+        ])
+
+        interpreter1.run()
+
+        assert_that(interpreter1.registry['a'], is_(2))
+
+    def test_loops_run_at_least_once(self):
+        interpreter1 = Interpreter([
+            "cpy -2 c",
+            "inc a",
+            "dec c",
+            "jnz c -2",
+        ])
+
+        interpreter1.run()
+
+        assert_that(interpreter1.registry, is_({'a': 1, 'b': 0, 'c': -3, 'd': 0}))
+
+    def test_counts_the_same_instructions_as_unoptimized(self):
+        registry = lambda: {'a': 7, 'b': 5, 'c': 0, 'd': 0, 'e': 0}
+        optimized = Interpreter(self.MULTIPLICATION, registry())
+        plain = Interpreter(self.MULTIPLICATION, registry(), optimize=False)
+
+        optimized.run()
+        plain.run()
+
+        assert_that(optimized.registry, is_(plain.registry))
+        assert_that(optimized.executed, is_(plain.executed))
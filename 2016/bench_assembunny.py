@@ -0,0 +1,55 @@
+"""Instructions per second of the assembunny engine, with and without its
+peephole optimizer, on the programs of days 12, 23 and 25.
+
+    PYTHONPATH=. python 2016/bench_assembunny.py
+
+The rate counts instructions of the source program, so a fused loop is
+credited with every inc, dec and jnz it stands for.
+"""
+from lib.benchmark import throughput
+
+import day12
+import day23
+import day25
+from assembunny import Interpreter
+
+
+def _run(source, registry, optimize):
+    def run():
+        interpreter = Interpreter(source.strip().split("\n"), dict(registry), optimize=optimize)
+        interpreter.run()
+        return interpreter.executed
+    return run
+
+
+def _transmit(optimize, candidates=200):
+    program = day25.puzzle_input.strip().split("\n")
+    expected = [0, 1] * 25
+
+    def run():
+        executed = 0
+        for a in range(candidates):
+            interpreter = Interpreter(program, {'a': a, 'b': 0, 'c': 0, 'd': 0}, optimize=optimize)
+            output = interpreter.transmitted
+            while not interpreter.halted and output == expected[:len(output)] and len(output) < len(expected):
+                interpreter.run(until_output=True)
+            executed += interpreter.executed
+        return executed
+    return run
+
+
+if __name__ == '__main__':
+    registry = lambda a=0, c=0: {'a': a, 'b': 0, 'c': c, 'd': 0}
+    cases = [
+        ("day12 part 1", day12.puzzle_input, registry(), True),
+        ("day12 part 2", day12.puzzle_input, registry(c=1), True),
+        ("day23 part 1", day23.puzzle_input, registry(a=7), True),
+        ("day23 part 2", day23.puzzle_input, registry(a=12), False),
+    ]
+    for label, source, start, plain_too in cases:
+        if plain_too:
+            throughput(f"{label} plain", _run(source, start, False), "instr")
+        throughput(f"{label} optimized", _run(source, start, True), "instr")
+
+    throughput("day25 first 200 candidates plain", _transmit(False), "instr")
+    throughput("day25 first 200 candidates optimized", _transmit(True), "instr")
@@ -0,0 +1,16 @@
+"""Time and peak memory of day 16 on the part 2 disk, with int words
+streamed into the checksum against the strings the day used to build.
+
+    PYTHONPATH=. python 2016/bench_dragon.py
+"""
+from lib.benchmark import timed
+
+from day16 import _compute_strings, compute
+
+PUZZLE = "10011111011011001"
+LENGTH = 35651584
+
+
+if __name__ == '__main__':
+    timed("int words", lambda: compute(PUZZLE, LENGTH), memory=True)
+    timed("strings", lambda: _compute_strings(PUZZLE, LENGTH), memory=True)
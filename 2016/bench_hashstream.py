@@ -0,0 +1,52 @@
+"""Hashes per second of the md5 stream behind days 5 and 14, against hashing
+salt + index from scratch one index at a time as the days used to.
+
+    PYTHONPATH=. python 2016/bench_hashstream.py
+
+Process pools only pay off with as many cores; the number of CPUs is
+printed first.
+"""
+import hashlib
+import os
+from functools import partial
+
+from lib.benchmark import throughput
+
+from day14 import triple_and_fives
+from hashstream import starting_with, stream
+
+PLAIN = 1_000_000
+STRETCHED = 2_000
+
+
+def _one_at_a_time(n, stretch):
+    def run():
+        for index in range(n):
+            digest = hashlib.md5(bytes("abc" + str(index), "UTF-8")).hexdigest()
+            for _ in range(stretch):
+                digest = hashlib.md5(bytes(digest, "UTF-8")).hexdigest()
+        return n * (stretch + 1)
+    return run
+
+
+def _stream(n, keep, stretch, workers):
+    def run():
+        for index, _ in stream("abc", keep, stretch, workers=workers):
+            if index >= n:
+                return index * (stretch + 1)
+    return run
+
+
+if __name__ == '__main__':
+    print(f"{os.cpu_count()} CPUs")
+
+    throughput("day 5, one at a time", _one_at_a_time(PLAIN, 0), "hashes")
+    for workers in (1, 2, 4, 8):
+        # one match in 256, enough to see where the stream is
+        throughput(f"day 5, {workers} workers", _stream(PLAIN, partial(starting_with, "00"), 0,
+                                                       workers), "hashes")
+
+    throughput("day 14 stretched, one at a time", _one_at_a_time(STRETCHED, 2016), "hashes")
+    for workers in (1, 2, 4, 8):
+        throughput(f"day 14 stretched, {workers} workers",
+                   _stream(STRETCHED, triple_and_fives, 2016, workers), "hashes")
@@ -0,0 +1,28 @@
+"""Day 19 at the puzzle's size: the closed forms, the next pointer
+simulations, and the list the second part used to pop from (at a
+hundredth of the size, it is quadratic).
+
+    PYTHONPATH=. python 2016/bench_josephus.py
+"""
+from lib.benchmark import timed
+
+from day19 import compute, compute2, steal_across, steal_left
+
+SIZE = 3 * 10 ** 6
+
+
+def _list_across(number):
+    elves = list(range(1, number + 1))
+    while len(elves) > 1:
+        elves.pop(len(elves) // 2)
+        elves.append(elves.pop(0))
+    return elves[0]
+
+
+if __name__ == '__main__':
+    timed("left, closed form", lambda: compute(SIZE))
+    timed("left, next pointers", lambda: steal_left(SIZE))
+    timed("across, closed form", lambda: compute2(SIZE))
+    timed("across, next pointers", lambda: steal_across(SIZE))
+    timed(f"across, list pops, n = {SIZE // 100:,}", lambda: _list_across(SIZE // 100))
+    timed(f"across, next pointers, n = {SIZE // 100:,}", lambda: steal_across(SIZE // 100))
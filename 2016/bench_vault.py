@@ -0,0 +1,52 @@
+"""Nodes expanded and md5 hashes per second of the day 17 vault searches,
+against hashing code + path from scratch with a list for a queue as the day
+used to.
+
+    PYTHONPATH=. python 2016/bench_vault.py
+
+Process pools only pay off with as many cores; the number of CPUs is
+printed first.
+"""
+import hashlib
+import os
+
+from lib import profiling
+from lib.benchmark import throughput
+
+import day17
+
+CODES = ("ihgpwlah", "kglvqrro", "ulqzkmiv", "awrkjxxr")
+
+
+def _from_scratch(code):
+    steps_to_do = [(1, 1, "")]
+    expanded = 0
+    while steps_to_do:
+        x, y, path = steps_to_do.pop(0)
+        expanded += 1
+        indicators = hashlib.md5((code + path).encode()).hexdigest()
+        for (dx, dy, direction), indicator in zip(day17.DIRECTIONS, indicators):
+            if indicator in day17.OPEN and 1 <= x + dx <= 4 and 1 <= y + dy <= 4:
+                if (x + dx, y + dy) != day17.VAULT:
+                    steps_to_do.append((x + dx, y + dy, path + direction))
+    return expanded
+
+
+def _compute2(code, workers):
+    def run():
+        profiling.enable()
+        try:
+            profiling.profiler.run(day17.compute2.__wrapped__, code, workers)
+            return profiling.profiler.counters["nodes expanded"].count
+        finally:
+            profiling.disable()
+    return run
+
+
+if __name__ == '__main__':
+    print(f"{os.cpu_count()} CPUs")
+
+    for code in CODES:
+        throughput(f"{code}, from scratch", lambda: _from_scratch(code), "hashes")
+        for workers in (1, 2, 4):
+            throughput(f"{code}, {workers} workers", _compute2(code, workers), "hashes")
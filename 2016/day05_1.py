@@ -1,21 +1,21 @@
-import hashlib
+import os
 import unittest
+from functools import partial
 from textwrap import dedent
 
 from hamcrest import assert_that, is_
 
+from hashstream import starting_with, stream
+
 PREFIX = '00000'
 
 
-def compute(door_id):
+def compute(door_id, workers=1):
     password = ""
-    index = 0
-    while len(password) < 8:
-        hash = hashlib.md5(bytes(door_id + str(index), "UTF-8")).hexdigest()
-        if hash[:5] == PREFIX:
-            password += hash[5]
-        index += 1
-    return password
+    for index, hash in stream(door_id, partial(starting_with, PREFIX), workers=workers):
+        password += hash[5]
+        if len(password) == 8:
+            return password
 
 
 class ComputeTest(unittest.TestCase):
@@ -23,4 +23,4 @@ class ComputeTest(unittest.TestCase):
         assert_that(compute("abc"), is_("18f47a30"))
 
 if __name__ == '__main__':
-    print("Result is {}".format(compute("abbhdwsy")))
+    print("Result is {}".format(compute("abbhdwsy", workers=os.cpu_count())))
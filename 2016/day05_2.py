@@ -1,23 +1,24 @@
-import hashlib
+import os
 import unittest
+from functools import partial
 from textwrap import dedent
 
 from hamcrest import assert_that, is_
 
+from hashstream import starting_with, stream
+
 PREFIX = '00000'
 
 
-def compute(door_id):
+def compute(door_id, workers=1):
     password = {'0': '', '1': '', '2': '', '3': '', '4': '', '5': '', '6': '', '7': ''}
-    index = 0
     found = 0
-    while found < 8:
-        hash = hashlib.md5(bytes(door_id + str(index), "UTF-8")).hexdigest()
-        if hash[:5] == PREFIX and hash[5] in password and password[hash[5]] == '':
+    for index, hash in stream(door_id, partial(starting_with, PREFIX), workers=workers):
+        if hash[5] in password and password[hash[5]] == '':
             password[hash[5]] = hash[6]
             found += 1
-        index += 1
-    return "".join([v for k, v in sorted(password.items(), key=lambda e: e[0])])
+            if found == 8:
+                return "".join([v for k, v in sorted(password.items(), key=lambda e: e[0])])
 
 
 class ComputeTest(unittest.TestCase):
@@ -25,4 +26,4 @@ class ComputeTest(unittest.TestCase):
         assert_that(compute("abc"), is_("05ace8e3"))
 
 if __name__ == '__main__':
-    print("Result is {}".format(compute("abbhdwsy")))
+    print("Result is {}".format(compute("abbhdwsy", workers=os.cpu_count())))
@@ -1,19 +1,18 @@
-import logging
 import re
 import sys
 import unittest
-from copy import deepcopy
-from itertools import combinations
+from functools import partial
+from itertools import chain, combinations
 from textwrap import dedent
 
-from hamcrest import assert_that, is_, has_length, is_not, greater_than, less_than
+from hamcrest import assert_that, is_, has_length, is_not
 from sortedcontainers import SortedList
 from sortedcontainers import SortedSet
 
+from lib.search import bfs
+
 UP = 1
 DOWN = -1
-MAX_MOVE_RATE_LIMITING = 900
-NEW_SEQUENCES_TO_CONSIDER = 0.5
 
 class Directive(object):
     def __init__(self, direction, microchips, generators):
@@ -36,234 +35,79 @@ DIRECTIVES = [
 ]
 
 
-def djikstra(data):
+def compute(data):
+    """Fewest moves bringing everything to the top floor, by a breadth first
+    search over `encode`d states."""
     system = System()
     system.set_up(data)
-
-    # sequences = SortedSet([Sequence(system)], key=lambda s: (len(s.moves), s.system))
-
-    floor_cleared = 0
-
-    new_steps = [Sequence([], system)]
-    known_states = []
-    while new_steps:
-        # sequences = list(sorted(filter(lambda e: not e.dead_end, new_steps), key=lambda s: s.system, reverse=True))
-        # sequences = sequences[:math.ceil(len(sequences) * NEW_SEQUENCES_TO_CONSIDER)]
-        # sequences = list(filter(lambda e: all(len(e.system.floors[i].microchips) == len(e.system.floors[i].generators) == 0 for i in range(0, floor_cleared)), new_steps))
-        sequences = new_steps[:]
-        # known_states = {}
-        new_steps = []
-        while sequences:
-            sequence = sequences.pop(0)
-            floor = sequence.system.current_floor()
-            for directive in DIRECTIVES:
-                if sequence.system.can_move(directive.direction):
-                    for variation in variations(floor, directive, sequence.system.elements_worth_moving()):
-                        new_seq = sequence.give_birth()
-
-                        if new_seq.add_move(variation):
-                            state_id = new_seq.system.state_id()
-                            # if state_id not in known_states or known_states[state_id] < len(new_seq.moves):
-                            if new_seq.system.is_winning():
-                                print("WINNING")
-                                print("WINNING at {} moves : \n{}".format(len(new_seq.moves), "\n".join(repr(m) for m in new_seq.moves)))
-                                new_seq.system.show()
-                                return len(new_seq.moves)
-                            elif new_seq.system.is_valid() and state_id not in known_states:
-                                known_states.append(state_id)
-                                print("moves={}, ks={}, seq={}".format(len(new_seq.moves), len(known_states), new_seq))
-                                new_seq.system.show()
-                                new_steps.append(new_seq)
-                            else:
-                                sequence.kill_offspring(new_seq)
-                        else:
-                            sequence.kill_offspring(new_seq)
-
-            sequence.mark_as_dead_end_if_necessary()
-            # # sequences = SortedSet(filter(lambda e: not e.dead_end, sequences), key=lambda s: (len(s.moves), s.system))
-            # sequences = list()
-        #
-        # for seq in new_steps:
-        #     all_cleared = all(len(seq.system.floors[i].microchips) == len(seq.system.floors[i].generators) == 0 for i in range(0, floor_cleared + 1))
-        #
-        #     if all_cleared:
-        #         floor_cleared += 1
-        #         known_states = {}
-
-    return "COULDN'T COMPUTE"
-
-
-def astar(data):
-    system = System()
-    system.set_up(data)
-
-    sequences = []
-
-    sequences = SortedSet()
-    sequences.add(Sequence([], system, full_sequence=sequences))
-    known_states = {}
-
-    best_sequences = []
-    while sequences:
-        sequence = sequences.pop()
-        floor = sequence.system.current_floor()
-        for directive in DIRECTIVES:
-            if sequence.system.can_move(directive.direction):
-                for variation in variations(floor, directive, sequence.system.elements_worth_moving()):
-                    new_seq = sequence.give_birth()
-
-                    if new_seq.add_move(variation):
-                        if new_seq.system.is_winning():
-                            new_seq.system.show()
-                            best_sequences.append(new_seq)
-
-                            if len(best_sequences) >= 1:
-                                for s in best_sequences:
-                                    print("WINNING at {} moves : \n{}".format(len(s.moves), "\n".join(repr(m) for m in s.moves)))
-
-                                return min([len(s.moves) for s in best_sequences])
-                        elif new_seq.system.is_valid():
-                            state_id = new_seq.system.state_id()
-                            if state_id not in known_states or len(new_seq.moves) < known_states[state_id]:
-                                known_states[state_id] = len(new_seq.moves)
-                                print("moves={}, seqs={}, ks={}, rating={}, seq={}".format(len(new_seq.moves), len(sequences), len(known_states), sequence.rating(), new_seq))
-                                # new_seq.system.show()
-                                sequences.add(new_seq)
-                            else:
-                                sequence.kill_offspring(new_seq)
-                        else:
-                            sequence.kill_offspring(new_seq)
-                    else:
-                        sequence.kill_offspring(new_seq)
-
-        seq_list = list(sequences[::-1])
-        sequence.mark_as_dead_end_if_necessary()
-
-    return min([len(s.moves) for s in best_sequences])
-
-class Error(Exception):
-    pass
-
-def play(data):
-    sequence = Sequence([], System(), full_sequence=[])
-    sequence.system.set_up(data)
-
-    while True:
-        try:
-            available_microchips = [e for e in sequence.system.distinct_elements if e in sequence.system.floors[sequence.system.elevator].microchips]
-            available_generators = [e for e in sequence.system.distinct_elements if e in sequence.system.floors[sequence.system.elevator].generators]
-            print("Controls:")
-            print(" - Microchips : {}".format(", ".join("({}) {}".format(i + 1, sequence.system.distinct_elements[i])
-                                                        for i in range(0, len(sequence.system.distinct_elements)) if sequence.system.distinct_elements[i] in available_microchips)))
-            print(" - Generators : {}".format(", ".join("({}) {}".format(chr(ord('A') + i), sequence.system.distinct_elements[i])
-                                                        for i in range(0, len(sequence.system.distinct_elements)) if sequence.system.distinct_elements[i] in available_generators)))
-
-            print()
-            sequence.system.show()
-            print()
-
-            command = input("Move #{} :: (u/d # [#]) / UNDO: ".format(len(sequence.moves)))
-
-            if command == "UNDO":
-                sequence = sequence.parent
-            else:
-                match = re.match("(u|d) (.)\s?(.)?", command)
-                if match:
-                    matched = match.groups()
-                    move = dict(
-                        direction={"u": UP, "d": DOWN}[matched[0]],
-                        microchips=[],
-                        generators=[],
-                    )
-                    for i in range(1, len(matched)):
-                        if matched[i] is not None:
-                            try:
-                                microchip = sequence.system.distinct_elements[int(matched[i]) - 1]
-                                if microchip not in available_microchips:
-                                    raise Error("microchip not on this floor : {}".format(microchip))
-                                else:
-                                    move["microchips"].append(microchip)
-                            except ValueError:
-                                try:
-                                    generator = sequence.system.distinct_elements[ord(matched[i]) - ord("A")]
-                                    if generator not in available_generators:
-                                        raise Error("generator not on this floor : {}".format(generator))
-                                    else:
-                                        move["generators"].append(generator)
-                                except IndexError:
-                                    raise Error("Unknown generator : {}".format(matched[i]))
-
-                    sequence = sequence.give_birth()
-                    sequence.add_move(move)
-                    if sequence.system.is_winning():
-                        print("Bravo!")
-                        return
-
-                else:
-                    raise Error("Wat?")
-        except Error as e:
-            print()
-            print(e)
-            print()
-
-class Sequence(object):
-    def __init__(self, id, system, moves=None, known_states=None, full_sequence=None):
-        self.id = id
-        self.system = system
-        self.moves = moves or []
-        self.known_states = known_states or []
-        self.parent = None
-        self.children = []
-        self.dead_end = False
-        self.full_sequence = full_sequence
-
-    def add_move(self, move):
-        self.system.move(**move)
-        state_id = self.system.state_id()
-        if state_id in self.known_states:
-            return False
-        self.moves.append(move)
-        self.known_states.append(state_id)
+    if len(system.floors) > 4:
+        raise ValueError("States are encoded with 2 bits per floor, at most 4 floors")
+
+    top = len(system.floors) - 1
+    start = encode(system.elevator, items_of(system))
+    goal = encode(top, [top] * 2 * len(system.distinct_elements))
+
+    return bfs(start, partial(next_states, top, len(system.distinct_elements)),
+               targets=[goal]).distance(goal)
+
+
+def items_of(system):
+    """Floor of every item, as [chip, generator, chip, generator, ...] by
+    element."""
+    items = []
+    for element in system.distinct_elements:
+        items.append(next(f.number for f in system.floors if element in f.microchips))
+        items.append(next(f.number for f in system.floors if element in f.generators))
+    return items
+
+
+def encode(elevator, items):
+    """The state as an int: 4 bits per (chip floor, generator floor) pair
+    then 2 bits for the elevator.
+
+    The pairs are sorted first: which element is which does not matter, only
+    where each chip and its generator are, so all the states that only
+    differ by swapping elements share one code."""
+    state = 0
+    for chip, generator in sorted(zip(items[::2], items[1::2])):
+        state = state << 4 | chip << 2 | generator
+    return state << 2 | elevator
+
+
+def decode(state, pairs):
+    """(elevator, items) of an `encode`d state of `pairs` elements."""
+    elevator = state & 3
+    items = []
+    for shift in range(4 * pairs - 2, 0, -4):
+        items.append(state >> shift + 2 & 3)
+        items.append(state >> shift & 3)
+    return elevator, items
+
+
+def next_states(top, pairs, state):
+    elevator, items = decode(state, pairs)
+    here = [i for i, floor in enumerate(items) if floor == elevator]
+    lowest = min(items)
+
+    for to in (elevator + 1, elevator - 1):
+        # going down with nothing left under is never worth it
+        if not lowest <= to <= top:
+            continue
+        for moved in chain(combinations(here, 2), combinations(here, 1)):
+            new = items[:]
+            for i in moved:
+                new[i] = to
+            if is_safe(new, elevator) and is_safe(new, to):
+                yield encode(to, new)
+
+
+def is_safe(items, floor):
+    """No chip on ``floor`` is with another generator without its own."""
+    if floor not in items[1::2]:
         return True
+    return all(generator == floor for chip, generator in zip(items[::2], items[1::2])
+               if chip == floor)
 
-    def mark_as_dead_end_if_necessary(self):
-        if all(c.dead_end for c in self.children):
-            self.dead_end = True
-            if self.parent:
-                self.parent.mark_as_dead_end_if_necessary()
-
-    def give_birth(self):
-        offspring = Sequence(self.id + [len(self.children)], self.system.copy(), deepcopy(self.moves), deepcopy(self.known_states), full_sequence=self.full_sequence)
-        offspring.parent = self
-        self.children.append(offspring)
-
-        return offspring
-
-    def kill_offspring(self, offspring):
-        self.children.remove(offspring)
-
-    def rating(self):
-        return (len(self.system.floors[-1].generators) + len(self.system.floors[-1].microchips)) * 2 - len(self.moves)
-
-    # def rating(self):
-    #     total = 100
-    #     for i in range(0, len(self.system.floors)):
-    #         floor = self.system.floors[i]
-    #         score = len(floor.microchips) + len(floor.generators)
-    #         if self.system.elevator <= i:
-    #             score += len(set(floor.microchips).intersection(floor.generators)) * 2
-    #         floor_total = (2 ** (i + 1)) * score * 2
-    #         logging.info("Floor={} elevator={} score={}, total={}".format(i, self.system.elevator, score, floor_total))
-    #         total += floor_total
-    #
-    #     less_moves_modifier = (len(self.full_sequence[-1].moves) if len(self.full_sequence) > 1 else 0) - len(self.moves)
-    #     return total - 2 ** self.system.elevator + less_moves_modifier * 5
-
-    def __lt__(self, other):
-        return self.rating() < other.rating()
-
-    def __str__(self):
-        return "{} : {}".format("-".join(str(e) for e in self.id), self.rating())
 
 class System(object):
     def __init__(self, distinct_elements=None, elevator=0, floors=None):
@@ -329,22 +173,6 @@ class System(object):
     def __str__(self):
         return "{}-{}".format(self.elevator, "-".join(str(f) for f in self.floors))
 
-    def show(self):
-        for i in range(len(self.floors) -1, -1, -1):
-            cols = []
-            for e in self.distinct_elements:
-                cols.append("M:{}".format(e[:2]) if e in self.floors[i].microchips else " -- ")
-                cols.append("G:{}".format(e[:2]) if e in self.floors[i].generators else " -- ")
-
-            print("F{} {} {}".format(
-                i + 1,
-                "E" if self.elevator == i else " ",
-                " ".join(cols)
-            ))
-
-    def copy(self):
-        return deepcopy(self)
-
     def __lt__(self, other):
         for i in range(len(self.floors) - 1, -1, -1):
             if self.floors[i].count_elements() < other.floors[i].count_elements():
@@ -621,29 +449,6 @@ class SystemCanMove(unittest.TestCase):
 
         assert_that(system.can_move(DOWN), is_(False))
 
-class SystemCanCopy(unittest.TestCase):
-    def test_a_copy_is_100_percent_independent(self):
-        system = System(distinct_elements=["a"], elevator=0, floors=[
-            Floor(0, microchips=["a"], generators=["a"]),
-        ])
-
-        copy = system.copy()
-
-        copy.distinct_elements.append("b")
-        copy.elevator = 1
-        copy.floors.append(Floor(1, microchips=["b"], generators=["b"]))
-        copy.floors[0].number = 24
-        copy.floors[0].microchips.add("c")
-        copy.floors[0].generators.add("c")
-
-        assert_that(system.distinct_elements, is_(["a"]))
-        assert_that(system.elevator, is_(0))
-        assert_that(system.floors, has_length(1))
-        assert_that(system.floors[0].number, is_(0))
-        assert_that(system.floors[0].microchips, is_(["a"]))
-        assert_that(system.floors[0].generators, is_(["a"]))
-
-
 class SystemCanBeComparedTest(unittest.TestCase):
     def test_sorting_a_list_of_systems(self):
         winning = System(distinct_elements=["a", "b"], elevator=1, floors=[
@@ -698,129 +503,6 @@ class SystemCanBeComparedTest(unittest.TestCase):
         assert_that(myset, has_length(1))
 
 
-class SequenceWinningRating(unittest.TestCase):
-    def test_higher_floor_is_better(self):
-        sequence_a = Sequence([0], System(distinct_elements=["a", "b", "c"], elevator=1, floors=[
-            Floor(0, microchips=[], generators=[]),
-            Floor(1, microchips=["c"], generators=["c"]),
-            Floor(2, microchips=["a", "b"], generators=["a", "b"]),
-        ]), moves=[])
-
-        sequence_b = Sequence([0], System(distinct_elements=["a", "b", "c"], elevator=1, floors=[
-            Floor(0, microchips=["c"], generators=["c"]),
-            Floor(1, microchips=[], generators=[]),
-            Floor(2, microchips=["a", "b"], generators=["a", "b"]),
-        ]), moves=[])
-
-        assert_that(sequence_a.rating(), greater_than(sequence_b.rating()))
-
-    def test_less_moves_is_better(self):
-        sequence_a = Sequence([0], System(distinct_elements=["a", "b", "c"], elevator=1, floors=[
-            Floor(0, microchips=[], generators=[]),
-            Floor(1, microchips=["c"], generators=["b", "c"]),
-            Floor(2, microchips=["a", "b"], generators=["a"]),
-        ]), moves=["one", "one"])
-
-        sequence_b = Sequence([0], System(distinct_elements=["a", "b", "c"], elevator=1, floors=[
-            Floor(0, microchips=[], generators=[]),
-            Floor(1, microchips=["a", "c"], generators=["c"]),
-            Floor(2, microchips=["b"], generators=["a", "b"]),
-        ]), moves=["one"])
-
-        assert_that(sequence_a.rating(), less_than(sequence_b.rating()))
-
-    def test_pairs_up_are_better(self):
-        sequence_a = Sequence([0], System(distinct_elements=["a", "b", "c"], elevator=1, floors=[
-            Floor(0, microchips=[], generators=[]),
-            Floor(1, microchips=["a", "c"], generators=["b", "c"]),
-            Floor(2, microchips=["b"], generators=["a"]),
-        ]), moves=["one", "one"])
-
-        sequence_b = Sequence([0], System(distinct_elements=["a", "b", "c"], elevator=1, floors=[
-            Floor(0, microchips=[], generators=[]),
-            Floor(1, microchips=["b", "c"], generators=["b", "c"]),
-            Floor(2, microchips=["a"], generators=["a"]),
-        ]), moves=["one", "one"])
-
-        assert_that(sequence_a.rating(), less_than(sequence_b.rating()))
-
-    def test_pairs_on_a_floor_is_better(self):
-        sequence_a = Sequence([0], System(distinct_elements=["a", "b", "c"], elevator=1, floors=[
-            Floor(0, microchips=[], generators=[]),
-            Floor(1, microchips=["b", "c"], generators=[]),
-            Floor(2, microchips=["a"], generators=["a", "b", "c"]),
-        ]), moves=["one", "one"])
-
-        sequence_b = Sequence([0], System(distinct_elements=["a", "b", "c"], elevator=1, floors=[
-            Floor(0, microchips=[], generators=[]),
-            Floor(1, microchips=["c"], generators=["c"]),
-            Floor(2, microchips=["a", "b"], generators=["a", "b"]),
-        ]), moves=["one", "one"])
-
-        assert_that(sequence_a.rating(), less_than(sequence_b.rating()))
-
-    def test_pairs_on_a_floor_is_better2(self):
-        sequence_a = Sequence([0], System(distinct_elements=["co", "cu", "pl", "pr", "ru"], elevator=1, floors=[
-            Floor(0, microchips=[], generators=[]),
-            Floor(1, microchips=["co", "cu"], generators=["co", "cu", "pl", "pr", "ru"]),
-            Floor(2, microchips=["pl", "pr", "ru"], generators=[]),
-            Floor(3, microchips=[], generators=[]),
-        ]), moves=["1", "2", "3"])
-
-        sequence_b = Sequence([0], System(distinct_elements=["co", "cu", "pl", "pr", "ru"], elevator=2, floors=[
-            Floor(0, microchips=[], generators=[]),
-            Floor(1, microchips=[], generators=["co", "cu", "pl", "pr", "ru"]),
-            Floor(2, microchips=["pl", "pr", "ru"], generators=[]),
-            Floor(3, microchips=["co", "cu"], generators=[]),
-        ]), moves=["1", "2", "3"])
-
-        assert_that(sequence_a.rating(), less_than(sequence_b.rating()))
-
-    def test_lower_elevator_is_better_than_less_moves(self):
-        sequence_a = Sequence([0], System(distinct_elements=["co", "cu", "pl", "pr", "ru"], elevator=3, floors=[
-            Floor(0, microchips=[], generators=[]),
-            Floor(1, microchips=[], generators=["co", "cu", "pl", "pr", "ru"]),
-            Floor(2, microchips=["cu", "pr", "ru"], generators=[]),
-            Floor(3, microchips=["co", "pl"], generators=[]),
-        ]), moves=["1", "2", "3", "4", "5"])
-        sequence_b = Sequence([0], System(distinct_elements=["co", "cu", "pl", "pr", "ru"], elevator=2, floors=[
-            Floor(0, microchips=[], generators=[]),
-            Floor(1, microchips=[], generators=["co", "cu", "pl", "pr", "ru"]),
-            Floor(2, microchips=["cu", "pr", "ru"], generators=[]),
-            Floor(3, microchips=["co", "pl"], generators=[]),
-        ]), moves=["1", "2", "3", "4", "5", "6"])
-        assert_that(sequence_a.rating(), less_than(sequence_b.rating()))
-
-    def test_unknown(self):
-        sequence_a = Sequence([0], System(distinct_elements=["co", "cu", "pl", "pr", "ru"], elevator=3, floors=[
-            Floor(0, microchips=[], generators=[]),
-            Floor(1, microchips=[], generators=["co", "cu", "pl", "pr", "ru"]),
-            Floor(2, microchips=["ru"], generators=[]),
-            Floor(3, microchips=["co", "cu", "pl", "pr"], generators=[]),
-        ]), moves=list(range(0, 7)))
-        sequence_b = Sequence([0], System(distinct_elements=["co", "cu", "pl", "pr", "ru"], elevator=1, floors=[
-            Floor(0, microchips=[], generators=[]),
-            Floor(1, microchips=["cu", "pr"], generators=["co", "cu", "pl", "pr", "ru"]),
-            Floor(2, microchips=["ru"], generators=[]),
-            Floor(3, microchips=["co", "pl"], generators=[]),
-        ]), moves=list(range(0, 7)))
-        assert_that(sequence_a.rating(), less_than(sequence_b.rating()))
-
-    def test_unknown2(self):
-        sequence_a = Sequence([0], System(distinct_elements=["co", "cu", "pl", "pr", "ru"], elevator=1, floors=[
-            Floor(0, microchips=[], generators=[]),
-            Floor(1, microchips=["co", "cu"], generators=["co", "cu", "pl", "pr", "ru"]),
-            Floor(2, microchips=["pl", "pr", "ru"], generators=[]),
-            Floor(3, microchips=[], generators=[]),
-        ]), moves=list(range(0, 3)))
-        sequence_b = Sequence([0], System(distinct_elements=["co", "cu", "pl", "pr", "ru"], elevator=3, floors=[
-            Floor(0, microchips=[], generators=[]),
-            Floor(1, microchips=[], generators=["co", "cu", "pl", "pr", "ru"]),
-            Floor(2, microchips=["pl", "pr", "ru"], generators=[]),
-            Floor(3, microchips=["co", "cu"], generators=[]),
-        ]), moves=list(range(0, 3)))
-        assert_that(sequence_a.rating(), less_than(sequence_b.rating()))
-
 class Variants(unittest.TestCase):
     def test_all_variants_directives_for_0_items(self):
         floor = Floor(0, microchips=[], generators=[])
@@ -966,39 +648,63 @@ class Invert(unittest.TestCase):
         assert_that(variation, is_(inverted))
 
 
-class DjikstraTest(unittest.TestCase):
-    def setUp(self):
-        self.method = djikstra
-
+class ComputeTest(unittest.TestCase):
     def test_very_simple(self):
-        result = self.method(dedent("""
+        result = compute(dedent("""
             The first floor contains a hydrogen-compatible microchip and a hydrogen generator.
             The second floor contains nothing relevant."""))
         assert_that(result, is_(1))
+
     def test_2_floors(self):
-        result = self.method(dedent("""
+        result = compute(dedent("""
             The first floor contains a hydrogen-compatible microchip and a hydrogen generator.
             The second floor contains nothing relevant.
             The third floor contains nothing relevant."""))
         assert_that(result, is_(2))
+
     def test_official(self):
-        result = self.method(dedent("""
+        result = compute(dedent("""
             The first floor contains a hydrogen-compatible microchip and a lithium-compatible microchip.
             The second floor contains a hydrogen generator.
             The third floor contains a lithium generator.
             The fourth floor contains nothing relevant."""))
         assert_that(result, is_(11))
 
+    def test_puzzle(self):
+        result = compute(dedent("""
+            The first floor contains a promethium generator and a promethium-compatible microchip.
+            The second floor contains a cobalt generator, a curium generator, a ruthenium generator, and a plutonium generator.
+            The third floor contains a cobalt-compatible microchip, a curium-compatible microchip, a ruthenium-compatible microchip, and a plutonium-compatible microchip.
+            The fourth floor contains nothing relevant."""))
+        assert_that(result, is_(33))
+
+    def test_puzzle2(self):
+        result = compute(dedent("""
+            The first floor contains a promethium generator, a promethium-compatible microchip, a elerium generator, a elerium-compatible microchip, a dilithium generator, and a dilithium-compatible microchip.
+            The second floor contains a cobalt generator, a curium generator, a ruthenium generator, and a plutonium generator.
+            The third floor contains a cobalt-compatible microchip, a curium-compatible microchip, a ruthenium-compatible microchip, and a plutonium-compatible microchip.
+            The fourth floor contains nothing relevant."""))
+        assert_that(result, is_(57))
 
-class AstarTest(DjikstraTest):
-    def setUp(self):
-        self.method = astar
 
+class EncodingTest(unittest.TestCase):
+    def test_decodes_sorted_pairs(self):
+        assert_that(decode(encode(2, [3, 1, 0, 2, 1, 1]), 3), is_((2, [0, 2, 1, 1, 3, 1])))
 
+    def test_swapping_elements_is_the_same_state(self):
+        assert_that(encode(1, [0, 1, 2, 3]), is_(encode(1, [2, 3, 0, 1])))
+        assert_that(encode(1, [0, 1, 2, 3]), is_not(encode(1, [1, 0, 2, 3])))
 
-if __name__ == '__main__':
-    compute = astar
+    def test_next_states_are_safe(self):
+        # hydrogen chip and generator on the first floor, lithium chip on the
+        # second: taking the hydrogen generator up would fry the lithium chip
+        states = [decode(s, 2) for s in next_states(3, 2, encode(0, [0, 0, 1, 2]))]
 
+        assert_that(states, is_([(1, [1, 0, 1, 2])]))
+
+
+
+if __name__ == '__main__':
     if len(sys.argv) < 2 or sys.argv[1] == "1":
         print("Result is {}".format(compute(dedent("""
             The first floor contains a promethium generator and a promethium-compatible microchip.
@@ -1,42 +1,17 @@
 import sys
 import unittest
-from copy import deepcopy
 
 from hamcrest import assert_that, is_
-from pypaths import astar
 
+from lib.search import bfs
 
-def compute_length(data, dest=(31, 39)):
-    finder = astar.pathfinder(neighbors=CubicleMap(data))  # Calculate the list of neighbors for a given node
-
-    length, path = finder((1, 1), dest)
 
-    return length
+def compute_length(data, dest=(31, 39)):
+    return bfs((1, 1), CubicleMap(data), targets=[dest]).distance(dest)
 
 
 def compute_distinct_locs(data, max_steps=50):
-    cubicle_map = CubicleMap(data)
-
-    start = (1, 1)
-    paths = [[start]]
-    seen = {start: 0}
-
-    while paths:
-        current_path = paths.pop(0)
-        for neighbor in cubicle_map(current_path[-1]):
-            new_path = deepcopy(current_path)
-            new_path.append(neighbor)
-            if neighbor in seen and len(new_path) >= seen[neighbor]:
-                continue
-
-            seen[neighbor] = len(new_path)
-
-            if len(new_path) == max_steps + 1:
-                continue
-
-            paths.append(new_path)
-
-    return len(seen)
+    return len(bfs((1, 1), CubicleMap(data), limit=max_steps).distances)
 
 
 class CubicleMap(object):
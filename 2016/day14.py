@@ -1,10 +1,18 @@
 import hashlib
+import os
 import re
 import sys
 import unittest
+from collections import deque
+from itertools import islice
 
 from hamcrest import assert_that, is_, contains_string, starts_with
 
+from hashstream import stream
+
+TRIPLE = re.compile(r"(.)\1\1")
+FIVES = re.compile(r"(.)\1{4}")
+
 
 def simple_hash(input):
     return hashlib.md5(bytes(input, "UTF-8")).hexdigest()
@@ -18,46 +26,59 @@ def stretched_hash(input):
     return result
 
 
-def compute(salt, hashing=simple_hash):
-    pending_keys = []
-    confirmed_keys = []
+def compute(salt, stretch=0, workers=1):
+    return next(islice(keys(salt, stretch, workers), 63, None))
+
+
+def keys(salt, stretch=0, workers=1, horizon=1000):
+    """Indexes of the keys, in order.
 
-    index = 0
-    while len(confirmed_keys) < 64:
-        hash = hashing(salt + str(index))
+    Only hashes with a triple or a five of a kind come out of the stream.
+    A triple waits in the window until a five of its character confirms it
+    or the stream goes more than `horizon` indexes past it, so keys come out
+    once everything that could confirm the ones before them was seen.
+    """
+    window = deque()
+    for index, (triple, fives) in stream(salt, triple_and_fives, stretch, workers=workers,
+                                             depends=(get_triple, get_fives, TRIPLE, FIVES)):
+        while window and index - window[0].start_index > horizon:
+            key = window.popleft()
+            if key.confirmed:
+                yield key.start_index
 
-        fives = get_fives(hash)
         if fives:
-            for key in pending_keys[:]:
-                if index - key.start_index > 1000:
-                    pending_keys.remove(key)
-                elif key.character in fives:
-                    pending_keys.remove(key)
-                    confirmed_keys.append(key)
-
-        triple = get_triple(hash)
+            for key in window:
+                if key.character in fives:
+                    key.confirmed = True
+
         if triple:
-            pending_keys.append(Key(index, triple))
+            window.append(Key(index, triple))
+
 
-        index += 1
+def triple_and_fives(hash):
+    # a five of a kind is a triple too
+    triple = get_triple(hash)
+    if triple:
+        return triple, get_fives(hash)
+    return None
 
-    return confirmed_keys[63].start_index
 
 class Key(object):
     def __init__(self, start_index, character):
         self.start_index = start_index
         self.character = character
+        self.confirmed = False
 
 
 def get_triple(input):
-    match = re.match(".*?(.)\\1\\1.*", input)
+    match = TRIPLE.search(input)
     if match:
         return match.group(1)
     return None
 
 
 def get_fives(input):
-    return list(set(re.findall("(.)\\1\\1\\1\\1", input)))
+    return list(set(FIVES.findall(input)))
 
 
 class GetTripleTest(unittest.TestCase):
@@ -117,15 +138,18 @@ class ComputeTest(unittest.TestCase):
         assert_that(compute("abc"), is_(22728))
 
     def test_official2(self):
-        assert_that(compute("abc", hashing=stretched_hash), is_(22551))
+        assert_that(compute("abc", stretch=2016), is_(22551))
+
+    def test_workers(self):
+        assert_that(compute("abc", workers=2), is_(22728))
 
 
 if __name__ == '__main__':
     puzzle_input = "jlmsuwbz"
 
     if sys.argv[1] == "1":
-        result = compute(puzzle_input)
+        result = compute(puzzle_input, workers=os.cpu_count())
     else:
-        result = compute(puzzle_input, hashing=stretched_hash)
+        result = compute(puzzle_input, stretch=2016, workers=os.cpu_count())
 
     print("Result is {}".format(result))
@@ -1,13 +1,79 @@
-import hashlib
-import re
 import sys
 import unittest
-from textwrap import dedent
 
 from hamcrest import assert_that, is_, contains_string, starts_with
 
 
 def compute(initial, length):
+    return checksum_words(dragon_words(initial, length), length)
+
+
+def dragon_words(initial, length):
+    """The first `length` bits of the disk as (bits, size) int words, most
+    significant bit first, without ever holding the whole disk.
+
+    The disk is `initial` and its reversed complement taking turns, each
+    followed by one bit of the dragon curve: the n-th is 1 when the odd part
+    of n is 3 modulo 4. A word is two turns and their dragon bits.
+    """
+    size = len(initial)
+    forward = int(initial, 2)
+    backward = int(initial[::-1], 2) ^ ((1 << size) - 1)
+    word_size = 2 * size + 2
+
+    produced = 0
+    n = 1
+    while produced < length:
+        # n is odd, its own odd part
+        word = (((forward << 1 | (n >> 1) & 1) << size | backward) << 1) | dragon_bit(n + 1)
+        if produced + word_size > length:
+            cut = produced + word_size - length
+            yield word >> cut, word_size - cut
+            return
+        yield word, word_size
+        produced += word_size
+        n += 2
+
+
+def dragon_bit(n):
+    odd = n >> ((n & -n).bit_length() - 1)
+    return (odd >> 1) & 1
+
+
+def checksum_words(words, length):
+    """The final checksum of `length` bits coming as (bits, size) words.
+
+    Checksumming until the length is odd XNOR-folds blocks of the largest
+    power of two dividing `length`, so each character is 1 when its block
+    has an even number of ones, counted a word at a time.
+    """
+    block = length & -length
+    result = []
+    ones = 0
+    filled = 0
+    for bits, size in words:
+        while filled + size >= block:
+            rest = size - (block - filled)
+            ones += (bits >> rest).bit_count()
+            result.append("0" if ones & 1 else "1")
+            bits &= (1 << rest) - 1
+            size = rest
+            ones = filled = 0
+        ones += bits.bit_count()
+        filled += size
+
+    return "".join(result)
+
+
+def generate(input):
+    return input + "0" + "".join(reversed(["1" if b == "0" else "0" for b in input]))
+
+
+def checksum(input):
+    return "".join("1" if input[i] == input[i + 1] else "0" for i in range(0, len(input), 2))
+
+
+def _compute_strings(initial, length):
     data = initial
     while len(data) < length:
         data = generate(data)
@@ -20,15 +86,6 @@ def compute(initial, length):
     return result
 
 
-def generate(input):
-    return input + "0" + "".join(reversed(["1" if b == "0" else "0" for b in input]))
-
-
-def checksum(input):
-    return "".join("1" if input[i] == input[i + 1] else "0" for i in range(0, len(input), 2))
-
-
-
 class GenerateDataTest(unittest.TestCase):
     def test_generate(self):
         assert_that(generate("1"), is_("100"))
@@ -43,10 +100,37 @@ class ChecksumTest(unittest.TestCase):
         assert_that(checksum("110101"), is_("100"))
 
 
+class DragonWordsTest(unittest.TestCase):
+    def test_same_bits_as_the_strings(self):
+        data = "10000"
+        while len(data) < 1000:
+            data = generate(data)
+
+        for length in (1, 11, 12, 13, 20, 999):
+            bits = "".join(format(word, "0{}b".format(size))
+                           for word, size in dragon_words("10000", length))
+            assert_that(bits, is_(data[:length]))
+
+    def test_dragon_bits(self):
+        assert_that([dragon_bit(n) for n in range(1, 16)],
+                    is_([0, 0, 1, 0, 0, 1, 1, 0, 0, 0, 1, 1, 0, 1, 1]))
+
+
+class ChecksumWordsTest(unittest.TestCase):
+    def test_split_words(self):
+        words = [(0b11, 2), (0b0010, 4), (0b110100, 6)]
+        assert_that(checksum_words(words, 12), is_("100"))
+
+
 class ZComputeTest(unittest.TestCase):
     def test_official(self):
         assert_that(compute("10000", length=20), is_("01100"))
 
+    def test_same_as_the_strings(self):
+        for initial, length in (("10000", 20), ("1", 272), ("10011111011011001", 272),
+                                ("10011111011011001", 17 * 2 ** 12)):
+            assert_that(compute(initial, length), is_(_compute_strings(initial, length)))
+
 
 if __name__ == '__main__':
     puzzle_input = "10011111011011001"
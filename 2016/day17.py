@@ -1,59 +1,125 @@
 import hashlib
 import sys
 import unittest
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 
 from hamcrest import assert_that, is_
 
+from lib.profiling import counter, profiled
 
+VAULT = (4, 4)
+DIRECTIONS = ((0, -1, "U"), (0, 1, "D"), (-1, 0, "L"), (1, 0, "R"))
+OPEN = frozenset("bcdef")
+
+
+@profiled
 def compute(input):
+    nodes = counter("nodes expanded")
     passcode = Passcode(input)
-    start = (1, 1, "")
-    steps_to_do = [start]
+    steps_to_do = deque([passcode.start()])
+    expanded = 0
+
+    try:
+        while steps_to_do:
+            expanded += 1
+            for step in passcode.open_doors(*steps_to_do.popleft()):
+                if (step[0], step[1]) == VAULT:
+                    return step[2]
+
+                steps_to_do.append(step)
+    finally:
+        nodes.add(expanded)
 
-    while steps_to_do:
-        current_path = steps_to_do.pop(0)
-        for step in passcode.doors(current_path):
-            if (step[0], step[1]) == (4, 4):
-                return step[2]
 
-            steps_to_do.append(step)
+@profiled
+def compute2(input, workers=1):
+    """Depth first, every path being tried anyway. With more than one worker,
+    the first levels are expanded here until there are a few branches per
+    worker, and each branch is searched in its own process.
 
-def compute2(input):
+    Every step expanded is one md5, so with AOC_PROFILE set the rate of
+    "nodes expanded" is the hashes per second."""
+    nodes = counter("nodes expanded")
     passcode = Passcode(input)
-    start = (1, 1, "")
-    steps_to_do = [start]
-    longest_path = None
-
-    while steps_to_do:
-        current_path = steps_to_do.pop(0)
-        for step in passcode.doors(current_path):
-            if (step[0], step[1]) == (4, 4):
-                if longest_path is None or len(step[2]) > len(longest_path[2]):
-                    longest_path = step
-            else:
-                steps_to_do.append(step)
+    if workers == 1:
+        longest, expanded = passcode.longest(passcode.start())
+    else:
+        longest, expanded, branches = passcode.branches(workers * 4)
+        if branches:
+            with ProcessPoolExecutor(workers) as pool:
+                for branch_longest, branch_expanded in pool.map(
+                        _longest, repeat(input, len(branches)),
+                        *zip(*[step[:3] for step in branches])):
+                    longest = max(longest, branch_longest)
+                    expanded += branch_expanded
+
+    nodes.add(expanded)
+    return longest
+
+
+def _longest(code, x, y, path):
+    passcode = Passcode(code)
+    return passcode.longest((x, y, path, passcode.hasher(path)))
 
-    return len(longest_path[2])
 
 class Passcode(object):
+    """Steps are (x, y, path, hasher), the hasher having seen the code and
+    the path: the hash of a step is a copy of the one of the step before
+    it, updated with one letter."""
+
     def __init__(self, code):
         self.code = code
+        self.base = hashlib.md5(code.encode())
 
-    def doors(self, pos):
-        possible_doors = [
-            (pos[0], pos[1] - 1, "U", 0),
-            (pos[0], pos[1] + 1, "D", 1),
-            (pos[0] - 1, pos[1], "L", 2),
-            (pos[0] + 1, pos[1], "R", 3)
-        ]
-
-        indicators = hashlib.md5(bytes(self.code + pos[2], "UTF-8")).hexdigest()[:4]
+    def hasher(self, path):
+        h = self.base.copy()
+        h.update(path.encode())
+        return h
 
-        return [(d[0], d[1], pos[2] + d[2]) for d in possible_doors
-                if 1 <= d[0] <= 4 and 1 <= d[1] <= 4 and self._is_open(indicators[d[3]])]
+    def start(self):
+        return 1, 1, "", self.base.copy()
 
-    def _is_open(self, indicator):
-        return int(indicator, 16) > 10
+    def doors(self, pos):
+        return [step[:3] for step in self.open_doors(*pos, self.hasher(pos[2]))]
+
+    def open_doors(self, x, y, path, hasher):
+        indicators = hasher.hexdigest()
+        for (dx, dy, direction), indicator in zip(DIRECTIONS, indicators):
+            if indicator in OPEN and 1 <= x + dx <= 4 and 1 <= y + dy <= 4:
+                h = hasher.copy()
+                h.update(direction.encode())
+                yield x + dx, y + dy, path + direction, h
+
+    def longest(self, step):
+        """(length of the longest path to the vault through step, 0 if there
+        is none, and the number of steps expanded)."""
+        longest = expanded = 0
+        steps_to_do = [step]
+        while steps_to_do:
+            expanded += 1
+            for step in self.open_doors(*steps_to_do.pop()):
+                if (step[0], step[1]) == VAULT:
+                    longest = max(longest, len(step[2]))
+                else:
+                    steps_to_do.append(step)
+        return longest, expanded
+
+    def branches(self, at_least):
+        """Expand breadth first until there are ``at_least`` steps left to
+        do, or none: (longest path to the vault found on the way, the number
+        of steps expanded, the steps left)."""
+        longest = expanded = 0
+        steps_to_do = deque([self.start()])
+        while steps_to_do and len(steps_to_do) < at_least:
+            expanded += 1
+            for step in self.open_doors(*steps_to_do.popleft()):
+                if (step[0], step[1]) == VAULT:
+                    longest = max(longest, len(step[2]))
+                else:
+                    steps_to_do.append(step)
+        return longest, expanded, list(steps_to_do)
 
 
 class OpenDoorsTest(unittest.TestCase):
@@ -64,6 +130,12 @@ class OpenDoorsTest(unittest.TestCase):
         assert_that(p.doors((1, 1, "DU")), is_([(2, 1, "DUR")]))
         assert_that(p.doors((2, 1, "DUR")), is_([]))
 
+    def test_hashers_follow_the_path(self):
+        p = Passcode("hijkl")
+        step, = p.open_doors(*p.start())
+
+        assert_that(step[3].hexdigest(), is_(hashlib.md5(b"hijklD").hexdigest()))
+
 
 class ZComputeTest(unittest.TestCase):
     def test_official_a(self):
@@ -80,6 +152,18 @@ class ZComputeTest(unittest.TestCase):
     def test_official2_c(self):
         assert_that(compute2("ulqzkmiv"), is_(830))
 
+    def test_workers(self):
+        assert_that(compute2("ulqzkmiv", workers=2), is_(830))
+
+    def test_workers_without_a_path(self):
+        assert_that(compute2("x3", workers=2), is_(0))
+
+    def test_branches_cover_every_path(self):
+        p = Passcode("ihgpwlah")
+        longest, _, branches = p.branches(8)
+
+        assert_that(max([longest] + [p.longest(step)[0] for step in branches]), is_(370))
+
 
 if __name__ == '__main__':
     puzzle_input = "awrkjxxr"
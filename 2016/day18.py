@@ -1,4 +1,3 @@
-import hashlib
 import sys
 import unittest
 
@@ -7,19 +6,40 @@ from hamcrest import assert_that, is_
 SAFE = "."
 TRAP = "^"
 
+
 def compute(input, rows):
-    row = input
-    total_safe = row.count(SAFE)
-    for i in range(1, rows):
-        row = craft_row(row)
-        total_safe += row.count(SAFE)
+    """Safe tiles in the first `rows` rows, a row at a time. Rows rarely
+    repeat within the rows asked for, so there is no cycle worth looking
+    for: only the current row is kept."""
+    width = len(input)
+    mask = (1 << width) - 1
+
+    row = parse_row(input)
+    safe = width - row.bit_count()
+    for _ in range(rows - 1):
+        row = next_row(row, mask)
+        safe += width - row.bit_count()
+    return safe
+
+
+def next_row(row, mask):
+    """A tile is a trap when exactly one of the tiles left and right of it
+    above was; the four patterns of the puzzle come down to that."""
+    return ((row << 1) ^ (row >> 1)) & mask
 
-    return total_safe
+
+def parse_row(text):
+    """Traps as the bits of an int, the first tile the highest bit."""
+    return int(text.replace(SAFE, "0").replace(TRAP, "1"), 2)
+
+
+def format_row(row, width):
+    return format(row, "0{}b".format(width)).replace("0", SAFE).replace("1", TRAP)
 
 
 def craft_row(previous):
-    return "".join(TRAP if is_trap(tiles(previous, i - 1, i + 1)) else SAFE
-                   for i in range(0, len(previous)))
+    width = len(previous)
+    return format_row(next_row(parse_row(previous), (1 << width) - 1), width)
 
 
 def is_trap(indicator):
@@ -106,6 +126,19 @@ class ZComputeTest(unittest.TestCase):
     def test_official(self):
         assert_that(compute(".^^.^.^^^^", rows=10), is_(38))
 
+    def test_one_row(self):
+        assert_that(compute(".^^.^.^^^^", rows=1), is_(3))
+
+    def test_same_as_crafting_rows_as_text(self):
+        for first in ("..^^.", ".^^.^.^^^^", "^.....^^.^^"):
+            for rows in (7, 100, 1001):
+                row, expected = first, 0
+                for _ in range(rows):
+                    expected += row.count(SAFE)
+                    row = "".join(TRAP if is_trap(tiles(row, i - 1, i + 1)) else SAFE
+                                  for i in range(len(row)))
+                assert_that(compute(first, rows), is_(expected))
+
 
 
 if __name__ == '__main__':
@@ -1,39 +1,53 @@
-import hashlib
-import logging
+import random
 import sys
 import unittest
-from collections import deque
-from time import time
+from array import array
 
-import math
 from hamcrest import assert_that, is_
 
 
 def compute(number):
-    elves = list(range(1, number + 1))
-
-    while len(elves) > 1:
-        elves = one_full_round(elves)
-
-    return elves[0]
-
-
-def one_full_round(elves):
-    odd = len(elves) % 2 == 1
-    elves = elves[::2]
-    if odd:
-        elves.insert(0, elves.pop())
-    return elves
+    """Josephus: every other elf goes, so beyond the largest power of two
+    each extra elf moves the winner two seats."""
+    return 2 * (number - (1 << (number.bit_length() - 1))) + 1
 
 
 def compute2(number):
-    elves = list(range(1, number + 1))
-
-    while len(elves) > 1:
-        elves.pop(int(len(elves) / 2))
-        elves.append(elves.pop(0))
-
-    return elves[0]
+    """Elves go from across the circle: between powers of three the winner
+    moves one seat per elf, then two once past twice the power."""
+    power = 1
+    while power * 3 <= number:
+        power *= 3
+    if number == power:
+        return number
+    if number <= 2 * power:
+        return number - power
+    return 2 * number - 3 * power
+
+
+def steal_left(number):
+    """Play the first game on a circle of next pointers."""
+    following = array("i", range(1, number + 1))
+    following[-1] = 0
+    current = 0
+    while following[current] != current:
+        following[current] = following[following[current]]
+        current = following[current]
+    return current + 1
+
+
+def steal_across(number):
+    """Play the second game on a circle of next pointers, following the
+    elf just before the one across: it moves on every time the circle
+    loses an elf while its size is odd."""
+    following = array("i", range(1, number + 1))
+    following[-1] = 0
+    before = number // 2 - 1 if number > 1 else 0
+    for size in range(number, 1, -1):
+        following[before] = following[following[before]]
+        if size % 2:
+            before = following[before]
+    return before + 1
 
 
 class ZComputeTest(unittest.TestCase):
@@ -50,6 +64,18 @@ class ZComputeTest(unittest.TestCase):
         assert_that(compute2(11), is_(2))
 
 
+class SimulationTest(unittest.TestCase):
+    def test_official(self):
+        assert_that([steal_left(n) for n in (5, 7, 9, 11)], is_([3, 7, 3, 7]))
+        assert_that([steal_across(n) for n in (5, 7, 9, 11)], is_([2, 5, 9, 2]))
+
+    def test_closed_forms_match_the_simulations(self):
+        sizes = list(range(1, 2000)) + random.Random(19).sample(range(2000, 10 ** 5 + 1), 20)
+        sizes += [3 ** 10, 3 ** 10 + 1, 2 * 3 ** 10, 2 * 3 ** 10 + 1, 2 ** 16, 2 ** 16 + 1, 10 ** 5]
+        for n in sizes:
+            assert_that((n, compute(n)), is_((n, steal_left(n))))
+            assert_that((n, compute2(n)), is_((n, steal_across(n))))
+
 
 if __name__ == '__main__':
     puzzle_input = 3004953
@@ -1,41 +1,18 @@
-import hashlib
-import logging
 import sys
 import unittest
-from collections import deque
 from textwrap import dedent
-from time import time
 
-import math
 from hamcrest import assert_that, is_
 
+from lib.intervals import IntervalSet
 
-def compute(data):
-    limits = read_data(data)
-
-    lowest_possible = 0
-    for limit in limits:
-        if limit[0] <= lowest_possible <= limit[1]:
-            lowest_possible = limit[1] + 1
 
-    return lowest_possible
+def compute(data):
+    return IntervalSet.inclusive(read_data(data)).gaps(0, 2 ** 32).min
 
 
 def compute2(data, max=4294967295):
-    limits = read_data(data)
-
-    ip_count = 0
-    lowest_possible = 0
-    while lowest_possible <= max:
-        for limit in limits:
-            if limit[0] <= lowest_possible <= limit[1]:
-                lowest_possible = limit[1] + 1
-
-        if lowest_possible <= max:
-            ip_count += 1
-            lowest_possible += 1
-
-    return ip_count
+    return IntervalSet.inclusive(read_data(data)).gaps(0, max + 1).size
 
 
 def read_data(data):
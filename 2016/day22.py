@@ -4,7 +4,8 @@ import unittest
 from textwrap import dedent
 
 from hamcrest import assert_that, is_, has_length
-from pypaths import astar
+
+from lib.search import astar, grid_key
 
 
 def compute(data):
@@ -102,13 +103,12 @@ def shortest_path(grid, start, stop):
             (coord[0] - 1, coord[1])
         ]
 
-        return [c for c in possible_neighbors if is_valid(c)]
-
-    finder = astar.pathfinder(neighbors=neighbors)
+        return [(c, 1) for c in possible_neighbors if is_valid(c)]
 
-    length, path = finder(start, stop)
+    def distance(coord):
+        return abs(coord[0] - stop[0]) + abs(coord[1] - stop[1])
 
-    return path
+    return astar(start, stop, neighbors, distance, key=grid_key(len(grid))).path(stop)
 
 
 def _parse(line):
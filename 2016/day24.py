@@ -1,36 +1,29 @@
 import unittest
-from itertools import combinations, permutations
+from itertools import combinations
 from textwrap import dedent
 
 import sys
 from hamcrest import assert_that, is_
-from pypaths import astar
+
+from lib.search import distance_matrix, grid_key
+from lib.tours import held_karp
 
 
 def compute(data):
     ds = DuctSystem(*read_data(data))
 
-    distances = get_distances(ds)
-
-    return min(total_distance(distances, path) for path in ds.get_possible_paths() if path[0] == 0)
+    return held_karp(get_distances(ds)).length
 
 
 def compute2(data):
     ds = DuctSystem(*read_data(data))
 
-    distances = get_distances(ds)
-
-    return min(total_distance(distances, list(path) + [0]) for path in ds.get_possible_paths() if path[0] == 0)
+    return held_karp(get_distances(ds), returning=True).length
 
 
 def get_distances(ds):
-    two_points_paths = ds.get_locations_permutations()
-    distances = {}
-    for two_points_path in two_points_paths:
-        finder = astar.pathfinder(neighbors=ds.get_neighbors)
-        length, path = finder(ds.locations[two_points_path[0]], ds.locations[two_points_path[1]])
-        distances[two_points_path] = length
-    return distances
+    points = [ds.locations[loc] for loc in sorted(ds.locations)]
+    return distance_matrix(points, ds.get_neighbors, key=grid_key(len(ds.duct_map)))
 
 
 class DuctSystem(object):
@@ -51,19 +44,6 @@ class DuctSystem(object):
     def get_locations_permutations(self):
         return set(combinations(sorted(self.locations.keys()), 2))
 
-    def get_possible_paths(self):
-        return set(permutations(sorted(self.locations.keys()), len(self.locations.keys())))
-
-
-def total_distance(distances, path):
-    total = 0
-    for i in range(0, len(path) - 1):
-        try:
-            total += distances[path[i], path[i + 1]]
-        except KeyError:
-            total += distances[path[i + 1], path[i]]
-    return total
-
 
 def read_data(data):
     locations = {}
@@ -80,18 +60,6 @@ def read_data(data):
     return locations, duct_map
 
 
-class TotalDistanceTest(unittest.TestCase):
-    def test_possible_permutations(self):
-        distances = {
-            (1, 2): 3,
-            (2, 3): 4,
-        }
-
-        assert_that(total_distance(distances, (1, 2, 3)), is_(7))
-
-        assert_that(total_distance(distances, (3, 2, 1)), is_(7))
-
-
 class PermutationsTest(unittest.TestCase):
     def test_possible_permutations(self):
         ds = DuctSystem({
@@ -108,23 +76,24 @@ class PermutationsTest(unittest.TestCase):
             (1, 2),
         }))
 
-    def test_possible_paths(self):
-        ds = DuctSystem({
-            0: (1, 1),
-            1: (0, 2),
-            2: (3, 3),
-        }, None)
 
-        perms = ds.get_possible_paths()
-
-        assert_that(perms, is_({
-            (0, 1, 2),
-            (0, 2, 1),
-            (1, 0, 2),
-            (1, 2, 0),
-            (2, 1, 0),
-            (2, 0, 1)
-        }))
+class DistancesTest(unittest.TestCase):
+    def test_distance_matrix(self):
+        ds = DuctSystem(*read_data(dedent("""
+            ###########
+            #0.1.....2#
+            #.#######.#
+            #4.......3#
+            ###########
+            """)))
+
+        assert_that(get_distances(ds), is_([
+            [0, 2, 8, 10, 2],
+            [2, 0, 6, 8, 4],
+            [8, 6, 0, 2, 10],
+            [10, 8, 2, 0, 8],
+            [2, 4, 10, 8, 0],
+        ]))
 
 
 class NeighborsTest(unittest.TestCase):
@@ -0,0 +1,133 @@
+import hashlib
+import unittest
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
+from itertools import count, islice
+
+from hamcrest import assert_that, is_
+
+from lib.memo import MISSING, from_env
+
+
+def prefixed(salt):
+    """md5 hexdigest of salt + suffix, the salt hashed once and the hash
+    object copied for every suffix."""
+    base = hashlib.md5(salt.encode())
+
+    def digest(suffix):
+        h = base.copy()
+        h.update(suffix.encode())
+        return h.hexdigest()
+
+    return digest
+
+
+def starting_with(prefix, digest):
+    """For `stream`: keep the digests starting with `prefix`, as a
+    partial(starting_with, prefix) so it can be sent to workers."""
+    return digest if digest.startswith(prefix) else None
+
+
+def stream(salt, keep, stretch=0, start=0, workers=1, chunk_size=None, depends=()):
+    """Yield (index, keep(digest)) in index order, for every index from
+    `start` on whose digest `keep` does not turn into None.
+
+    The digest of an index is the md5 of salt + index, hashed again
+    `stretch` times. Indexes are hashed by chunks, in `workers` processes
+    when there are more than one, at most two chunks ahead per worker of
+    what was consumed. `keep` has to be picklable: a module level function
+    or a partial of one.
+
+    With AOC_CACHE set (see lib.memo), what every chunk kept is stored on
+    disk and read back on the next runs instead of hashing again, until the
+    source of `keep` or of what it `depends` on (the functions it calls,
+    the module level regexes they use) changes.
+    """
+    chunk_size = chunk_size or (20_000 if not stretch else 100)
+    chunks = count(start, chunk_size)
+    work = partial(_chunk, salt, chunk_size, stretch, keep)
+    memo = from_env()
+    table = memo.table(_chunk, keep, *depends) if memo else None
+
+    def cached(first):
+        return table.get(salt, chunk_size, stretch, keep, first) if table else MISSING
+
+    def store(first, found):
+        if table:
+            table.put(found, salt, chunk_size, stretch, keep, first)
+
+    if workers == 1:
+        for first in chunks:
+            found = cached(first)
+            if found is MISSING:
+                found = work(first)
+                store(first, found)
+            yield from found
+        return
+
+    def submit(first):
+        found = cached(first)
+        return first, pool.submit(work, first) if found is MISSING else found
+
+    pool = ProcessPoolExecutor(workers)
+    try:
+        pending = deque(submit(first) for first in islice(chunks, workers * 2))
+        while True:
+            first, found = pending.popleft()
+            pending.append(submit(next(chunks)))
+            if isinstance(found, Future):
+                found = found.result()
+                store(first, found)
+            yield from found
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def _chunk(salt, size, stretch, keep, first):
+    base = hashlib.md5(salt.encode())
+    md5 = hashlib.md5
+    found = []
+    for index in range(first, first + size):
+        h = base.copy()
+        h.update(b"%d" % index)
+        digest = h.hexdigest()
+        for _ in range(stretch):
+            digest = md5(digest.encode()).hexdigest()
+        value = keep(digest)
+        if value is not None:
+            found.append((index, value))
+    return found
+
+
+class PrefixedTest(unittest.TestCase):
+    def test_same_as_hashing_everything(self):
+        assert_that(prefixed("abc")("18"), is_(hashlib.md5(b"abc18").hexdigest()))
+
+
+class StreamTest(unittest.TestCase):
+    def test_in_order(self):
+        digest = prefixed("abc")
+        expected = [(i, digest(str(i))) for i in range(20_000) if digest(str(i)).startswith("000")]
+
+        found = stream("abc", partial(starting_with, "000"), chunk_size=1000)
+
+        assert_that(list(islice(found, len(expected))), is_(expected))
+
+    def test_workers_keep_the_order(self):
+        keep = partial(starting_with, "00")
+        alone = list(islice(stream("abc", keep, chunk_size=500), 50))
+
+        assert_that(list(islice(stream("abc", keep, workers=2, chunk_size=500), 50)), is_(alone))
+
+    def test_start(self):
+        index, digest = next(stream("abc", partial(starting_with, "00000"), start=3231900))
+
+        assert_that(index, is_(3231929))
+        assert_that(digest[5], is_("1"))
+
+    def test_stretch(self):
+        index, digest = next(stream("abc", partial(starting_with, ""), stretch=2016))
+
+        assert_that(index, is_(0))
+        assert_that(digest.startswith("a107ff"), is_(True))
@@ -0,0 +1,54 @@
+"""Peak memory and time of cycle detection on the ported puzzles, keeping
+whole states in the seen table (as the solutions used to) against keeping
+16 bytes fingerprints, and against Brent's algorithm which keeps none.
+
+    python -m lib.bench_cycles
+"""
+from lib.benchmark import timed
+from lib.cycles import brent, find_cycle, fingerprint
+from y2017 import day06 as banks, day16 as dance
+from y2018 import day12 as plants, day18 as lumber
+from y2019 import day12 as moons
+
+
+def _dance_step():
+    def step(dancers):
+        rueda = dance.Rueda(16)
+        rueda.dancers = list(dancers)
+        dance.dance_a_round(rueda, dance.puzzle_input)
+        return str(rueda)
+    return step
+
+
+def _plants():
+    state, mutations = plants.parse(plants.puzzle_input)
+    return (lambda s: plants.generation(s, mutations)), plants.trim(state, 0)
+
+
+def _moon_axis():
+    return moons.axis_step, moons.axis_state(moons.parse(moons.puzzle_input), "x")
+
+
+def _lumber_states(area):
+    return "".join(state.value for state in area.values())
+
+
+if __name__ == '__main__':
+    identity = lambda s: s
+    step, start = _plants()
+    cases = [
+        ("2017 day 6 banks", banks.reallocate, tuple(banks.parse(banks.puzzle_input)),
+         identity, True),
+        ("2017 day 16 dance", _dance_step(), "abcdefghijklmnop", identity, True),
+        ("2018 day 12 plants", step, start, lambda s: s[0], False),
+        ("2018 day 18 lumber", lumber.next_area, lumber.parse(lumber.puzzle_input),
+         _lumber_states, False),
+        ("2019 day 12 moons, x axis", *_moon_axis(), identity, True),
+    ]
+
+    for name, step, start, key, exact in cases:
+        timed(f"{name}: whole states", lambda: find_cycle(step, start, key=key), memory=True)
+        timed(f"{name}: fingerprints",
+              lambda: find_cycle(step, start, key=lambda s: fingerprint(key(s))), memory=True)
+        if exact:
+            timed(f"{name}: brent", lambda: brent(step, start), memory=True)
@@ -0,0 +1,69 @@
+"""Compare lib.point.Point against the plain frozen dataclass it replaced.
+
+    python -m lib.bench_point
+"""
+from dataclasses import dataclass
+
+from lib.benchmark import per_call
+from lib.point import Directions, Point, clear_neighbors_cache
+
+
+@dataclass(frozen=True)
+class _DataclassPoint:
+    x: int
+    y: int
+
+    def __add__(self, other):
+        return _DataclassPoint(self.x + other.x, self.y + other.y)
+
+    @property
+    def neighbors(self):
+        yield from (self + d for d in _OLD_NEIGHBORS)
+
+    @property
+    def extended_neighbors(self):
+        try:
+            return _old_neighbors_cache[self]
+        except KeyError:
+            _old_neighbors_cache[self] = [self + n for n in _OLD_DIRECTIONS]
+            return _old_neighbors_cache[self]
+
+
+_old_neighbors_cache = {}
+_OLD_DIRECTIONS = [_DataclassPoint(d.x, d.y) for d in Directions]
+_OLD_NEIGHBORS = [
+    _DataclassPoint(d.x, d.y)
+    for d in (Directions.LEFT, Directions.RIGHT, Directions.UP, Directions.DOWN)
+]
+
+
+def _cold_extended_neighbors(cls, clear):
+    points = [cls(x, y) for x in range(100) for y in range(100)]
+
+    def run():
+        clear()
+        for p in points:
+            p.extended_neighbors
+
+    return run
+
+
+def main():
+    for label, cls, offset, clear in (
+        ("dataclass", _DataclassPoint, _DataclassPoint(1, 2), _old_neighbors_cache.clear),
+        ("slotted", Point, Point(1, 2), clear_neighbors_cache),
+    ):
+        p = cls(3, 4)
+        per_call(f"{label}: __add__", lambda: p + offset)
+        per_call(f"{label}: hash", lambda: hash(p))
+        per_call(f"{label}: neighbors", lambda: list(p.neighbors))
+        per_call(f"{label}: extended_neighbors (warm)", lambda: p.extended_neighbors)
+        per_call(
+            f"{label}: extended_neighbors (10k cold)",
+            _cold_extended_neighbors(cls, clear),
+            number=10,
+        )
+
+
+if __name__ == "__main__":
+    main()
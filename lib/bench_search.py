@@ -0,0 +1,102 @@
+"""Time the searches of the puzzles ported to lib.search against the pypaths
+calls they replaced, when pypaths is installed.
+
+    PYTHONPATH=.:2016 python -m lib.bench_search
+
+pypaths picks the next node with min() over its whole open set, and was
+called once per pair of locations where one breadth first search from each
+location now gives the distances to all the others.
+"""
+from collections import defaultdict
+from functools import lru_cache
+
+import day13
+import day22
+import day24
+from lib.benchmark import per_call
+from lib.search import bfs, grid_key
+from y2019 import day06
+
+try:
+    from pypaths import astar
+except ImportError:
+    astar = None
+
+
+def _cubicles_pypaths():
+    finder = astar.pathfinder(neighbors=day13.CubicleMap(1352))
+    return finder((1, 1), (31, 39))[0]
+
+
+def _cubicles():
+    return day13.compute_length(1352)
+
+
+@lru_cache
+def _day22_grid():
+    return day22.build_grid(day22.read_data(day22.puzzle_input))[0]
+
+
+def _grid_pypaths():
+    grid = _day22_grid()
+
+    def neighbors(coord):
+        x, y = coord
+        return [(a, b) for a, b in ((x, y + 1), (x, y - 1), (x + 1, y), (x - 1, y))
+                if 0 <= a < len(grid) and 0 <= b < len(grid[a]) and grid[a][b].transferable]
+
+    finder = astar.pathfinder(neighbors=neighbors)
+    return [len(finder((x, y), (0, 0))[1])
+            for x in range(len(grid)) for y in range(0, len(grid[0]), 8)]
+
+
+def _grid():
+    grid = _day22_grid()
+    return [len(day22.shortest_path(grid, (x, y), (0, 0)) or [])
+            for x in range(len(grid)) for y in range(0, len(grid[0]), 8)]
+
+
+def _ducts_pypaths():
+    ds = day24.DuctSystem(*day24.read_data(day24.puzzle_input))
+    finder = astar.pathfinder(neighbors=ds.get_neighbors)
+    return {(a, b): finder(ds.locations[a], ds.locations[b])[0]
+            for a, b in ds.get_locations_permutations()}
+
+
+def _ducts():
+    ds = day24.DuctSystem(*day24.read_data(day24.puzzle_input))
+    matrix = day24.get_distances(ds)
+    return {(a, b): matrix[a][b] for a, b in ds.get_locations_permutations()}
+
+
+def _orbits_pypaths():
+    neighbors = defaultdict(list)
+    for line in day06.puzzle_input.strip().splitlines():
+        obj, sat = line.split(')')
+        neighbors[obj].append(sat)
+        neighbors[sat].append(obj)
+
+    finder = astar.pathfinder(neighbors=lambda c: neighbors[c], distance=lambda *_: 1,
+                              cost=astar.fixed_cost(1))
+    return finder('YOU', 'SAN')[0] - 2
+
+
+def _orbits():
+    return day06.compute2(day06.puzzle_input)
+
+
+if __name__ == '__main__':
+    if astar is None:
+        print("pypaths is not installed, timing lib.search only\n")
+
+    cases = [
+        ("2016 day 13 cubicles", _cubicles_pypaths, _cubicles),
+        ("2016 day 22 grid, 140 paths", _grid_pypaths, _grid),
+        ("2016 day 24 ducts, all distances", _ducts_pypaths, _ducts),
+        ("2019 day 6 orbits", _orbits_pypaths, _orbits),
+    ]
+    for name, old, new in cases:
+        if astar is not None:
+            assert old() == new(), name
+            per_call(f"{name}: pypaths", old, number=3)
+        per_call(f"{name}: lib.search", new, number=3)
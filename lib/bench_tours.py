@@ -0,0 +1,34 @@
+"""Time Held-Karp against trying every visiting order, the way 2016 day 24
+used to, on random Manhattan distance matrices.
+
+    python -m lib.bench_tours
+"""
+import random
+from itertools import permutations
+
+from lib.benchmark import timed
+from lib.tours import held_karp
+
+
+def _matrix(n):
+    rng = random.Random(n)
+    points = [(rng.randrange(200), rng.randrange(200)) for _ in range(n)]
+    return [[abs(ax - bx) + abs(ay - by) for bx, by in points] for ax, ay in points]
+
+
+def _every_order(distances):
+    return min(sum(distances[a][b] for a, b in zip((0,) + order, order))
+               for order in permutations(range(1, len(distances))))
+
+
+if __name__ == '__main__':
+    for n in (8, 9, 10, 11):
+        distances = _matrix(n)
+        timed(f"{n} points, every order", lambda: _every_order(distances))
+        timed(f"{n} points, Held-Karp", lambda: held_karp(distances).length)
+
+    for n in (12, 14, 15, 16, 17):
+        distances = _matrix(n)
+        timed(f"{n} points, Held-Karp", lambda: held_karp(distances).length)
+        timed(f"{n} points, Held-Karp returning",
+              lambda: held_karp(distances, returning=True).length)
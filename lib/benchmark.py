@@ -0,0 +1,45 @@
+import time
+import timeit
+import tracemalloc
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+
+def per_call(label: str, fn: Callable[[], object], number: int = 100_000) -> float:
+    """Best of 5 runs, printed as nanoseconds per call."""
+    best = min(timeit.repeat(fn, number=number, repeat=5)) / number
+    print(f"{label:<45} {best * 1e9:10.1f} ns/call")
+    return best
+
+
+def throughput(label: str, fn: Callable[[], int], unit: str = "ops") -> float:
+    """Run ``fn`` once; it returns how many units of work it did."""
+    start = time.perf_counter()
+    done = fn()
+    seconds = time.perf_counter() - start
+    rate = done / seconds if seconds else float("inf")
+    print(f"{label:<45} {rate:14,.0f} {unit}/s ({seconds:.3f}s)")
+    return rate
+
+
+def timed(label: str, fn: Callable[[], T], memory: bool = False) -> T:
+    """Run ``fn`` once, print the time it took and what it returned.
+
+    With ``memory``, also print its peak traced memory, from a second run
+    since tracing slows the first one down.
+    """
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+    line = f"{label:<45} {seconds:10.3f}s"
+    if memory:
+        tracemalloc.start()
+        try:
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        line += f" {peak / 2 ** 20:10,.1f} MiB"
+    print(f"{line}  {result}")
+    return result
@@ -0,0 +1,157 @@
+import hashlib
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, Optional, TypeVar
+
+import pytest
+from hamcrest import assert_that, is_
+
+State = TypeVar("State")
+Step = Callable[[State], State]
+Key = Callable[[State], Hashable]
+
+
+@dataclass(frozen=True)
+class Cycle:
+    """States from ``start`` on repeat every ``length`` steps."""
+    start: int
+    length: int
+
+    def index(self, n: int) -> int:
+        """The step before ``start + length`` whose state step ``n`` repeats."""
+        if n < self.start:
+            return n
+        return self.start + (n - self.start) % self.length
+
+
+def fingerprint(state) -> bytes:
+    """A 16 bytes digest standing in for a state in a seen-states table.
+
+    Strings and bytes are hashed as they are, anything else through repr.
+    """
+    if isinstance(state, str):
+        state = state.encode()
+    elif not isinstance(state, (bytes, bytearray)):
+        state = repr(state).encode()
+    return hashlib.blake2b(state, digest_size=16).digest()
+
+
+def brent(step: Step, state: State, key: Key = lambda s: s) -> Cycle:
+    """Brent's cycle detection; holds two states whatever the cycle length.
+
+    ``step`` must not modify the state it is given.
+    """
+    power = length = 1
+    tortoise = key(state)
+    hare = step(state)
+    while tortoise != key(hare):
+        if power == length:
+            tortoise = key(hare)
+            power *= 2
+            length = 0
+        hare = step(hare)
+        length += 1
+
+    tortoise = hare = state
+    for _ in range(length):
+        hare = step(hare)
+    start = 0
+    while key(tortoise) != key(hare):
+        tortoise = step(tortoise)
+        hare = step(hare)
+        start += 1
+
+    return Cycle(start, length)
+
+
+def find_cycle(step: Step, state: State, key: Key = fingerprint,
+               limit: Optional[int] = None) -> Optional[Cycle]:
+    """Cycle of ``state`` under ``step``, remembering only a key per state.
+
+    Returns None if no state repeats within ``limit`` steps.
+    """
+    seen: Dict[Hashable, int] = {}
+    i = 0
+    while limit is None or i <= limit:
+        k = key(state)
+        if k in seen:
+            return Cycle(seen[k], i - seen[k])
+        seen[k] = i
+        state = step(state)
+        i += 1
+    return None
+
+
+def fast_forward(step: Step, state: State, n: int, key: Key = fingerprint,
+                 extrapolate: Optional[Callable[[State, State, int], State]] = None
+                 ) -> State:
+    """The state after ``n`` steps, skipping whole cycles once one is found.
+
+    By default a repeated key means a repeated state. When the key leaves
+    out something that drifts by the same amount every cycle (a position,
+    a score), ``extrapolate(before, after, cycles)`` receives two states one
+    cycle apart and returns the state ``cycles`` cycles after ``before``.
+    """
+    seen: Dict[Hashable, int] = {}
+    for i in range(n):
+        k = key(state)
+        if k in seen:
+            length = i - seen[k]
+            cycles, rest = divmod(n - i, length)
+            if extrapolate is not None and cycles:
+                after = state
+                for _ in range(length):
+                    after = step(after)
+                state = extrapolate(state, after, cycles)
+            for _ in range(rest):
+                state = step(state)
+            return state
+        seen[k] = i
+        state = step(state)
+
+    return state
+
+
+def _sequence(start, length):
+    """Steps through 0, 1, ... start + length - 1 then back to start."""
+    def step(i):
+        return i + 1 if i + 1 < start + length else start
+    return step
+
+
+@pytest.mark.parametrize("start,length", [(0, 1), (0, 7), (3, 1), (5, 12), (100, 3)])
+def test_brent(start, length):
+    assert_that(brent(_sequence(start, length), 0), is_(Cycle(start, length)))
+
+
+@pytest.mark.parametrize("start,length", [(0, 1), (0, 7), (3, 1), (5, 12), (100, 3)])
+def test_find_cycle(start, length):
+    assert_that(find_cycle(_sequence(start, length), 0), is_(Cycle(start, length)))
+
+
+def test_find_cycle_limit():
+    assert_that(find_cycle(lambda i: i + 1, 0, limit=100), is_(None))
+
+
+@pytest.mark.parametrize("n", [0, 1, 4, 5, 6, 17, 10 ** 12])
+def test_fast_forward(n):
+    step = _sequence(5, 12)
+    assert_that(fast_forward(step, 0, n), is_(Cycle(5, 12).index(n)))
+
+
+def test_fast_forward_extrapolates_drift():
+    def step(state):
+        phase, offset = state
+        return (phase + 1) % 3, offset + 2
+
+    def extrapolate(before, after, cycles):
+        return before[0], before[1] + cycles * (after[1] - before[1])
+
+    assert_that(fast_forward(step, (0, 0), 10 ** 9 + 1, key=lambda s: s[0],
+                             extrapolate=extrapolate),
+                is_((2, 2 * (10 ** 9 + 1))))
+
+
+def test_fingerprint():
+    assert_that(fingerprint("abc"), is_(fingerprint(b"abc")))
+    assert_that(fingerprint((1, 2)), is_(fingerprint((1, 2))))
+    assert_that(len(fingerprint((1, 2))), is_(16))
@@ -0,0 +1,199 @@
+import random
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Sequence, Tuple
+
+import pytest
+from hamcrest import assert_that, is_
+
+Interval = Tuple[int, int]
+
+
+class IntervalSet:
+    """Integers as sorted, disjoint, half open [start, stop) intervals.
+
+    Touching intervals are merged, so two sets holding the same integers
+    hold the same intervals.
+    """
+
+    def __init__(self, intervals: Iterable[Interval] = ()):
+        merged = []
+        for start, stop in sorted(intervals):
+            if start >= stop:
+                continue
+            if merged and start <= merged[-1][1]:
+                if stop > merged[-1][1]:
+                    merged[-1] = (merged[-1][0], stop)
+            else:
+                merged.append((start, stop))
+        self.intervals: Sequence[Interval] = tuple(merged)
+        self._starts = [start for start, _ in merged]
+
+    @classmethod
+    def inclusive(cls, intervals: Iterable[Interval]) -> "IntervalSet":
+        """From [first, last] intervals."""
+        return cls((first, last + 1) for first, last in intervals)
+
+    def __iter__(self) -> Iterator[Interval]:
+        return iter(self.intervals)
+
+    def __bool__(self) -> bool:
+        return bool(self.intervals)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, IntervalSet) and self.intervals == other.intervals
+
+    def __repr__(self) -> str:
+        return f"IntervalSet({list(self.intervals)})"
+
+    def __contains__(self, value: int) -> bool:
+        i = bisect_right(self._starts, value) - 1
+        return i >= 0 and value < self.intervals[i][1]
+
+    @property
+    def size(self) -> int:
+        """How many integers are covered."""
+        return sum(stop - start for start, stop in self.intervals)
+
+    @property
+    def min(self) -> int:
+        return self.intervals[0][0]
+
+    def __or__(self, other: "IntervalSet") -> "IntervalSet":
+        return IntervalSet(self.intervals + other.intervals)
+
+    def __and__(self, other: "IntervalSet") -> "IntervalSet":
+        result = []
+        mine, theirs = self.intervals, other.intervals
+        i = j = 0
+        while i < len(mine) and j < len(theirs):
+            start = max(mine[i][0], theirs[j][0])
+            stop = min(mine[i][1], theirs[j][1])
+            if start < stop:
+                result.append((start, stop))
+            if mine[i][1] < theirs[j][1]:
+                i += 1
+            else:
+                j += 1
+        return IntervalSet(result)
+
+    def __sub__(self, other: "IntervalSet") -> "IntervalSet":
+        result = []
+        theirs = other.intervals
+        j = 0
+        for start, stop in self.intervals:
+            while j < len(theirs) and theirs[j][1] <= start:
+                j += 1
+            k = j
+            while k < len(theirs) and theirs[k][0] < stop:
+                if theirs[k][0] > start:
+                    result.append((start, theirs[k][0]))
+                start = max(start, theirs[k][1])
+                k += 1
+            if start < stop:
+                result.append((start, stop))
+        return IntervalSet(result)
+
+    union = __or__
+    intersection = __and__
+    difference = __sub__
+
+    def gaps(self, start: int, stop: int) -> "IntervalSet":
+        """What is not covered within [start, stop)."""
+        return IntervalSet([(start, stop)]) - self
+
+
+@dataclass(frozen=True)
+class PiecewiseShift:
+    """Adds ``offset`` to the values of each of the disjoint [start, stop)
+    ``pieces``, leaving the values outside of them as they are."""
+    pieces: Tuple[Tuple[int, int, int], ...]
+
+    def __post_init__(self):
+        object.__setattr__(self, "pieces", tuple(sorted(self.pieces)))
+
+    def __getitem__(self, value: int) -> int:
+        i = bisect_right(self.pieces, (value, float("inf"))) - 1
+        if i >= 0 and value < self.pieces[i][1]:
+            return value + self.pieces[i][2]
+        return value
+
+    def map(self, intervals: IntervalSet) -> IntervalSet:
+        """The image of ``intervals``, each split where the pieces start and
+        stop."""
+        pieces = self.pieces
+        result = []
+        for start, stop in intervals:
+            i = max(bisect_left(pieces, (start,)) - 1, 0)
+            while start < stop:
+                if i < len(pieces) and pieces[i][1] <= start:
+                    i += 1
+                elif i < len(pieces) and pieces[i][0] <= start:
+                    end = min(stop, pieces[i][1])
+                    result.append((start + pieces[i][2], end + pieces[i][2]))
+                    start = end
+                    i += 1
+                else:
+                    end = min(stop, pieces[i][0]) if i < len(pieces) else stop
+                    result.append((start, end))
+                    start = end
+        return IntervalSet(result)
+
+
+def _values(intervals):
+    return {v for start, stop in intervals for v in range(start, stop)}
+
+
+def test_merges():
+    assert_that(IntervalSet([(5, 9), (0, 3), (3, 4), (8, 12), (20, 20)]).intervals,
+                is_(((0, 4), (5, 12))))
+
+
+def test_inclusive():
+    assert_that(IntervalSet.inclusive([(5, 8), (0, 2), (4, 7)]).intervals, is_(((0, 3), (4, 9))))
+
+
+def test_contains_and_size():
+    s = IntervalSet([(0, 3), (10, 12)])
+
+    assert_that([v in s for v in (-1, 0, 2, 3, 9, 10, 11, 12)],
+                is_([False, True, True, False, False, True, True, False]))
+    assert_that(s.size, is_(5))
+    assert_that(s.min, is_(0))
+
+
+def test_gaps():
+    blocked = IntervalSet.inclusive([(5, 8), (0, 2), (4, 7)])
+
+    assert_that(blocked.gaps(0, 10).intervals, is_(((3, 4), (9, 10))))
+    assert_that(IntervalSet().gaps(0, 10).intervals, is_(((0, 10),)))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_operations_against_sets(seed):
+    rng = random.Random(seed)
+
+    def random_set():
+        return IntervalSet((a, a + rng.randrange(1, 10)) for a in rng.sample(range(60), 6))
+
+    a, b = random_set(), random_set()
+
+    assert_that(_values(a | b), is_(_values(a) | _values(b)))
+    assert_that(_values(a & b), is_(_values(a) & _values(b)))
+    assert_that(_values(a - b), is_(_values(a) - _values(b)))
+    assert_that(_values(a.gaps(-5, 75)), is_(set(range(-5, 75)) - _values(a)))
+
+
+def test_piecewise_shift_values():
+    shift = PiecewiseShift(((98, 100, -48), (50, 98, 2)))
+
+    assert_that([shift[v] for v in (0, 49, 50, 97, 98, 99, 100)], is_([0, 49, 52, 99, 50, 51, 100]))
+
+
+@pytest.mark.parametrize("start,stop", [(0, 200), (45, 55), (60, 70), (97, 101), (99, 150), (120, 130)])
+def test_piecewise_shift_intervals(start, stop):
+    shift = PiecewiseShift(((98, 100, -48), (50, 98, 2), (110, 115, 1000)))
+
+    mapped = shift.map(IntervalSet([(start, stop)]))
+
+    assert_that(_values(mapped), is_({shift[v] for v in range(start, stop)}))
@@ -0,0 +1,307 @@
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from enum import Enum
+from functools import partial
+from typing import Any, Callable, Dict, Hashable, List, Mapping, Optional, \
+    Sequence, Tuple
+
+import pytest
+from hamcrest import assert_that, contains_exactly, has_entries, is_
+
+BLOCKED = object()
+"""Returned by an operation that cannot execute yet, e.g. reading an empty
+inbox; the machine stays on that instruction."""
+
+Line = Tuple[str, Sequence[Any]]
+
+
+class State(Enum):
+    RUNNING = "RUNNING"
+    BLOCKED = "BLOCKED"
+    HALTED = "HALTED"
+
+
+@dataclass(frozen=True)
+class Operation:
+    """An opcode implementation and the kind of each of its operands.
+
+    ``operands`` has one letter per operand:
+      r  a register, passed as its slot in the registers list
+      v  a register or a constant, passed as a slot; constants get their own
+      i  an immediate, passed as an int
+    ``function(machine, registers, *operands)`` returns None to go to the
+    next line, a relative jump, or BLOCKED.
+    """
+    function: Callable[..., Any]
+    operands: str
+
+
+def operation(operands: str):
+    return partial(Operation, operands=operands)
+
+
+InstructionSet = Mapping[str, Operation]
+
+
+def parse(data: str) -> List[Line]:
+    return [(op, args) for op, *args in map(str.split, data.strip().splitlines())]
+
+
+@dataclass
+class Profile:
+    counts: Counter = field(default_factory=Counter)
+    seconds: Counter = field(default_factory=Counter)
+
+    def report(self) -> str:
+        total = sum(self.seconds.values()) or 1
+        lines = [f"{'op':<8}{'count':>12}{'seconds':>10}{'share':>8}"]
+        for name, seconds in self.seconds.most_common():
+            lines.append(f"{name:<8}{self.counts[name]:>12}{seconds:>10.3f}"
+                         f"{seconds / total:>8.1%}")
+        return "\n".join(lines)
+
+
+class Machine:
+    """Runs a program against a table of operations.
+
+    Each line is compiled once into a call with its operands already turned
+    into register slots or ints, so executing it is one call and no lookup.
+    Registers named by the program but absent from ``registers`` start at 0.
+
+    ``hits[line]`` counts the executions of each line and ``counts`` sums them
+    per opcode. Setting ``profile`` also times every instruction.
+    """
+
+    def __init__(self, program: Sequence[Line], instructions: InstructionSet,
+                 registers: Optional[Mapping[Hashable, int]] = None):
+        self.program = list(program)
+        self.slots: Dict[Hashable, int] = {}
+        self.registers: List[int] = []
+        for name, value in (registers or {}).items():
+            self._register(name, value)
+
+        self.pc = 0
+        self.state = State.RUNNING
+        self.inbox = deque()
+        self.outbox = deque()
+        self.hits = [0] * len(self.program)
+        self.profile: Optional[Profile] = None
+
+        constants: List[int] = []
+        lines = [self._resolve(instructions[op], args, constants)
+                 for op, args in self.program]
+        # constants get slots after every register the program names
+        base = len(self.registers)
+        self.registers.extend(constants)
+        self._code = [
+            partial(op.function, self, self.registers,
+                    *(base + arg.index if isinstance(arg, _Constant) else arg
+                      for arg in args))
+            for op, args in lines
+        ]
+
+    def _register(self, name: Hashable, value: int = 0) -> int:
+        if name not in self.slots:
+            self.slots[name] = len(self.registers)
+            self.registers.append(value)
+        return self.slots[name]
+
+    def _resolve(self, op: Operation, args: Sequence[Any], constants: list):
+        if len(args) != len(op.operands):
+            raise ValueError(f"Expected {len(op.operands)} operands, got {args}")
+
+        resolved = []
+        for kind, arg in zip(op.operands, args):
+            if kind == "i":
+                resolved.append(int(arg))
+            elif kind == "v" and _is_int(arg):
+                resolved.append(_Constant(len(constants)))
+                constants.append(int(arg))
+            else:
+                resolved.append(self._register(arg))
+        return op, resolved
+
+    def __getitem__(self, name: Hashable) -> int:
+        return self.registers[self.slots[name]]
+
+    def __setitem__(self, name: Hashable, value: int):
+        self.registers[self.slots[name]] = value
+
+    @property
+    def registry(self) -> Dict[Hashable, int]:
+        return {name: self.registers[slot] for name, slot in self.slots.items()}
+
+    @property
+    def counts(self) -> Counter:
+        counts = Counter()
+        for (op, _), hits in zip(self.program, self.hits):
+            counts[op] += hits
+        return counts
+
+    def run(self, limit: Optional[int] = None) -> State:
+        """Execute until halted, blocked, or ``limit`` instructions ran."""
+        if self.profile is not None:
+            return self._run_profiled(limit)
+
+        code, hits, pc, size = self._code, self.hits, self.pc, len(self._code)
+        budget = -1 if limit is None else limit
+        state = State.RUNNING
+        while budget:
+            if not 0 <= pc < size:
+                state = State.HALTED
+                break
+            jump = code[pc]()
+            if jump is BLOCKED:
+                state = State.BLOCKED
+                break
+            hits[pc] += 1
+            pc += 1 if jump is None else jump
+            budget -= 1
+        else:
+            if not 0 <= pc < size:
+                state = State.HALTED
+
+        self.pc = pc
+        self.state = state
+        return state
+
+    def _run_profiled(self, limit: Optional[int]) -> State:
+        clock = time.perf_counter
+        profile, self.profile = self.profile, None
+        budget = -1 if limit is None else limit
+        state = self.state
+        try:
+            while budget:
+                line = self.pc
+                start = clock()
+                state = self.run(1)
+                if state is State.BLOCKED or not 0 <= line < len(self.program):
+                    break
+                name = self.program[line][0]
+                profile.seconds[name] += clock() - start
+                profile.counts[name] += 1
+                if state is State.HALTED:
+                    break
+                budget -= 1
+        finally:
+            self.profile = profile
+        return state
+
+    def step(self) -> State:
+        return self.run(1)
+
+    @property
+    def halted(self) -> bool:
+        return self.state is State.HALTED
+
+
+@dataclass(frozen=True)
+class _Constant:
+    index: int
+
+
+def _is_int(token: Any) -> bool:
+    try:
+        int(token)
+    except ValueError:
+        return False
+    return True
+
+
+@operation("rv")
+def _set(machine, registers, x, y):
+    registers[x] = registers[y]
+
+
+@operation("rv")
+def _add(machine, registers, x, y):
+    registers[x] += registers[y]
+
+
+@operation("vv")
+def _jnz(machine, registers, x, y):
+    if registers[x] != 0:
+        return registers[y]
+
+
+@operation("v")
+def _snd(machine, registers, x):
+    machine.outbox.append(registers[x])
+
+
+@operation("r")
+def _rcv(machine, registers, x):
+    if not machine.inbox:
+        return BLOCKED
+    registers[x] = machine.inbox.popleft()
+
+
+@operation("ri")
+def _addi(machine, registers, x, y):
+    registers[x] += y
+
+
+_TEST_SET = {"set": _set, "add": _add, "jnz": _jnz, "snd": _snd,
+             "rcv": _rcv, "addi": _addi}
+
+
+def test_parse():
+    assert_that(parse("set a 1\nsnd a\n"), is_([("set", ["a", "1"]),
+                                                ("snd", ["a"])]))
+
+
+def test_operands_are_resolved_to_slots():
+    machine = Machine(parse("set b 7\nadd a b\naddi a 3\nadd a -1"), _TEST_SET,
+                      {"a": 1})
+    machine.run()
+
+    assert_that(machine.registry, is_({"a": 10, "b": 7}))
+    assert_that(machine["a"], is_(10))
+    assert_that(machine.halted, is_(True))
+
+
+def test_jumps_and_counts():
+    machine = Machine(parse("set a 3\nadd a -1\njnz a -1\nsnd a"), _TEST_SET)
+    machine.run()
+
+    assert_that(machine.hits, is_([1, 3, 3, 1]))
+    assert_that(machine.counts, has_entries(add=3, jnz=3, snd=1))
+    assert_that(list(machine.outbox), is_([0]))
+
+
+def test_blocks_without_moving():
+    machine = Machine(parse("rcv a\nsnd a"), _TEST_SET)
+
+    assert_that(machine.run(), is_(State.BLOCKED))
+    assert_that(machine.pc, is_(0))
+    assert_that(machine.hits, is_([0, 0]))
+
+    machine.inbox.append(5)
+    assert_that(machine.run(), is_(State.HALTED))
+    assert_that(list(machine.outbox), is_([5]))
+
+
+def test_limit():
+    machine = Machine(parse("jnz 1 0"), _TEST_SET)
+
+    assert_that(machine.run(limit=10), is_(State.RUNNING))
+    assert_that(machine.hits, is_([10]))
+    assert_that(machine.step(), is_(State.RUNNING))
+    assert_that(machine.hits, is_([11]))
+
+
+def test_profile():
+    machine = Machine(parse("set a 3\nadd a -1\njnz a -1\nrcv b"), _TEST_SET)
+    machine.profile = Profile()
+
+    assert_that(machine.run(), is_(State.BLOCKED))
+    assert_that(machine.profile.counts, is_(Counter(set=1, add=3, jnz=3)))
+    rows = machine.profile.report().splitlines()[1:]
+    assert_that(sorted(row.split()[:2] for row in rows),
+                contains_exactly(["add", "3"], ["jnz", "3"], ["set", "1"]))
+
+
+def test_wrong_operand_count():
+    with pytest.raises(ValueError):
+        Machine(parse("set a"), _TEST_SET)
@@ -1,12 +1,19 @@
-from collections.abc import Iterable, Mapping
-from dataclasses import dataclass
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass, field
+from functools import cached_property
 from textwrap import dedent
-from typing import Any, Container, Dict, Optional, Self
+from typing import Any, Container, Dict, Optional, Self, Tuple
 
 import pytest
-from hamcrest import has_entries, assert_that, has_properties
+from hamcrest import (
+    assert_that,
+    contains_inanyorder,
+    has_entries,
+    has_properties,
+    is_,
+)
 
-from lib.point import Point
+from lib.point import Directions, Point
 from lib.rectangle import Rectangle
 
 
@@ -64,6 +71,222 @@ class Map:
         return self.rect.bottom_left
 
 
+_NOTHING = 0
+
+
+@dataclass
+class DenseGrid:
+    """Same API as Map, but cells live in a flat bytearray indexed by
+    ``(y - top) * stride + (x - left)``. Cells not holding a feature are 0."""
+
+    cells: bytearray
+    rect: Rectangle
+
+    @classmethod
+    def from_input(cls, data: str, features: Container[str]) -> Self:
+        lines = data.splitlines()
+        rect = Rectangle.by_size(len(lines[0]), len(lines))
+        stride = len(lines[0])
+
+        cells = bytearray(stride * len(lines))
+        for y, line in enumerate(lines):
+            for x, content in enumerate(line[:stride]):
+                if not features or content in features:
+                    cells[y * stride + x] = ord(content)
+
+        return cls(cells, rect)
+
+    @classmethod
+    def from_features(cls, features: Mapping[Point, str], rect: Rectangle) -> Self:
+        grid = cls(bytearray((rect.width + 1) * (rect.height + 1)), rect)
+        for point, content in features.items():
+            grid[point] = content
+        return grid
+
+    @cached_property
+    def stride(self) -> int:
+        return self.rect.width + 1
+
+    @property
+    def features(self) -> Mapping[Point, str]:
+        return _DenseFeatures(self)
+
+    def index(self, p: Point) -> Optional[int]:
+        rect = self.rect
+        if not (rect.left <= p.x <= rect.right and rect.top <= p.y <= rect.bottom):
+            return None
+        return (p.y - rect.top) * self.stride + p.x - rect.left
+
+    def point(self, index: int) -> Point:
+        y, x = divmod(index, self.stride)
+        return Point(x + self.rect.left, y + self.rect.top)
+
+    def neighbor_table(self, directions: Iterable[Point]) -> Sequence[tuple[int, ...]]:
+        """For every cell index, the indexes of its in-bounds neighbors."""
+        stride, rows = self.stride, self.rect.height + 1
+        directions = [(d.x, d.y) for d in directions]
+
+        table = []
+        for y in range(rows):
+            for x in range(stride):
+                table.append(
+                    tuple(
+                        (y + dy) * stride + x + dx
+                        for dx, dy in directions
+                        if 0 <= x + dx < stride and 0 <= y + dy < rows
+                    )
+                )
+        return table
+
+    def copy(self) -> Self:
+        return type(self)(bytearray(self.cells), self.rect)
+
+    def __str__(self):
+        out = f"{type(self).__name__} <{self.rect}>\n"
+        lines = []
+        for start in range(0, len(self.cells), self.stride):
+            lines.append(
+                "".join(
+                    chr(c) if c != _NOTHING else " "
+                    for c in self.cells[start : start + self.stride]
+                )
+            )
+        return out + "\n".join(lines)
+
+    def __getitem__(self, item: Point) -> str:
+        index = self.index(item)
+        if index is None or self.cells[index] == _NOTHING:
+            raise KeyError(item)
+        return chr(self.cells[index])
+
+    def __setitem__(self, key: Point, value: Optional[str]):
+        index = self.index(key)
+        if index is None:
+            raise KeyError(key)
+        self.cells[index] = _NOTHING if value is None else ord(value)
+
+    def items(self) -> Iterable[tuple[Point, str]]:
+        point = self.point
+        return (
+            (point(i), chr(c)) for i, c in enumerate(self.cells) if c != _NOTHING
+        )
+
+    def get(self, p: Point, default: Optional[str] = None) -> str:
+        index = self.index(p)
+        if index is None or self.cells[index] == _NOTHING:
+            return default
+        return chr(self.cells[index])
+
+    @property
+    def top_right(self):
+        return self.rect.top_right
+
+    @property
+    def top_left(self):
+        return self.rect.top_left
+
+    @property
+    def bottom_right(self):
+        return self.rect.bottom_right
+
+    @property
+    def bottom_left(self):
+        return self.rect.bottom_left
+
+
+class _DenseFeatures(Mapping[Point, str]):
+    def __init__(self, grid: DenseGrid):
+        self._grid = grid
+
+    def __getitem__(self, item: Point) -> str:
+        return self._grid[item]
+
+    def __iter__(self) -> Iterator[Point]:
+        return (p for p, _ in self._grid.items())
+
+    def __len__(self) -> int:
+        return len(self._grid.cells) - self._grid.cells.count(_NOTHING)
+
+    def items(self) -> Iterable[tuple[Point, str]]:
+        return self._grid.items()
+
+    def values(self) -> Iterable[str]:
+        return (chr(c) for c in self._grid.cells if c != _NOTHING)
+
+
+@dataclass
+class ChunkedGrid:
+    """Unbounded grid of small ints (0 to 255), 0 wherever nothing was
+    written.
+
+    Cells live in square bytearray tiles of ``2 ** bits`` cells a side,
+    made on first write and kept in a dict by tile coordinates: any cell is
+    one dict lookup and one index away, and growing never moves cells.
+    Loops going cell by cell can hold on to a ``tile`` and index it
+    themselves until they step out of it.
+    """
+
+    bits: int = 6
+    tiles: Dict[Tuple[int, int], bytearray] = field(default_factory=dict, repr=False)
+
+    @property
+    def size(self) -> int:
+        return 1 << self.bits
+
+    def tile(self, tx: int, ty: int) -> bytearray:
+        """The tile of the cells (x, y) with x >> bits == tx and
+        y >> bits == ty, cell (x, y) at ``(y % size) * size + x % size``."""
+        tile = self.tiles.get((tx, ty))
+        if tile is None:
+            tile = self.tiles[tx, ty] = bytearray(1 << 2 * self.bits)
+        return tile
+
+    def index(self, p: Point) -> int:
+        mask = self.size - 1
+        return (p.y & mask) << self.bits | p.x & mask
+
+    def __getitem__(self, item: Point) -> int:
+        tile = self.tiles.get((item.x >> self.bits, item.y >> self.bits))
+        return 0 if tile is None else tile[self.index(item)]
+
+    def __setitem__(self, key: Point, value: int):
+        self.tile(key.x >> self.bits, key.y >> self.bits)[self.index(key)] = value
+
+    def items(self) -> Iterable[tuple[Point, int]]:
+        """The cells that are not 0."""
+        size = self.size
+        for (tx, ty), tile in self.tiles.items():
+            for i, value in enumerate(tile):
+                if value:
+                    y, x = divmod(i, size)
+                    yield Point(tx * size + x, ty * size + y), value
+
+    def bounds(self) -> Optional[Rectangle]:
+        """The smallest rectangle holding every cell that is not 0."""
+        size = self.size
+        xs, ys = [], []
+        for (tx, ty), tile in self.tiles.items():
+            rows = [y for y in range(size) if any(tile[y * size : (y + 1) * size])]
+            if rows:
+                columns = [x for x in range(size) if any(tile[x::size])]
+                ys += (ty * size + rows[0], ty * size + rows[-1])
+                xs += (tx * size + columns[0], tx * size + columns[-1])
+        if not xs:
+            return None
+        return Rectangle(min(xs), max(xs), min(ys), max(ys))
+
+    def render(self, palette: Sequence[str], rect: Optional[Rectangle] = None) -> str:
+        """Rows of ``rect`` (the bounds by default), a cell of value v drawn
+        as ``palette[v]``."""
+        rect = rect or self.bounds()
+        if rect is None:
+            return ""
+        return "\n".join(
+            "".join(palette[self[Point(x, y)]] for x in range(rect.left, rect.right + 1))
+            for y in range(rect.top, rect.bottom + 1)
+        )
+
+
 @pytest.mark.parametrize(
     "val, features, expect",
     [
@@ -143,3 +366,84 @@ def test_map_locations(prop, matches):
     )
 
     assert_that(map, has_properties(prop, matches))
+
+
+@pytest.mark.parametrize(
+    "features",
+    [None, ("#",)],
+)
+def test_dense_grid_matches_map(features):
+    val = dedent(
+        """\
+        .#.
+        #.#
+        """
+    )
+    grid = DenseGrid.from_input(val, features)
+    map = Map.from_input(val, features)
+
+    assert_that(dict(grid.items()), is_(dict(map.items())))
+    assert_that(grid.features, is_(map.features))
+    assert_that(grid.rect, is_(map.rect))
+    assert_that(str(grid).split("\n")[1:], is_(str(map).split("\n")[1:]))
+
+
+def test_dense_grid_lookups():
+    grid = DenseGrid.from_input("..\n#.\n", features=("#",))
+
+    assert_that(grid[Point(0, 1)], is_("#"))
+    assert_that(grid.get(Point(1, 1)), is_(None))
+    assert_that(grid.get(Point(5, 5), "x"), is_("x"))
+    with pytest.raises(KeyError):
+        grid[Point(-1, 0)]
+    with pytest.raises(KeyError):
+        grid[Point(0, 0)]
+
+
+def test_dense_grid_neighbor_table():
+    grid = DenseGrid.from_input("...\n...\n", features=None)
+    table = grid.neighbor_table(Directions)
+
+    assert_that(table[grid.index(Point(0, 0))], contains_inanyorder(1, 3, 4))
+    assert_that(
+        [grid.point(i) for i in table[grid.index(Point(1, 1))]],
+        contains_inanyorder(*(n for n in Point(1, 1).extended_neighbors if n in grid.rect)),
+    )
+
+
+def test_dense_grid_from_features():
+    grid = DenseGrid.from_features({Point(1, 0): "#"}, Rectangle.by_size(2, 2))
+
+    assert_that(grid.cells, is_(bytearray(b"\x00#\x00\x00")))
+    assert_that(grid.copy(), is_(grid))
+
+
+def test_chunked_grid_anywhere():
+    grid = ChunkedGrid(bits=2)
+    points = [Point(0, 0), Point(-1, -1), Point(3, 4), Point(-1000, 250), Point(7, -9)]
+    for value, point in enumerate(points, start=1):
+        grid[point] = value
+
+    assert_that([grid[p] for p in points], is_([1, 2, 3, 4, 5]))
+    assert_that(grid[Point(1, 0)], is_(0))
+    assert_that(grid[Point(50, 50)], is_(0))
+    assert_that(dict(grid.items()), is_({p: v for v, p in enumerate(points, start=1)}))
+
+
+def test_chunked_grid_tiles():
+    grid = ChunkedGrid(bits=2)
+    grid[Point(-3, 5)] = 9
+
+    assert_that(grid.tile(-1, 1)[grid.index(Point(-3, 5))], is_(9))
+
+
+def test_chunked_grid_bounds_and_render():
+    grid = ChunkedGrid(bits=2)
+    assert_that(grid.bounds(), is_(None))
+
+    grid[Point(-2, -1)] = 1
+    grid[Point(3, 1)] = 2
+    grid[Point(10, 10)] = 0
+
+    assert_that(grid.bounds(), is_(Rectangle(-2, 3, -1, 1)))
+    assert_that(grid.render(".#x"), is_("#.....\n......\n.....x"))
@@ -0,0 +1,230 @@
+"""Opt-in on-disk memo for slow deterministic functions.
+
+Off unless ``AOC_CACHE`` names an SQLite file, e.g.
+``AOC_CACHE=/tmp/aoc.sqlite python -m pytest 2016/day14.py``. Entries are
+keyed by the pickled arguments and dropped whenever the source of the
+function changes, the least recently used going first once the values
+stored go over ``AOC_CACHE_MB`` megabytes (256 by default).
+"""
+import hashlib
+import inspect
+import os
+import pickle
+import re
+import sqlite3
+from functools import partial, wraps
+from typing import Callable, Optional
+
+from hamcrest import assert_that, is_
+
+MISSING = object()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS memo (
+    name TEXT NOT NULL,
+    version TEXT NOT NULL,
+    key BLOB NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    used INTEGER NOT NULL,
+    PRIMARY KEY (name, key)
+);
+CREATE INDEX IF NOT EXISTS memo_used ON memo (used);
+"""
+
+
+def _name(fn: Callable) -> str:
+    args = ""
+    while isinstance(fn, partial):
+        args = f"{fn.args!r}{args}"
+        fn = fn.func
+    return f"{fn.__module__}.{fn.__qualname__}{args}"
+
+
+def source_digest(*functions: Callable) -> str:
+    """Digest of the source of ``functions``, partials included. Anything
+    else given, like a module level compiled regex they use, goes in by its
+    repr()."""
+    h = hashlib.blake2b(digest_size=16)
+    for fn in functions:
+        if not callable(fn):
+            h.update(repr(fn).encode())
+            continue
+        while isinstance(fn, partial):
+            h.update(repr(fn.args).encode())
+            fn = fn.func
+        try:
+            h.update(inspect.getsource(fn).encode())
+        except (OSError, TypeError):
+            h.update(fn.__code__.co_code)
+    return h.hexdigest()
+
+
+class Table:
+    """Memoized results of one function, as of one version of its source."""
+
+    def __init__(self, memo: "DiskMemo", name: str, version: str):
+        self.memo = memo
+        self.name = name
+        self.version = version
+
+    def get(self, *args):
+        """The value stored for ``args``, or MISSING."""
+        return self.memo._get(self.name, pickle.dumps(args))
+
+    def put(self, value, *args):
+        self.memo._put(self.name, self.version, pickle.dumps(args), value)
+
+
+class DiskMemo:
+    def __init__(self, path: str, max_bytes: int = 256 * 2 ** 20):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._db = sqlite3.connect(path, isolation_level=None)
+        self._db.executescript(_SCHEMA)
+        self._size, self._clock = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0), COALESCE(MAX(used), 0) FROM memo").fetchone()
+
+    def table(self, fn: Callable, *sources: Callable) -> Table:
+        """Entries of ``fn`` with ``sources`` (what it calls or reads), dropping
+        those stored while the source of any of them was different."""
+        name = " ".join(_name(source) for source in (fn,) + sources if callable(source))
+        version = source_digest(fn, *sources)
+        freed, = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM memo WHERE name = ? AND version != ?",
+            (name, version)).fetchone()
+        if freed:
+            self._db.execute("DELETE FROM memo WHERE name = ? AND version != ?", (name, version))
+            self._size -= freed
+        return Table(self, name, version)
+
+    def memoize(self, fn: Callable, *sources: Callable) -> Callable:
+        table = self.table(fn, *sources)
+
+        @wraps(fn)
+        def memoized(*args):
+            value = table.get(*args)
+            if value is MISSING:
+                value = fn(*args)
+                table.put(value, *args)
+            return value
+
+        return memoized
+
+    def close(self):
+        self._db.close()
+
+    def _get(self, name, key):
+        row = self._db.execute("SELECT value FROM memo WHERE name = ? AND key = ?",
+                               (name, key)).fetchone()
+        if row is None:
+            self.misses += 1
+            return MISSING
+        self.hits += 1
+        self._clock += 1
+        self._db.execute("UPDATE memo SET used = ? WHERE name = ? AND key = ?",
+                         (self._clock, name, key))
+        return pickle.loads(row[0])
+
+    def _put(self, name, version, key, value):
+        blob = pickle.dumps(value)
+        self._clock += 1
+        previous = self._db.execute("SELECT size FROM memo WHERE name = ? AND key = ?",
+                                    (name, key)).fetchone()
+        self._db.execute("INSERT OR REPLACE INTO memo VALUES (?, ?, ?, ?, ?, ?)",
+                         (name, version, key, blob, len(blob), self._clock))
+        self._size += len(blob) - (previous[0] if previous else 0)
+        if self._size > self.max_bytes:
+            self._evict()
+
+    def _evict(self):
+        doomed = []
+        for rowid, size in self._db.execute("SELECT rowid, size FROM memo ORDER BY used"):
+            if self._size <= self.max_bytes:
+                break
+            doomed.append((rowid,))
+            self._size -= size
+        self._db.executemany("DELETE FROM memo WHERE rowid = ?", doomed)
+
+
+_memos = {}
+
+
+def from_env() -> Optional[DiskMemo]:
+    """The memo ``AOC_CACHE`` points to, None when it is not set."""
+    path = os.environ.get("AOC_CACHE")
+    if not path:
+        return None
+    path = os.path.expanduser(path)
+    if path not in _memos:
+        _memos[path] = DiskMemo(path, int(os.environ.get("AOC_CACHE_MB", 256)) * 2 ** 20)
+    return _memos[path]
+
+
+def _square(x):
+    _square.calls += 1
+    return x * x
+
+
+def _cube(x):
+    return x * x * x
+
+
+def test_memoize_across_instances(tmp_path):
+    _square.calls = 0
+    path = str(tmp_path / "memo.sqlite")
+
+    square = DiskMemo(path).memoize(_square)
+    assert_that([square(3), square(3), square(4)], is_([9, 9, 16]))
+    assert_that(_square.calls, is_(2))
+
+    memo = DiskMemo(path)
+    square = memo.memoize(_square)
+    assert_that(square(4), is_(16))
+    assert_that(_square.calls, is_(2))
+    assert_that((memo.hits, memo.misses), is_((1, 0)))
+
+
+def test_source_change_invalidates(tmp_path):
+    memo = DiskMemo(str(tmp_path / "memo.sqlite"))
+    Table(memo, memo.table(_square).name, "before an edit").put(9, 3)
+
+    assert_that(memo.table(_square).get(3), is_(MISSING))
+
+
+def test_tables_of_different_sources(tmp_path):
+    memo = DiskMemo(str(tmp_path / "memo.sqlite"))
+    memo.table(_square).put(9, 3)
+    memo.table(_square, _cube).put(27, 3)
+
+    assert_that(memo.table(_square).get(3), is_(9))
+    assert_that(memo.table(_square, _cube).get(3), is_(27))
+
+
+def test_least_recently_used_go_first(tmp_path):
+    memo = DiskMemo(str(tmp_path / "memo.sqlite"), max_bytes=3 * len(pickle.dumps(b"x" * 100)))
+    table = memo.table(_square)
+    for i in range(3):
+        table.put(b"x" * 100, i)
+    table.get(0)
+
+    table.put(b"x" * 100, 3)
+
+    assert_that([table.get(i) is MISSING for i in range(4)], is_([False, True, False, False]))
+
+
+def test_partials_carry_their_arguments():
+    assert_that(source_digest(partial(_square, 2)) == source_digest(partial(_square, 3)),
+                is_(False))
+
+
+def test_values_are_part_of_the_version():
+    assert_that(source_digest(_square, re.compile("a")) == source_digest(_square, re.compile("b")),
+                is_(False))
+
+
+def test_off_by_default(monkeypatch):
+    monkeypatch.delenv("AOC_CACHE", raising=False)
+    assert_that(from_env(), is_(None))
@@ -1,21 +1,37 @@
+import copy
 import math
+import pickle
 from dataclasses import dataclass, replace
 from enum import Enum
+from functools import lru_cache
 
 import pytest
 from hamcrest import assert_that, is_, contains_inanyorder
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, eq=False)
 class Point:
+    __slots__ = ("x", "y")
+
     x: int
     y: int
 
     def manhattan_dist(self, other):
         return abs(self.x - other.x) + abs(self.y - other.y)
 
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self.x == other.x and self.y == other.y
+
+    def __hash__(self):
+        return hash((self.x, self.y))
+
+    def __reduce__(self):
+        return Point, (self.x, self.y)
+
     def __add__(self, other):
-        return Point(self.x + other.x, self.y + other.y)
+        return _new_point(self.x + other.x, self.y + other.y)
 
     def __sub__(self, other):
         return Point(self.x - other.x, self.y - other.y)
@@ -54,20 +70,36 @@ class Point:
 
     @property
     def neighbors(self):
+        x, y = self.x, self.y
         yield from (
-            self + d for d in _NEIGHBORS
+            _new_point(x + dx, y + dy) for dx, dy in _NEIGHBOR_OFFSETS
         )
 
     @property
     def extended_neighbors(self):
-        try:
-            return _neighbors_cache[self]
-        except KeyError:
-            _neighbors_cache[self] = [self + n for n in Directions]
-            return _neighbors_cache[self]
+        return _extended_neighbors(self.x, self.y)
+
+
+def _new_point(x: int, y: int) -> Point:
+    """Build a Point without going through the frozen dataclass __init__."""
+    p = _point_new(Point)
+    _set_x(p, x)
+    _set_y(p, y)
+    return p
+
 
+_point_new = object.__new__
+_set_x = Point.x.__set__
+_set_y = Point.y.__set__
 
-_neighbors_cache = {}
+
+@lru_cache(maxsize=1 << 16)
+def _extended_neighbors(x: int, y: int) -> list[Point]:
+    return [_new_point(x + dx, y + dy) for dx, dy in _EXTENDED_NEIGHBOR_OFFSETS]
+
+
+def clear_neighbors_cache():
+    _extended_neighbors.cache_clear()
 
 
 @dataclass(frozen=True)
@@ -111,6 +143,9 @@ _NEIGHBORS = (
     Directions.UP,
     Directions.DOWN,
 )
+_NEIGHBOR_OFFSETS = tuple((d.x, d.y) for d in _NEIGHBORS)
+_EXTENDED_NEIGHBOR_OFFSETS = tuple((d.x, d.y) for d in Directions)
+
 def rotate(point: Point, rot: Rotations, times=1):
     """Rotate around a 0, 0 axis"""
     result = point
@@ -169,6 +204,17 @@ def test_neighbors():
 
 
 
+def test_pickle_roundtrip():
+    assert_that(pickle.loads(pickle.dumps(Point(3, -4))), is_(Point(3, -4)))
+    assert_that(copy.deepcopy(Directions.UP), is_(Directions.UP))
+
+
+def test_clear_neighbors_cache():
+    Point(5, 5).extended_neighbors
+    clear_neighbors_cache()
+    assert_that(_extended_neighbors.cache_info().currsize, is_(0))
+
+
 def test_extended_neighbors():
     assert_that(Point(2, 2).extended_neighbors, contains_inanyorder(
         Point(1, 1),
@@ -1,22 +1,259 @@
+"""Opt-in instrumentation that can stay in solutions.
+
+Everything here is a no-op until enabled, either with ``enable()`` or by
+running with ``AOC_PROFILE`` set, e.g. ``AOC_PROFILE=1`` for timers and
+counters only, or ``AOC_PROFILE=tracemalloc,cprofile`` to also capture peak
+memory and a cProfile of every ``@profiled`` function.
+
+    for i in sampled(range(turns), "turns"):   # the range itself when disabled
+        with timer("lookup"):                  # a shared no-op when disabled
+            ...
+        counter("misses").add()
+"""
+import cProfile
+import io
 import logging
+import os
+import pstats
+import sys
 import time
-from functools import partial
-from typing import Iterable, Callable
+import tracemalloc
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from functools import wraps
+from itertools import islice
+from typing import Callable, Dict, Iterable, List, Optional
+
+import pytest
+from hamcrest import assert_that, contains_string, greater_than, is_, \
+    same_instance
+
+logger = logging.getLogger(__name__)
+
+CAPTURES = ("tracemalloc", "cprofile")
+
+
+@dataclass
+class Counter:
+    name: str
+    count: int = 0
+    started: float = field(default_factory=time.perf_counter)
+    last: Optional[float] = None
+    logged: float = 0.0
+
+    def add(self, n: int = 1):
+        self.count += n
+
+    def sample(self, n: int, interval: float):
+        """Add ``n`` and log the rate if ``interval`` seconds went by."""
+        self.count += n
+        self.last = time.perf_counter()
+        if self.last - self.logged >= interval:
+            self.logged = self.last
+            logger.info("%s: %s, %s / second", self.name, self.count,
+                        int(self.rate))
+
+    @property
+    def rate(self) -> float:
+        seconds = (self.last or time.perf_counter()) - self.started
+        return self.count / seconds if seconds else 0.0
+
+
+@dataclass
+class Timer:
+    name: str
+    calls: int = 0
+    seconds: float = 0.0
+    _start: float = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.seconds += time.perf_counter() - self._start
+        self.calls += 1
+
+
+class _NullCounter:
+    def add(self, n: int = 1):
+        pass
+
+
+_NULL_COUNTER = _NullCounter()
+_NULL_TIMER = nullcontext()
+
+
+@dataclass
+class Run:
+    name: str
+    seconds: float
+    peak_memory: Optional[int] = None
+    stats: Optional[str] = None
+
+
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        self.captures = frozenset()
+        self.counters: Dict[str, Counter] = {}
+        self.timers: Dict[str, Timer] = {}
+        self.runs: List[Run] = []
+
+    def enable(self, *captures: str):
+        unknown = set(captures) - set(CAPTURES)
+        if unknown:
+            raise ValueError(f"Unknown captures {unknown}, expected {CAPTURES}")
+        self.enabled = True
+        self.captures = frozenset(captures)
+        logger.setLevel(logging.INFO)
+        if not logging.getLogger().handlers:
+            logging.basicConfig()
 
-_default_reporter = partial(logging.warn,
-                            'Looped %s times; avg %s loops / seconds')
+    def disable(self):
+        self.enabled = False
 
+    def counter(self, name: str):
+        if not self.enabled:
+            return _NULL_COUNTER
+        if name not in self.counters:
+            self.counters[name] = Counter(name)
+        return self.counters[name]
 
-def reporting(iterator: Iterable,
-              every: int = 100,
-              reporter: Callable[[int, int], None] = _default_reporter):
-    loops = 0
-    start = time.time()
-    for item in iterator:
+    def timer(self, name: str):
+        if not self.enabled:
+            return _NULL_TIMER
+        if name not in self.timers:
+            self.timers[name] = Timer(name)
+        return self.timers[name]
+
+    def sampled(self, iterable: Iterable, name: str, every: int = 100_000,
+                interval: float = 1.0) -> Iterable:
+        """Count items flowing through ``iterable``, looking at the clock
+        once every ``every`` items. Counts are in multiples of ``every``."""
+        if not self.enabled:
+            return iterable
+        return _sampled(iter(iterable), self.counter(name), every, interval)
+
+    def run(self, fn: Callable, *args, **kwargs):
+        """Call ``fn`` under the enabled captures, starting a fresh report."""
+        self.counters, self.timers, self.runs = {}, {}, []
+        profile = cProfile.Profile() if "cprofile" in self.captures else None
+        memory = "tracemalloc" in self.captures and not tracemalloc.is_tracing()
+        if memory:
+            tracemalloc.start()
+        if profile:
+            profile.enable()
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            run = Run(fn.__qualname__, time.perf_counter() - start)
+            if profile:
+                profile.disable()
+                out = io.StringIO()
+                pstats.Stats(profile, stream=out).sort_stats("cumulative").print_stats(15)
+                run.stats = out.getvalue()
+            if memory:
+                run.peak_memory = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            self.runs.append(run)
+
+    def report(self) -> str:
+        lines = []
+        for run in self.runs:
+            line = f"{run.name}: {run.seconds:.3f}s wall"
+            if run.peak_memory is not None:
+                line += f", peak {run.peak_memory / 1024:,.0f} KiB"
+            lines.append(line)
+        for c in self.counters.values():
+            lines.append(f"  {c.name}: {c.count:,} ({c.rate:,.0f}/s)")
+        for t in self.timers.values():
+            lines.append(f"  {t.name}: {t.calls:,} calls, {t.seconds:.3f}s")
+        for run in self.runs:
+            if run.stats:
+                lines.append(run.stats)
+        return "\n".join(lines)
+
+
+def _sampled(iterator, counter: Counter, every: int, interval: float):
+    while True:
+        yield from islice(iterator, every - 1)
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        counter.sample(every, interval)
         yield item
 
-        loops += 1
-        if loops % every == 0:
-            seconds = time.time() - start
 
-            reporter(loops, int(loops / seconds))
+profiler = Profiler()
+enable = profiler.enable
+disable = profiler.disable
+counter = profiler.counter
+timer = profiler.timer
+sampled = profiler.sampled
+report = profiler.report
+
+
+def profiled(fn):
+    """Time ``fn`` and capture what is enabled; report when it returns."""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not profiler.enabled:
+            return fn(*args, **kwargs)
+        try:
+            return profiler.run(fn, *args, **kwargs)
+        finally:
+            print(profiler.report(), file=sys.stderr)
+
+    return wrapper
+
+
+if os.environ.get("AOC_PROFILE"):
+    enable(*(c for c in os.environ["AOC_PROFILE"].split(",") if c in CAPTURES))
+
+
+def test_disabled_costs_nothing():
+    p = Profiler()
+    items = range(10)
+    assert_that(p.sampled(items, "items"), same_instance(items))
+    assert_that(p.timer("t"), same_instance(_NULL_TIMER))
+    p.counter("c").add()
+    assert_that(p.counters, is_({}))
+
+
+def test_sampled_counts_by_batches():
+    p = Profiler()
+    p.enable()
+    assert_that(list(p.sampled(range(25), "items", every=10)), is_(list(range(25))))
+    assert_that(p.counters["items"].count, is_(20))
+
+
+def test_timers_and_counters():
+    p = Profiler()
+    p.enable()
+    for _ in range(3):
+        with p.timer("work"):
+            p.counter("calls").add(2)
+
+    assert_that(p.timers["work"].calls, is_(3))
+    assert_that(p.counters["calls"].count, is_(6))
+    assert_that(p.report(), contains_string("work: 3 calls"))
+
+
+def test_run_captures():
+    p = Profiler()
+    p.enable("tracemalloc", "cprofile")
+
+    assert_that(p.run(lambda n: len([0] * n), 100_000), is_(100_000))
+
+    run, = p.runs
+    assert_that(run.peak_memory, greater_than(100_000 * 8))
+    assert_that(run.stats, contains_string("function calls"))
+    assert_that(p.report(), contains_string("KiB"))
+
+
+def test_unknown_capture():
+    with pytest.raises(ValueError):
+        Profiler().enable("perf")
@@ -0,0 +1,265 @@
+import math
+from heapq import heappop, heappush
+from itertools import count
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple, \
+    TypeVar
+
+import pytest
+from hamcrest import assert_that, contains_exactly, is_
+
+Node = TypeVar("Node")
+Key = Callable[[Node], Hashable]
+Neighbors = Callable[[Node], Iterable[Node]]
+WeightedNeighbors = Callable[[Node], Iterable[Tuple[Node, int]]]
+
+
+def _identity(node):
+    return node
+
+
+def grid_key(width: int) -> Key:
+    """Integer ids for (x, y) coordinates with 0 <= x < width."""
+    def key(coord):
+        return coord[1] * width + coord[0]
+    return key
+
+
+class Paths:
+    """What a search from ``start`` found, keyed by ``key(node)``.
+
+    When the search stopped early, only the distances of the targets and of
+    the nodes on their paths are known to be final.
+    """
+
+    def __init__(self, start, key: Key = _identity):
+        self.start = start
+        self.key = key
+        self.distances: Dict[Hashable, int] = {key(start): 0}
+        self.parents: Dict[Hashable, Node] = {}
+
+    def __contains__(self, node) -> bool:
+        return self.key(node) in self.distances
+
+    def distance(self, node) -> Optional[int]:
+        return self.distances.get(self.key(node))
+
+    def path(self, node) -> Optional[List]:
+        """Nodes from ``start`` to ``node`` included, None if not reached."""
+        k = self.key(node)
+        if k not in self.distances:
+            return None
+        path = [node]
+        while k in self.parents:
+            node = self.parents[k]
+            path.append(node)
+            k = self.key(node)
+        path.reverse()
+        return path
+
+
+def bfs(start, neighbors: Neighbors, targets: Iterable = (), key: Key = _identity,
+        limit: Optional[int] = None) -> Paths:
+    """Breadth first search, every step costing 1.
+
+    Stops as soon as all of ``targets`` are reached (never when there are
+    none) or past ``limit`` steps. Neighbors are tried in the order they are
+    given, the first to reach a node becomes its parent.
+    """
+    paths = Paths(start, key)
+    distances, parents = paths.distances, paths.parents
+    remaining = {key(t) for t in targets}
+    remaining.discard(key(start))
+    looking = bool(remaining)
+
+    frontier = [start]
+    depth = 0
+    while frontier and (limit is None or depth < limit):
+        depth += 1
+        reached = []
+        for node in frontier:
+            for neighbor in neighbors(node):
+                k = key(neighbor)
+                if k in distances:
+                    continue
+                distances[k] = depth
+                parents[k] = node
+                reached.append(neighbor)
+                if looking:
+                    remaining.discard(k)
+                    if not remaining:
+                        return paths
+        frontier = reached
+
+    return paths
+
+
+def distance_matrix(points: Sequence, neighbors: Neighbors, key: Key = _identity
+                    ) -> List[List[float]]:
+    """Steps between every two of ``points``, one BFS from each of them.
+
+    ``matrix[i][j]`` goes from ``points[i]`` to ``points[j]``, math.inf
+    when it cannot be reached.
+    """
+    matrix = []
+    for point in points:
+        paths = bfs(point, neighbors, targets=points, key=key)
+        matrix.append([math.inf if d is None else d for d in map(paths.distance, points)])
+    return matrix
+
+
+def dijkstra(start, neighbors: WeightedNeighbors, targets: Iterable = (),
+             key: Key = _identity) -> Paths:
+    """Cheapest paths on non negative costs, ``neighbors`` yielding
+    (node, cost) pairs. Stops once all of ``targets`` are settled."""
+    return _best_first(Paths(start, key), neighbors, targets, lambda _: 0)
+
+
+def astar(start, goal, neighbors: WeightedNeighbors, heuristic: Callable[[Node], int],
+          key: Key = _identity) -> Paths:
+    """Cheapest path to ``goal``; ``heuristic`` must never overestimate the
+    remaining cost."""
+    return _best_first(Paths(start, key), neighbors, (goal,), heuristic)
+
+
+def _best_first(paths: Paths, neighbors: WeightedNeighbors, targets: Iterable,
+                heuristic: Callable[[Node], int]) -> Paths:
+    key = paths.key
+    distances, parents = paths.distances, paths.parents
+    remaining = {key(t) for t in targets}
+    looking = bool(remaining)
+
+    # the counter breaks ties first in first out, nodes are never compared
+    tie = count()
+    heap = [(heuristic(paths.start), next(tie), 0, paths.start)]
+    while heap:
+        _, _, cost, node = heappop(heap)
+        k = key(node)
+        if cost > distances[k]:
+            continue
+        if looking:
+            remaining.discard(k)
+            if not remaining:
+                break
+
+        for neighbor, step in neighbors(node):
+            total = cost + step
+            nk = key(neighbor)
+            if nk not in distances or total < distances[nk]:
+                distances[nk] = total
+                parents[nk] = node
+                heappush(heap, (total + heuristic(neighbor), next(tie), total, neighbor))
+
+    return paths
+
+
+_MAZE = """\
+#########
+#S..#...#
+#.#.#.#.#
+#.#...#E#
+#########"""
+
+
+def _maze():
+    walls = {(x, y) for y, line in enumerate(_MAZE.splitlines())
+             for x, c in enumerate(line) if c == "#"}
+
+    def neighbors(coord):
+        x, y = coord
+        for n in ((x, y - 1), (x - 1, y), (x + 1, y), (x, y + 1)):
+            if n not in walls:
+                yield n
+
+    return neighbors
+
+
+def test_bfs_path():
+    paths = bfs((1, 1), _maze(), targets=[(7, 3)])
+
+    assert_that(paths.distance((7, 3)), is_(12))
+    assert_that(paths.path((7, 3)), is_([
+        (1, 1), (2, 1), (3, 1), (3, 2), (3, 3), (4, 3), (5, 3),
+        (5, 2), (5, 1), (6, 1), (7, 1), (7, 2), (7, 3),
+    ]))
+
+
+def test_bfs_stops_when_targets_are_reached():
+    paths = bfs((1, 1), _maze(), targets=[(1, 3), (3, 3)])
+
+    assert_that(paths.distance((1, 3)), is_(2))
+    assert_that(paths.distance((3, 3)), is_(4))
+    assert_that((7, 3) in paths, is_(False))
+
+
+def test_bfs_start_is_target():
+    assert_that(bfs((1, 1), _maze(), targets=[(1, 1)]).path((1, 1)), is_([(1, 1)]))
+
+
+def test_bfs_limit():
+    paths = bfs((1, 1), _maze(), limit=2)
+
+    assert_that(sorted(paths.distances), contains_exactly((1, 1), (1, 2), (1, 3), (2, 1), (3, 1)))
+
+
+def test_bfs_unreachable():
+    paths = bfs((1, 1), _maze(), targets=[(0, 0)])
+
+    assert_that(paths.distance((0, 0)), is_(None))
+    assert_that(paths.path((0, 0)), is_(None))
+
+
+def test_integer_keys():
+    key = grid_key(9)
+    paths = bfs((1, 1), _maze(), targets=[(7, 3)], key=key)
+
+    assert_that(paths.distances[key((7, 3))], is_(12))
+    assert_that(paths.path((7, 3))[-3:], is_([(7, 1), (7, 2), (7, 3)]))
+
+
+def test_distance_matrix():
+    points = [(1, 1), (7, 3), (1, 3)]
+
+    assert_that(distance_matrix(points, _maze()), is_([
+        [0, 12, 2],
+        [12, 0, 14],
+        [2, 14, 0],
+    ]))
+
+
+def test_distance_matrix_one_way():
+    graph = {"a": ["b"], "b": []}
+
+    assert_that(distance_matrix(["a", "b"], graph.__getitem__), is_([[0, 1], [math.inf, 0]]))
+
+
+def _weighted(coord):
+    # going down costs 5, anything else 1
+    for n in _maze()(coord):
+        yield n, 5 if n[1] > coord[1] else 1
+
+
+@pytest.mark.parametrize("search", [
+    lambda: dijkstra((1, 1), _weighted, targets=[(7, 3)]),
+    lambda: astar((1, 1), (7, 3), _weighted,
+                  heuristic=lambda c: abs(7 - c[0]) + abs(3 - c[1])),
+])
+def test_weighted(search):
+    paths = search()
+
+    assert_that(paths.distance((7, 3)), is_(28))
+    assert_that(paths.path((7, 3))[:4], is_([(1, 1), (2, 1), (3, 1), (3, 2)]))
+
+
+def test_dijkstra_distance_table():
+    paths = dijkstra((1, 1), _weighted)
+
+    assert_that(paths.distance((1, 3)), is_(10))
+    assert_that(paths.distance((7, 1)), is_(18))
+
+
+def test_dijkstra_prefers_cheaper_to_shorter():
+    graph = {"a": [("c", 5), ("b", 1)], "b": [("c", 1)], "c": []}
+    paths = dijkstra("a", graph.__getitem__, targets=["c"])
+
+    assert_that(paths.path("c"), is_(["a", "b", "c"]))
+    assert_that(paths.distance("c"), is_(2))
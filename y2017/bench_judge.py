@@ -0,0 +1,40 @@
+"""Time the day 15 judge on the puzzle input: the generators one value at a
+time comparing bin() strings as the day used to, the same with & 0xFFFF,
+and the packed blocks, at 40M pairs (part 1) and 5M picky pairs (part 2).
+
+    python -m y2017.bench_judge
+"""
+from lib.benchmark import timed
+from y2017.day15 import DIVIDER, FACTOR_A, FACTOR_B, compute, compute2, generator, \
+    low_16_equals, parse, peeky_generator, puzzle_input
+
+
+def _bin_slices(a, b):
+    return bin(a)[-16:] == bin(b)[-16:]
+
+
+def _one_at_a_time(gen_a, gen_b, pairs, equals):
+    def run():
+        matches = 0
+        for _ in range(pairs):
+            if equals(next(gen_a), next(gen_b)):
+                matches += 1
+        return matches
+    return run
+
+
+if __name__ == '__main__':
+    start_a, start_b = parse(puzzle_input)
+
+    for label, equals in (("bin slices", _bin_slices), ("& 0xFFFF", low_16_equals)):
+        timed(f"40M pairs, generators, {label}",
+              _one_at_a_time(generator(FACTOR_A, DIVIDER, start_a),
+                             generator(FACTOR_B, DIVIDER, start_b), 40_000_000, equals))
+    timed("40M pairs, blocks", lambda: compute(puzzle_input))
+
+    for label, equals in (("bin slices", _bin_slices), ("& 0xFFFF", low_16_equals)):
+        timed(f"5M picky pairs, generators, {label}",
+              _one_at_a_time(peeky_generator(FACTOR_A, DIVIDER, start_a, 4),
+                             peeky_generator(FACTOR_B, DIVIDER, start_b, 8), 5_000_000,
+                             equals))
+    timed("5M picky pairs, blocks", lambda: compute2(puzzle_input))
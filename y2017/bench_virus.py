@@ -0,0 +1,55 @@
+"""Time part 2 of day 22 (10M bursts) on the puzzle input: the same integer
+tables over a dict of (x, y) nodes, over a ChunkedGrid one grid[Point] at a
+time, and holding on to the current tile as process_virus does, for a few
+tile sizes.
+
+    python -m y2017.bench_virus
+"""
+from lib.benchmark import timed
+from lib.point import Point
+from y2017 import day22
+from y2017.day22 import DX, DY, INFECTED, TURNS, UP, parse, process_virus, \
+    puzzle_input
+
+BURSTS = 10_000_000
+SWAPS = (day22.WEAKENED, INFECTED, day22.FLAGGED, day22.CLEAN)
+
+
+def _dict():
+    grid = {(p.x, p.y): value for p, value in parse(puzzle_input).items()}
+    x = y = 0
+    direction = UP
+    infected = 0
+    for _ in range(BURSTS):
+        state = grid.get((x, y), 0)
+        direction = (direction + TURNS[state]) & 3
+        state = SWAPS[state]
+        grid[x, y] = state
+        infected += state == INFECTED
+        x += DX[direction]
+        y += DY[direction]
+    return infected
+
+
+def _points(grid):
+    p = Point(0, 0)
+    direction = UP
+    infected = 0
+    for _ in range(BURSTS):
+        state = grid[p]
+        direction = (direction + TURNS[state]) & 3
+        state = SWAPS[state]
+        grid[p] = state
+        infected += state == INFECTED
+        p = Point(p.x + DX[direction], p.y + DY[direction])
+    return infected
+
+
+if __name__ == '__main__':
+    timed("dict of (x, y)", _dict)
+    grid = parse(puzzle_input)
+    timed("ChunkedGrid, grid[Point]", lambda: _points(grid))
+    print(f"{'':<45} {len(grid.tiles)} tiles of 64x64, bounds {grid.bounds()}")
+    for bits in (4, 6, 8):
+        timed(f"ChunkedGrid, {2 ** bits}x{2 ** bits} tiles held",
+              lambda: process_virus(puzzle_input, BURSTS, SWAPS, bits=bits))
@@ -3,41 +3,35 @@ import unittest
 import sys
 from hamcrest import assert_that, is_
 
+from lib.cycles import brent
+
 
 def compute(data):
-    states, banks = states_to_loop(data)
+    cycle = banks_cycle(data)
 
-    return len(states)
+    return cycle.start + cycle.length
 
 def compute2(data):
-    states, banks = states_to_loop(data)
-
-    return len(states) - states.index(banks)
+    return banks_cycle(data).length
 
 
-def states_to_loop(data):
-    banks = parse(data)
+def banks_cycle(data):
+    return brent(reallocate, tuple(parse(data)))
 
-    states = []
-    while banks not in states:
-        states.append(snapshot(banks))
 
-        cursor = find_bank_with_most_blocks(banks)
-        blocks = banks[cursor]
-        banks[cursor] = 0
+def reallocate(banks):
+    banks = list(banks)
 
-        distribute(blocks, banks, start_after=cursor)
+    cursor = find_bank_with_most_blocks(banks)
+    blocks = banks[cursor]
+    banks[cursor] = 0
 
-    return states, banks
+    return tuple(distribute(blocks, banks, start_after=cursor))
 
 def parse(data):
     return list(int(e) for e in data.split())
 
 
-def snapshot(banks):
-    return banks[:]
-
-
 def find_bank_with_most_blocks(banks):
     return banks.index(max(banks))
 
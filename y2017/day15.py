@@ -1,37 +1,104 @@
+import random
 import re
 import unittest
+from array import array
+from itertools import chain, compress, islice
+from operator import eq
 
 import sys
 from textwrap import dedent
 
 from hamcrest import assert_that, is_
 
+FACTOR_A = 16807
+FACTOR_B = 48271
+DIVIDER = 2147483647
+BLOCK = 4096
+
 
 def compute(data, iterations=40000000):
     starts = parse(data)
 
-    gen_a = generator(factor=16807, divider=2147483647, start=starts[0])
-    gen_b = generator(factor=48271, divider=2147483647, start=starts[1])
+    blocks_a = Blocks(FACTOR_A, starts[0])
+    blocks_b = Blocks(FACTOR_B, starts[1])
 
     matches = 0
-    for _ in range(0, iterations):
-        if low_16_equals(next(gen_a), next(gen_b)):
-            matches += 1
+    for done in range(0, iterations, BLOCK):
+        matches += blocks_a.low_16_matches(next(blocks_a), next(blocks_b),
+                                           min(BLOCK, iterations - done))
 
     return matches
 
+
 def compute2(data, iterations=5000000):
     starts = parse(data)
 
-    gen_a = peeky_generator(factor=16807, divider=2147483647, start=starts[0], multiples_of=4)
-    gen_b = peeky_generator(factor=48271, divider=2147483647, start=starts[1], multiples_of=8)
-
-    matches = 0
-    for _ in range(0, iterations):
-        if low_16_equals(next(gen_a), next(gen_b)):
-            matches += 1
-
-    return matches
+    picky_a = chain.from_iterable(Blocks(FACTOR_A, starts[0]).picky(multiples_of=4))
+    picky_b = chain.from_iterable(Blocks(FACTOR_B, starts[1]).picky(multiples_of=8))
+
+    return sum(map(eq, islice(picky_a, iterations), picky_b))
+
+
+class Blocks:
+    """The values of `generator` by blocks of `size`, packed in one int with
+    64 bits per value, the first value in the first slot (see `unpack`).
+
+    Every value of a block is the one `size` values before times
+    factor ** size, so the next block is one int multiplication of the whole
+    block, then a reduction modulo 2 ** 31 - 1 that only masks, shifts and
+    adds: slot by slot, x % (2 ** 31 - 1) is (x & DIVIDER) + (x >> 31) folded
+    once more. Python does those on the whole int, without a loop per value.
+    """
+
+    def __init__(self, factor, start, size=BLOCK):
+        self.size = size
+        self.ones = self.pack([1] * size)
+        self.dividers = DIVIDER * self.ones
+        self.low_16 = 0xFFFF * self.ones
+        self.step = pow(factor, size, DIVIDER)
+        self.block = self.pack([start * pow(factor, i, DIVIDER) % DIVIDER
+                                for i in range(1, size + 1)])
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        block = self.block
+        products = block * self.step
+        folded = (products & self.dividers) + (products >> 31 & self.dividers)
+        self.block = (folded & self.dividers) + (folded >> 31 & self.ones)
+        return block
+
+    @staticmethod
+    def pack(values):
+        return int.from_bytes(array("Q", values).tobytes(), sys.byteorder)
+
+    def unpack(self, block):
+        return memoryview(block.to_bytes(self.size * 8, sys.byteorder)).cast("Q")
+
+    def low_16_matches(self, a, b, count):
+        """How many of the first `count` slots of `a` and `b` have the same
+        low 16 bits."""
+        if count < self.size:
+            return sum(map(eq, self.unpack(a & self.low_16)[:count],
+                           self.unpack(b & self.low_16)[:count]))
+        # 0xFFFF + anything else than 0 carries into bit 16
+        different = (a ^ b) & self.low_16
+        return count - ((different + self.low_16) >> 16 & self.ones).bit_count()
+
+    def picky(self, multiples_of):
+        """Iterators on the low 16 bits of the values of `peeky_generator`, one
+        per block. Only works for powers of 2 up to 2 ** 16, whose multiples
+        can be told by their low 16 bits."""
+        if multiples_of & (multiples_of - 1) or multiples_of > 2 ** 16:
+            raise ValueError("{} is not a power of 2 up to 2 ** 16".format(multiples_of))
+
+        low_bits = (multiples_of - 1) * self.ones
+        shift = multiples_of.bit_length() - 1
+        for block in self:
+            not_multiple = ((block & low_bits) + low_bits) >> shift & self.ones
+            yield compress(self.unpack(block & self.low_16),
+                           self.unpack(not_multiple ^ self.ones))
 
 
 def generator(factor, divider, start):
@@ -50,9 +117,7 @@ def peeky_generator(factor, divider, start, multiples_of):
 
 
 def low_16_equals(a, b):
-    return bin(a)[-16:] == bin(b)[-16:]
-    # low_16 = 2 ** 16
-    # return a - (a % low_16) == b - (b % low_16)
+    return a & 0xFFFF == b & 0xFFFF
 
 def parse(data):
     return tuple(int(v) for v in re.findall(".*starts with (\d+)$", data, flags=re.MULTILINE))
@@ -79,6 +144,46 @@ class Day2Test(unittest.TestCase):
             Generator B starts with 8921""")
         assert_that(compute2(input), is_(309))
 
+    def test_puzzle(self):
+        assert_that((compute(puzzle_input), compute2(puzzle_input)), is_((573, 294)))
+
+
+class BlocksTest(unittest.TestCase):
+    def test_same_values_as_generator(self):
+        blocks = Blocks(FACTOR_A, 65, size=5)
+        gen = generator(factor=FACTOR_A, divider=DIVIDER, start=65)
+
+        for _ in range(3):
+            assert_that(list(blocks.unpack(next(blocks))), is_([next(gen) for _ in range(5)]))
+
+    def test_matches_same_as_generators(self):
+        rng = random.Random(15)
+        for count in (64, 40, 1):
+            start_a, start_b = rng.randrange(1, DIVIDER), rng.randrange(1, DIVIDER)
+            gen_a = generator(factor=FACTOR_A, divider=DIVIDER, start=start_a)
+            gen_b = generator(factor=FACTOR_B, divider=DIVIDER, start=start_b)
+            # force a few matches in
+            a, b = Blocks(FACTOR_A, start_a, size=64), Blocks(FACTOR_B, start_b, size=64)
+            values_a = [next(gen_a) for _ in range(64)]
+            values_b = [v if i % 3 else (v & ~0xFFFF) | (values_a[i] & 0xFFFF)
+                        for i, v in enumerate(next(gen_b) for _ in range(64))]
+            expected = sum(low_16_equals(x, y) for x, y in zip(values_a[:count], values_b[:count]))
+
+            assert_that(a.low_16_matches(a.pack(values_a), b.pack(values_b), count),
+                        is_(expected))
+
+    def test_picky_same_as_peeky_generator(self):
+        for factor, start, multiples_of in ((FACTOR_A, 65, 4), (FACTOR_B, 8921, 8), (FACTOR_A, 3, 1)):
+            gen = peeky_generator(factor=factor, divider=DIVIDER, start=start,
+                                  multiples_of=multiples_of)
+            picky = chain.from_iterable(Blocks(factor, start, size=100).picky(multiples_of))
+
+            assert_that(list(islice(picky, 1000)), is_([next(gen) & 0xFFFF for _ in range(1000)]))
+
+    def test_picky_needs_a_power_of_2(self):
+        with self.assertRaises(ValueError):
+            next(Blocks(FACTOR_A, 65).picky(3))
+
 
 class ParseTest(unittest.TestCase):
     def test_parse(self):
@@ -1,3 +1,4 @@
+import random
 import unittest
 
 import sys
@@ -5,11 +6,7 @@ from hamcrest import assert_that, is_
 
 
 def compute(data, programs=16):
-    rueda = Rueda(programs)
-
-    dance_a_round(rueda, data)
-
-    return "".join(rueda.dancers)
+    return Dance(parse(data), programs).perform(1)
 
 
 def dance_a_round(rueda, data):
@@ -24,25 +21,66 @@ def dance_a_round(rueda, data):
 
 
 def compute2(data, programs=16, repeats=1000000000):
-    rueda = Rueda(programs)
-
-    known = {}
-    repeat_after = None
-    for i in range(0, repeats):
-        dance_a_round(rueda, data)
-        state = str(rueda)
-        if state in known:
-            repeat_after = i
-            break
-        else:
-            known[state] = i
+    return Dance(parse(data), programs).perform(repeats)
 
-    if repeat_after:
-        rueda = Rueda(programs)
-        for i in range(0, repeats % repeat_after):
-            dance_a_round(rueda, data)
 
-    return "".join(rueda.dancers)
+def parse(data):
+    """Moves as ('s', size), ('x', position, position) and ('p', dancer,
+    dancer), dancers numbered from 0 for 'a'."""
+    moves = []
+    for move in data.split(","):
+        if move[0] == 's':
+            moves.append(('s', int(move[1:])))
+        elif move[0] == 'x':
+            p1, p2 = move[1:].split("/")
+            moves.append(('x', int(p1), int(p2)))
+        elif move[0] == 'p':
+            p1, p2 = move[1:].split("/")
+            moves.append(('p', ord(p1) - ord('a'), ord(p2) - ord('a')))
+    return moves
+
+
+class Dance:
+    """A round of moves as two permutations.
+
+    Spins and exchanges only look at positions and partners only at names,
+    so they commute: a round moves whoever is at `positions[i]` to `i`, and
+    renames dancer `d` to `names[d]`, in any order. Doing that `n` times
+    is both permutations to the power `n`, squared and multiplied in
+    O(log n) compositions.
+    """
+
+    def __init__(self, moves, size):
+        self.size = size
+        self.positions = list(range(size))
+        self.names = list(range(size))
+        for move in moves:
+            if move[0] == 's':
+                split = size - move[1]
+                self.positions = self.positions[split:] + self.positions[:split]
+            elif move[0] == 'x':
+                _, p1, p2 = move
+                self.positions[p1], self.positions[p2] = self.positions[p2], self.positions[p1]
+            else:
+                _, d1, d2 = move
+                i1, i2 = self.names.index(d1), self.names.index(d2)
+                self.names[i1], self.names[i2] = d2, d1
+
+    def perform(self, rounds):
+        positions = power(self.positions, rounds)
+        names = power(self.names, rounds)
+        return "".join(chr(ord('a') + names[p]) for p in positions)
+
+
+def power(permutation, n):
+    """`permutation` composed with itself `n` times."""
+    result = list(range(len(permutation)))
+    while n:
+        if n & 1:
+            result = [permutation[i] for i in result]
+        permutation = [permutation[i] for i in permutation]
+        n >>= 1
+    return result
 
 
 class Rueda:
@@ -91,6 +129,37 @@ class Day2Test(unittest.TestCase):
         input = "s1,s1,s1,s1"
         assert_that(compute2(input, programs=5, repeats=12), is_("cdeab"))
 
+    def test_puzzle(self):
+        assert_that(compute2(puzzle_input), is_("abihnfkojcmegldp"))
+
+    def test_any_repeats(self):
+        assert_that(compute2("s1,x3/4,pe/b", programs=5, repeats=10 ** 18), is_("abcde"))
+
+
+class DanceTest(unittest.TestCase):
+    def test_same_as_rueda(self):
+        rng = random.Random(16)
+        for _ in range(50):
+            size = rng.randrange(2, 17)
+            data = ",".join(self.random_move(rng, size) for _ in range(rng.randrange(1, 30)))
+            rounds = rng.randrange(0, 20)
+
+            rueda = Rueda(size)
+            for _ in range(rounds):
+                dance_a_round(rueda, data)
+
+            assert_that(Dance(parse(data), size).perform(rounds), is_(str(rueda)))
+
+    @staticmethod
+    def random_move(rng, size):
+        kind = rng.choice("sxp")
+        if kind == 's':
+            return "s{}".format(rng.randrange(1, size))
+        a, b = rng.sample(range(size), 2)
+        if kind == 'x':
+            return "x{}/{}".format(a, b)
+        return "p{}/{}".format(chr(ord('a') + a), chr(ord('a') + b))
+
 
 class PopulationTest(unittest.TestCase):
     def setUp(self):
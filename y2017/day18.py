@@ -1,73 +1,31 @@
 import sys
 import unittest
-from collections import defaultdict, deque
 from textwrap import dedent
 
 from hamcrest import assert_that, is_
 
-from y2017.duet import SetValue, AddValue, MultiplyValue, ModValue, JumpOnPositive, Send, Receive, run_program, DONE, WAITING, \
-    STILL_WAITING
-
-
-class CountingDeque(deque):
-    def __init__(self, iterable=(), maxlen=None):
-        self.added = 0
-        super().__init__(iterable, maxlen)
-
-    def append(self, *args, **kwargs):
-        self.added += 1
-        return super().append(*args, **kwargs)
+from lib.machine import State
+from y2017.duet import compile
 
 
 def compute(data):
-    sound_queue = deque()
-    fake_queue = deque()
+    program = compile(data)
 
-    program = run_program(defaultdict(lambda: 0), data, {
-        "snd": Send(sound_queue),
-        "set": SetValue(),
-        "add": AddValue(),
-        "mul": MultiplyValue(),
-        "mod": ModValue(),
-        "rcv": Receive(fake_queue),
-        "jgz": JumpOnPositive(),
-    })
+    program.run()
 
-    while True:
-        state = next(program)
-
-        if state == WAITING:
-            return sound_queue.pop()
+    return program.outbox.pop()
 
 
 def compute2(data):
-    program_0_queue = CountingDeque()
-    program_1_queue = CountingDeque()
-
-    programs = [
-        run_program(defaultdict(lambda: 0, {'p': 0}), data, {
-            "snd": Send(program_1_queue),
-            "set": SetValue(),
-            "add": AddValue(),
-            "mul": MultiplyValue(),
-            "mod": ModValue(),
-            "rcv": Receive(program_0_queue),
-            "jgz": JumpOnPositive(),
-        }),
-        run_program(defaultdict(lambda: 0, {'p': 1}), data, {
-            "snd": Send(program_0_queue),
-            "set": SetValue(),
-            "add": AddValue(),
-            "mul": MultiplyValue(),
-            "mod": ModValue(),
-            "rcv": Receive(program_1_queue),
-            "jgz": JumpOnPositive(),
-        })
-    ]
-
-    while True:
-        if any(next(p) in [DONE, STILL_WAITING] for p in programs):
-            return program_0_queue.added
+    programs = [compile(data, {'p': 0}), compile(data, {'p': 1})]
+    programs[0].outbox = programs[1].inbox
+    programs[1].outbox = programs[0].inbox
+
+    while not all(p.halted or (p.state is State.BLOCKED and not p.inbox) for p in programs):
+        for p in programs:
+            p.run()
+
+    return programs[1].counts["snd"]
 
 
 class DayTest(unittest.TestCase):
@@ -1,6 +1,7 @@
 import unittest
 
 import sys
+from collections import deque
 from textwrap import dedent
 
 from hamcrest import assert_that, is_
@@ -8,6 +9,135 @@ from math import sqrt
 
 
 def compute(data, iterations=5, start=".#...####"):
+    return Art(parse(data)).on_count(start, iterations)
+
+
+def compute2(data):
+    return compute(data, iterations=18)
+
+
+class Art:
+    """Counts the pixels on without drawing the image.
+
+    3 iterations turn a 3x3 block into a 9x9 image, and since 9 splits in
+    3s, into nine 3x3 blocks that go on independently of each other. So
+    the pixels on of a 3x3 block after n + 3 iterations is the sum over
+    those nine blocks after n iterations. Counts go bottom-up, one level
+    of 3 iterations at a time over the blocks reachable from the start,
+    only the first iterations (fewer than 3) being drawn, and only the
+    current level is kept.
+
+    Blocks are ints, one bit per pixel row by row, and rules are looked up
+    by the smallest of the 8 rotations and flips of a block, precomputed
+    for all the 2x2 and 3x3 blocks.
+    """
+
+    def __init__(self, rules):
+        self.canonical = {size: canonical_keys(size) for size in (2, 3)}
+        self.rules = {}
+        for pattern, enhancement in rules.items():
+            size = 2 if len(pattern) == 4 else 3
+            self.rules[size, self.canonical[size][pack(pattern)]] = to_grid(enhancement)
+        self.counts = {}
+        self.children = {}
+
+    def on_count(self, start, iterations):
+        if len(start) != 9:
+            raise ValueError("The image has to start as a 3x3 block")
+        start = self.canonical[3][pack(start)]
+        levels = iterations // 3
+        depths = self._depths(start, levels)
+
+        self.counts = {key: self._drawn_count(key, iterations % 3) for key in depths}
+        for level in range(1, levels + 1):
+            self.counts = {key: sum(self.counts[child] for child in self._children(key))
+                           for key, depth in depths.items() if depth <= levels - level}
+        return self.counts[start]
+
+    def _depths(self, start, levels):
+        """The blocks found within `levels` levels of 3 iterations from
+        `start`, with the fewest levels it takes to find each."""
+        depths = {start: 0}
+        pending = deque([start])
+        while pending:
+            key = pending.popleft()
+            if depths[key] < levels:
+                for child in self._children(key):
+                    if child not in depths:
+                        depths[child] = depths[key] + 1
+                        pending.append(child)
+        return depths
+
+    def _drawn_count(self, key, iterations):
+        grid = to_grid(unpack(key, 9))
+        for _ in range(iterations):
+            grid = self.enhance(grid)
+        return sum(map(sum, grid))
+
+    def _children(self, key):
+        """The canonical keys of the nine 3x3 blocks `key` is in 3
+        iterations."""
+        if key not in self.children:
+            grid = to_grid(unpack(key, 9))
+            for _ in range(3):
+                grid = self.enhance(grid)
+            self.children[key] = [self.canonical[3][pack(block)] for block in blocks(grid, 3)]
+        return self.children[key]
+
+    def enhance(self, grid):
+        size = 2 if len(grid) % 2 == 0 else 3
+        enhanced = [self.rules[size, self.canonical[size][pack(block)]] for block in blocks(grid, size)]
+        return assemble(enhanced, len(grid) // size)
+
+
+def pack(cells):
+    """A block as an int, bit i on when cell i (row by row) is."""
+    return sum(1 << i for i, cell in enumerate(cells) if cell in ("#", 1))
+
+
+def unpack(key, cells):
+    return [key >> i & 1 for i in range(cells)]
+
+
+def to_grid(cells):
+    """Rows of 0 and 1 of a square block given row by row."""
+    cells = [1 if cell in ("#", 1) else 0 for cell in cells]
+    side = int(sqrt(len(cells)))
+    return [cells[row * side:(row + 1) * side] for row in range(side)]
+
+
+def blocks(grid, size):
+    """The size x size blocks of grid, row by row, each flattened."""
+    return [[cell for row in grid[y:y + size] for cell in row[x:x + size]]
+            for y in range(0, len(grid), size)
+            for x in range(0, len(grid), size)]
+
+
+def assemble(grids, per_row):
+    """One grid from square grids laid `per_row` to a row."""
+    return [sum((grid[line] for grid in grids[y:y + per_row]), [])
+            for y in range(0, len(grids), per_row)
+            for line in range(len(grids[0]))]
+
+
+def canonical_keys(size):
+    """For every packed size x size block, the smallest packed block among
+    its 8 rotations and flips."""
+    cells = [(row, col) for row in range(size) for col in range(size)]
+    last = size - 1
+    symmetries = [
+        lambda r, c: (r, c), lambda r, c: (c, last - r),
+        lambda r, c: (last - r, last - c), lambda r, c: (last - c, r),
+        lambda r, c: (r, last - c), lambda r, c: (c, r),
+        lambda r, c: (last - r, c), lambda r, c: (last - c, last - r),
+    ]
+    moves = [[cells.index(symmetry(r, c)) for r, c in cells] for symmetry in symmetries]
+    return [min(sum(1 << to for i, to in enumerate(move) if key >> i & 1) for move in moves)
+            for key in range(1 << size * size)]
+
+
+def _compute_image(data, iterations=5, start=".#...####"):
+    """Draws the whole image, as compute used to."""
     enhancements = {}
     for pattern, enhancement in parse(data).items():
         for variation in variations(pattern):
@@ -24,10 +154,6 @@ def compute(data, iterations=5, start=".#...####"):
     return matrix.count("#")
 
 
-def compute2(data):
-    return compute(data, iterations=18)
-
-
 def split_size(pattern):
     if len(pattern) <= 9:
         return 1
@@ -106,6 +232,41 @@ class DayTest(unittest.TestCase):
     def test_puzzle(self):
         assert_that(compute(puzzle_input), is_(208))
 
+    def test_puzzle2(self):
+        assert_that(compute2(puzzle_input), is_(2480380))
+
+    def test_same_as_drawing_the_image(self):
+        for iterations in range(0, 9):
+            assert_that(compute(puzzle_input, iterations=iterations),
+                        is_(_compute_image(puzzle_input, iterations=iterations)))
+
+
+class ArtTest(unittest.TestCase):
+    def test_canonical_keys(self):
+        keys = canonical_keys(3)
+        variants = {keys[pack(v)] for v in variations(".#...####")}
+
+        assert_that(len(variants), is_(1))
+        assert_that(len(set(keys)), is_(102))
+        assert_that(len(set(canonical_keys(2))), is_(6))
+
+    def test_enhance(self):
+        art = Art(parse(dedent("""\
+            ../.# => ##./#../...
+            .#./..#/### => #..#/..../..../#..#""")))
+
+        grid = art.enhance(to_grid(".#...####"))
+        assert_that(grid, is_(to_grid("#..#........#..#")))
+        assert_that(art.enhance(grid), is_(to_grid("##.##.#..#........##.##.#..#........")))
+
+    def test_memory_stays_flat(self):
+        art = Art(parse(puzzle_input))
+        art.on_count(".#...####", 3000)
+
+        blocks_3x3 = len(set(canonical_keys(3)))
+        assert_that(len(art.children) <= blocks_3x3, is_(True))
+        assert_that(len(art.counts) <= blocks_3x3, is_(True))
+
 
 class ParseTest(unittest.TestCase):
     def test(self):
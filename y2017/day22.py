@@ -1,149 +1,83 @@
 import unittest
 
 import sys
-from enum import Enum
 from textwrap import dedent
 
 from hamcrest import assert_that, is_
 
+from lib.maps import ChunkedGrid
+from lib.point import Point
 
-class Grid:
-    def __init__(self, default_factory=None):
-        self.default_factory = default_factory or (lambda: None)
-        self._offset = 0
-        self._grid = [[self.default_factory()]]
 
-    def apply(self, from_x, from_y, data):
-        for y, line in enumerate(data):
-            for x, e in enumerate(line):
-                self(from_x + x, from_y - y, e)
+CLEAN, WEAKENED, INFECTED, FLAGGED = range(4)
+SYMBOLS = ".W#F"
 
-    def __call__(self, x, y, value=None):
-        expected_x = self._offset + x
-        expected_y = (self._offset - y)
+# directions in clockwise order, y growing down the input
+UP, RIGHT, DOWN, LEFT = range(4)
+DX = (0, 1, 0, -1)
+DY = (-1, 0, 1, 0)
 
-        max_expectation = max(abs(x), abs(y))
-        current_radius = int(len(self._grid) / 2)
-        if max_expectation > current_radius:
-            for i in range(current_radius, max_expectation):
-                for line in self._grid:
-                    line.insert(0, self.default_factory())
-                    line.append(self.default_factory())
-                self._grid.insert(0, list(self.default_factory() for _ in range(0, len(self._grid) + 2)))
-                self._grid.append(list(self.default_factory() for _ in range(0, len(self._grid) + 1)))
-                self._offset += 1
+# clockwise quarter turns for the state of the current node
+TURNS = (-1, 0, 1, 2)
 
-            expected_x = self._offset + x
-            expected_y = (self._offset - y)
 
-        if value is not None:
-            self._grid[expected_y][expected_x] = value
-
-        return self._grid[expected_y][expected_x]
-
-    def to_array(self):
-        return self._grid
-
-
-class Dir(Enum):
-    UP = (0, 1)
-    RIGHT = (1, 0)
-    DOWN = (0, -1)
-    LEFT = (-1, 0)
+def compute(data, bursts=10000):
+    return process_virus(data, bursts, swap_table=(INFECTED, WEAKENED, CLEAN, FLAGGED))
 
 
-X = 0
-Y = 1
+def compute2(data, bursts=10000000):
+    return process_virus(data, bursts, swap_table=(WEAKENED, INFECTED, FLAGGED, CLEAN))
 
 
-def compute(data, bursts=10000):
-    return process_virus(data, bursts,
-                         turn_table={
-                             "#": {
-                                 Dir.UP: Dir.RIGHT,
-                                 Dir.RIGHT: Dir.DOWN,
-                                 Dir.DOWN: Dir.LEFT,
-                                 Dir.LEFT: Dir.UP,
-                             },
-                             ".": {
-                                 Dir.UP: Dir.LEFT,
-                                 Dir.LEFT: Dir.DOWN,
-                                 Dir.DOWN: Dir.RIGHT,
-                                 Dir.RIGHT: Dir.UP,
-                             }
-                         },
-                         swap_table={
-                             "#": ".",
-                             ".": "#"
-                         })
+def process_virus(data, bursts, swap_table, turn_table=TURNS, bits=6):
+    """Bursts infecting, as many as the carrier moves on a node that
+    `swap_table` (indexed by state) turns to INFECTED.
 
+    The carrier keeps the tile of the grid it is on and its position in it,
+    only going through the grid when it steps out of the tile."""
+    grid = parse(data, bits)
+    mask = grid.size - 1
+    # turning and stepping by state and direction, in one lookup
+    moves = [((direction + turn_table[state]) & 3,
+              DX[(direction + turn_table[state]) & 3],
+              DY[(direction + turn_table[state]) & 3])
+             for state in range(4) for direction in range(4)]
+    infecting = [swap_table[state] == INFECTED for state in range(4)]
 
-def compute2(data, bursts=10000000):
-    return process_virus(data, bursts,
-                         turn_table={
-                             "#": {
-                                 Dir.UP: Dir.RIGHT,
-                                 Dir.RIGHT: Dir.DOWN,
-                                 Dir.DOWN: Dir.LEFT,
-                                 Dir.LEFT: Dir.UP,
-                             },
-                             ".": {
-                                 Dir.UP: Dir.LEFT,
-                                 Dir.LEFT: Dir.DOWN,
-                                 Dir.DOWN: Dir.RIGHT,
-                                 Dir.RIGHT: Dir.UP,
-                             },
-                             "W": {
-                                 Dir.UP: Dir.UP,
-                                 Dir.LEFT: Dir.LEFT,
-                                 Dir.DOWN: Dir.DOWN,
-                                 Dir.RIGHT: Dir.RIGHT,
-                             },
-                             "F": {
-                                 Dir.UP: Dir.DOWN,
-                                 Dir.LEFT: Dir.RIGHT,
-                                 Dir.DOWN: Dir.UP,
-                                 Dir.RIGHT: Dir.LEFT,
-                             }
-                         },
-                         swap_table={
-                             ".": "W",
-                             "W": "#",
-                             "#": "F",
-                             "F": ".",
-                         })
-
-
-def process_virus(data, bursts, turn_table, swap_table):
-    grid = parse(data)
-
-    direction = Dir.UP
-    pos = [0, 0]
+    direction = UP
+    tx = ty = 0
+    x = y = 0
+    tile = grid.tile(tx, ty)
 
     infected = 0
-    for i in range(0, bursts):
-        state = grid(*pos)
-        direction = turn_table[state][direction]
-        state = swap_table[state]
-        if state == "#":
-            infected += 1
-
-        grid(*pos, state)
-
-        x, y = direction.value
-        pos[X] += x
-        pos[Y] += y
+    for _ in range(0, bursts):
+        i = y << bits | x
+        state = tile[i]
+        tile[i] = swap_table[state]
+        infected += infecting[state]
+        direction, dx, dy = moves[state << 2 | direction]
+
+        x += dx
+        y += dy
+        if (x | y) & ~mask:
+            tx += x >> bits
+            ty += y >> bits
+            x &= mask
+            y &= mask
+            tile = grid.tile(tx, ty)
 
     return infected
 
 
-def parse(data):
-    raw = [list(line) for line in data.split("\n")]
-    half_size = int(len(raw) / 2)
-    g = Grid(default_factory=lambda: ".")
-    g.apply(-half_size, half_size, raw)
+def parse(data, bits=6):
+    lines = data.split("\n")
+    half_size = len(lines) // 2
+    grid = ChunkedGrid(bits)
+    for y, line in enumerate(lines):
+        for x, symbol in enumerate(line):
+            grid[Point(x - half_size, y - half_size)] = SYMBOLS.index(symbol)
 
-    return g
+    return grid
 
 
 class DayTest(unittest.TestCase):
@@ -188,49 +122,21 @@ class FillMapTest(unittest.TestCase):
             #..
             ..."""))
 
-        assert_that(map.to_array(), is_([
-            ['.', '.', '#'],
-            ['#', '.', '.'],
-            ['.', '.', '.'],
-        ]))
-
-        assert_that(map(0, 0), is_("."))
-        assert_that(map(1, 1), is_("#"))
-        assert_that(map(-1, 0), is_("#"))
-
-
-class GridTest(unittest.TestCase):
-    def test_exansion(self):
-        g = Grid(lambda: '.')
-        g(-1, -1)
-        assert_that(g.to_array(), is_([
-            ['.', '.', '.'],
-            ['.', '.', '.'],
-            ['.', '.', '.'],
-        ]))
-
-    def test_exansion2(self):
-        g = Grid(lambda: '.')
-        g(1, 2)
-        assert_that(g.to_array(), is_([
-            ['.', '.', '.', '.', '.'],
-            ['.', '.', '.', '.', '.'],
-            ['.', '.', '.', '.', '.'],
-            ['.', '.', '.', '.', '.'],
-            ['.', '.', '.', '.', '.'],
-        ]))
-
-    def test_exansion3(self):
-        g = Grid(lambda: '.')
-        g(0, 0, "X")
-        g(2, 2, "X")
-        assert_that(g.to_array(), is_([
-            ['.', '.', '.', '.', 'X'],
-            ['.', '.', '.', '.', '.'],
-            ['.', '.', 'X', '.', '.'],
-            ['.', '.', '.', '.', '.'],
-            ['.', '.', '.', '.', '.'],
-        ]))
+        assert_that(map.render(SYMBOLS), is_("..#\n#.."))
+
+        assert_that(map[Point(0, 0)], is_(CLEAN))
+        assert_that(map[Point(1, -1)], is_(INFECTED))
+        assert_that(map[Point(-1, 0)], is_(INFECTED))
+
+
+class VirusTest(unittest.TestCase):
+    def test_leaves_the_tiles_it_starts_on(self):
+        # goes up 100 nodes, infecting them
+        assert_that(process_virus(".", 100, swap_table=(INFECTED,) * 4, turn_table=(0,) * 4),
+                    is_(100))
+
+    def test_puzzle2(self):
+        assert_that(compute2(puzzle_input), is_(2511722))
 
 
 puzzle_input = """\
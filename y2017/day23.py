@@ -2,45 +2,24 @@ import unittest
 
 import sys
 from hamcrest import assert_that, is_
-from y2017.duet import *
-
-class CountingMultiplyValue(MultiplyValue):
-    def __init__(self):
-        self.call_count = 0
-
-    def __call__(self, registry, target, source):
-        self.call_count += 1
-        super().__call__(registry, target, source)
+from y2017.duet import compile
 
 
 def compute(data):
-    registry = {'a': 0, 'b': 0, 'c': 0, 'd': 0, 'e': 0, 'f': 0, 'g': 0, 'h': 0}
-    mul = CountingMultiplyValue()
-    program = run_program(registry, data, {
-        "set": SetValue(),
-        "sub": SubValue(),
-        "mul": mul,
-        "jnz": JumpOnNonZero(),
-    })
+    program = compile(data, {'a': 0, 'b': 0, 'c': 0, 'd': 0, 'e': 0, 'f': 0, 'g': 0, 'h': 0})
+
+    program.run()
 
-    while next(program) != DONE:
-        pass
+    return program.counts["mul"]
 
-    return mul.call_count
 
 def compute2_prog(data):
-    registry = {'a': 1, 'b': 0, 'c': 0, 'd': 0, 'e': 0, 'f': 0, 'g': 0, 'h': 0}
-    program = run_program(registry, data, {
-        "set": SetValue(),
-        "sub": SubValue(),
-        "mul": MultiplyValue(),
-        "jnz": JumpOnNonZero(),
-    })
-
-    while next(program) != DONE:
-        print(str(registry))
-
-    return registry['h']
+    program = compile(data, {'a': 1, 'b': 0, 'c': 0, 'd': 0, 'e': 0, 'f': 0, 'g': 0, 'h': 0})
+
+    program.run()
+
+    return program['h']
+
 
 def compute2(data):
     not_primes = 0
@@ -1,7 +1,11 @@
+import math
+import random
+import time
 import unittest
 
 import sys
 from collections import defaultdict
+from dataclasses import dataclass
 from textwrap import dedent
 
 from hamcrest import assert_that, is_
@@ -23,19 +27,138 @@ def run_state_machine(states, start):
 
 
 def compute(states, iterations=12208951):
-    state_machine = run_state_machine(states, "A")
-
-    tape = None
-    for i in range(0, iterations):
-        tape = next(state_machine)
-
-    return sum(tape.values())
+    return TuringMachine(states, "A").run(iterations).checksum
 
 
 def compute2(data):
     return 0
 
 
+@dataclass(frozen=True)
+class Run:
+    checksum: int
+    # first and last cells set to 1, from the start position
+    leftmost: int
+    rightmost: int
+    steps: int
+    seconds: float
+
+    @property
+    def steps_per_second(self):
+        return self.steps / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return "checksum {} on [{}, {}], {} steps, {:,.0f} steps/s".format(
+            self.checksum, self.leftmost, self.rightmost, self.steps, self.steps_per_second)
+
+
+class TuringMachine:
+    """Runs `states` ({name: {value: (write, move, next state)}}) on a
+    tape of 0s and 1s, packed 8 cells to a byte of a bytearray that doubles
+    on the side the head runs off.
+
+    The machine moves a byte at a time: what it does from entering a byte
+    in some state until it leaves it only depends on that state, the byte
+    and the side it came in from, so it is worked out once and looked up
+    afterwards. When that leaves the byte on the other side in the same
+    state, it does the same thing again on as many bytes of the same value
+    as follow, which are all rewritten with one slice assignment.
+    """
+
+    def __init__(self, states, start):
+        ids = {name: i for i, name in enumerate(states)}
+        self.cells = [(write, move, ids[next_state])
+                      for name in states
+                      for write, move, next_state in (states[name][0], states[name][1])]
+        # state << 11 | byte << 3 | offset -> (byte, steps, direction out, state)
+        self.macros = [None] * (len(states) << 11)
+
+        self.tape = bytearray(128)
+        self.origin = len(self.tape) // 2 * 8
+        self.block, self.offset = divmod(self.origin, 8)
+        self.state = ids[start]
+
+    def run(self, steps):
+        begin = time.perf_counter()
+        macros, tape = self.macros, self.tape
+        block, offset, state = self.block, self.offset, self.state
+        remaining = steps
+        while remaining:
+            if not 0 <= block < len(tape):
+                block = self._grow(block)
+            value = tape[block]
+            key = state << 11 | value << 3 | offset
+            macro = macros[key] or self._macro(key)
+            written, taken, out, next_state = macro
+            if taken > remaining:
+                tape[block], offset, state = self._steps(state, value, offset, remaining)
+                break
+
+            count = 1
+            if next_state == state and offset == (0 if out > 0 else 7):
+                count = min(self._run_length(block, out, value), remaining // taken)
+            if out > 0:
+                tape[block:block + count] = bytes((written,)) * count
+                block += count
+                offset = 0
+            else:
+                tape[block - count + 1:block + 1] = bytes((written,)) * count
+                block -= count
+                offset = 7
+            state = next_state
+            remaining -= taken * count
+        self.block, self.offset, self.state = block, offset, state
+
+        cells = int.from_bytes(tape, "little")
+        return Run(checksum=cells.bit_count(),
+                   leftmost=(cells & -cells).bit_length() - 1 - self.origin if cells else 0,
+                   rightmost=cells.bit_length() - 1 - self.origin if cells else 0,
+                   steps=steps,
+                   seconds=time.perf_counter() - begin)
+
+    def _steps(self, state, value, offset, steps):
+        """(byte, offset, state) after `steps` steps one cell at a time, not
+        leaving the byte."""
+        for _ in range(steps):
+            write, move, state = self.cells[state * 2 + (value >> offset & 1)]
+            value = value & ~(1 << offset) | write << offset
+            offset += move
+        return value, offset, state
+
+    def _macro(self, key):
+        state, value, offset = key >> 11, key >> 3 & 0xFF, key & 7
+        steps = 0
+        while 0 <= offset < 8:
+            if steps > len(self.macros):
+                # some (state, byte, offset) came back: it never leaves
+                macro = (value, math.inf, 0, state)
+                break
+            write, move, state = self.cells[state * 2 + (value >> offset & 1)]
+            value = value & ~(1 << offset) | write << offset
+            offset += move
+            steps += 1
+        else:
+            macro = (value, steps, 1 if offset > 7 else -1, state)
+        self.macros[key] = macro
+        return macro
+
+    def _run_length(self, block, direction, value):
+        """How many bytes from `block` on in `direction` are `value`."""
+        end = block
+        while 0 <= end < len(self.tape) and self.tape[end] == value:
+            end += direction
+        return abs(end - block)
+
+    def _grow(self, block):
+        size = len(self.tape)
+        if block < 0:
+            self.tape[:0] = bytes(size)
+            self.origin += size * 8
+            return block + size
+        self.tape.extend(bytes(size))
+        return block
+
+
 class DayTest(unittest.TestCase):
     def test_example(self):
         input_raw = dedent("""\
@@ -75,6 +198,51 @@ class DayTest(unittest.TestCase):
 
         assert_that(compute(input, iterations=6), is_(3))
 
+    def test_puzzle(self):
+        assert_that(compute(puzzle_input), is_(4387))
+
+
+class TuringMachineTest(unittest.TestCase):
+    def test_same_as_run_state_machine(self):
+        rng = random.Random(25)
+        for _ in range(200):
+            names = "ABCD"[:rng.randrange(1, 5)]
+            states = {name: {value: (rng.randrange(2), rng.choice((-1, 1)), rng.choice(names))
+                             for value in (0, 1)}
+                      for name in names}
+            steps = rng.randrange(1, 3000)
+
+            machine = run_state_machine(states, "A")
+            for _ in range(steps):
+                tape = next(machine)
+            ones = sorted(position for position, value in tape.items() if value)
+
+            run = TuringMachine(states, "A").run(steps)
+
+            assert_that((run.checksum, run.leftmost, run.rightmost),
+                        is_((len(ones), ones[0], ones[-1]) if ones else (0, 0, 0)))
+
+    def test_sweeps_in_one_go(self):
+        # fills to the right forever
+        machine = TuringMachine({"A": {0: (1, 1, "A"), 1: (1, 1, "A")}}, "A")
+
+        run = machine.run(10 ** 6)
+
+        assert_that((run.checksum, run.leftmost, run.rightmost), is_((10 ** 6, 0, 10 ** 6 - 1)))
+
+    def test_never_leaving_a_byte(self):
+        states = {"A": {0: (1, 1, "B"), 1: (1, 1, "B")}, "B": {0: (0, -1, "A"), 1: (0, -1, "A")}}
+
+        run = TuringMachine(states, "A").run(1001)
+
+        assert_that((run.checksum, run.leftmost, run.rightmost), is_((1, 0, 0)))
+
+    def test_runs_on(self):
+        machine = TuringMachine(puzzle_input, "A")
+        machine.run(1000)
+
+        assert_that(machine.run(2000).checksum, is_(compute(puzzle_input, iterations=3000)))
+
 
 puzzle_input_raw = """\
 Begin in state A.
@@ -171,6 +339,8 @@ if __name__ == '__main__':
     if sys.argv[1] == "2":
         result = compute2(puzzle_input)
     else:
-        result = compute(puzzle_input)
+        run = TuringMachine(puzzle_input, "A").run(12208951)
+        print(run)
+        result = run.checksum
 
     print("Result is {}".format(result))
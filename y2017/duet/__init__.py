@@ -1,227 +1,142 @@
 import unittest
-from collections import defaultdict, deque
 
 from hamcrest import assert_that, is_
 
+from lib.machine import BLOCKED, Machine, State, operation, parse
 
-class Waiting(Exception):
-    pass
 
+@operation("rv")
+def set_value(machine, registers, target, source):
+    registers[target] = registers[source]
 
-class Instruction:
-    pass
 
+@operation("rv")
+def add_value(machine, registers, target, source):
+    registers[target] += registers[source]
 
-class BaseInstructionTest(unittest.TestCase):
-    def setUp(self):
-        self.registry = defaultdict(lambda: 0)
 
+@operation("rv")
+def sub_value(machine, registers, target, source):
+    registers[target] -= registers[source]
 
-class SetValue(Instruction):
-    def __call__(self, registry, target, value):
-        target(value())
 
+@operation("rv")
+def multiply_value(machine, registers, target, source):
+    registers[target] *= registers[source]
 
-class SetValueTest(BaseInstructionTest):
-    def test(self):
-        SetValue()(self.registry, Var(self.registry, "a"), Scalar(1))
-        assert_that(self.registry["a"], is_(1))
 
+@operation("rv")
+def mod_value(machine, registers, target, source):
+    registers[target] %= registers[source]
 
-class AddValue(Instruction):
-    def __call__(self, registry, target, source):
-        target(target() + source())
 
+@operation("vv")
+def jump_on_positive(machine, registers, source, length):
+    if registers[source] > 0:
+        return registers[length]
 
-class AddValueTest(BaseInstructionTest):
-    def test(self):
-        AddValue()(self.registry, Var(self.registry, "a"), Scalar(1))
-        AddValue()(self.registry, Var(self.registry, "a"), Scalar(1))
-        assert_that(self.registry["a"], is_(2))
 
+@operation("vv")
+def jump_on_non_zero(machine, registers, source, length):
+    if registers[source] != 0:
+        return registers[length]
 
-class SubValue(Instruction):
-    def __call__(self, registry, target, source):
-        target(target() - source())
 
+@operation("v")
+def send(machine, registers, source):
+    machine.outbox.append(registers[source])
 
-class SubValueTest(BaseInstructionTest):
-    def test(self):
-        SubValue()(self.registry, Var(self.registry, "a"), Scalar(1))
-        SubValue()(self.registry, Var(self.registry, "a"), Scalar(1))
-        assert_that(self.registry["a"], is_(-2))
 
+@operation("r")
+def receive(machine, registers, target):
+    if not machine.inbox:
+        return BLOCKED
+    registers[target] = machine.inbox.popleft()
 
-class MultiplyValue(Instruction):
-    def __call__(self, registry, target, source):
-        target(target() * source())
 
+INSTRUCTIONS = {
+    "set": set_value,
+    "add": add_value,
+    "sub": sub_value,
+    "mul": multiply_value,
+    "mod": mod_value,
+    "jgz": jump_on_positive,
+    "jnz": jump_on_non_zero,
+    "snd": send,
+    "rcv": receive,
+}
 
-class MultiplyValueTest(BaseInstructionTest):
-    def test(self):
-        self.registry["a"] = 5
-        MultiplyValue()(self.registry, Var(self.registry, "a"), Scalar(5))
-        assert_that(self.registry["a"], is_(25))
 
+def compile(data, registers=None):
+    return Machine(parse(data), INSTRUCTIONS, registers)
 
-class ModValue(Instruction):
-    def __call__(self, registry, target, source):
-        target(target() % source())
 
+def run_line(line, registers=None):
+    machine = compile(line, registers)
+    machine.run()
+    return machine
 
-class ModValueTest(BaseInstructionTest):
-    def test(self):
-        self.registry["a"] = 5
-        ModValue()(self.registry, Var(self.registry, "a"), Scalar(3))
-        assert_that(self.registry["a"], is_(2))
 
+class SetValueTest(unittest.TestCase):
+    def test(self):
+        assert_that(run_line("set a 1")["a"], is_(1))
 
-class JumpOnPositive(Instruction):
-    def __call__(self, registry, source, length):
-        if source() > 0:
-            return length()
 
+class AddValueTest(unittest.TestCase):
+    def test(self):
+        assert_that(run_line("add a 1\nadd a 1")["a"], is_(2))
 
-class JumpOnPositiveTest(BaseInstructionTest):
-    def test_do(self):
-        self.registry["a"] = 5
-        move = JumpOnPositive()(self.registry, Var(self.registry, "a"), Scalar(3))
 
-        assert_that(move, is_(3))
+class SubValueTest(unittest.TestCase):
+    def test(self):
+        assert_that(run_line("sub a 1\nsub a 1")["a"], is_(-2))
 
-    def test_dont(self):
-        self.registry["a"] = 0
-        move = JumpOnPositive()(self.registry, Var(self.registry, "a"), Scalar(3))
 
-        assert_that(move, is_(None))
+class MultiplyValueTest(unittest.TestCase):
+    def test(self):
+        assert_that(run_line("mul a 5", {"a": 5})["a"], is_(25))
 
 
-class JumpOnNonZero(Instruction):
-    def __call__(self, registry, source, length):
-        if source() != 0:
-            return length()
+class ModValueTest(unittest.TestCase):
+    def test(self):
+        assert_that(run_line("mod a 3", {"a": 5})["a"], is_(2))
 
 
-class JumpOnNonZeroTest(BaseInstructionTest):
+class JumpOnPositiveTest(unittest.TestCase):
     def test_do(self):
-        self.registry["a"] = 5
-        move = JumpOnNonZero()(self.registry, Var(self.registry, "a"), Scalar(3))
-
-        assert_that(move, is_(3))
-
-    def test_do_negative(self):
-        self.registry["a"] = -5
-        move = JumpOnNonZero()(self.registry, Var(self.registry, "a"), Scalar(3))
-
-        assert_that(move, is_(3))
+        assert_that(run_line("jgz a 2\nadd b 1", {"a": 5})["b"], is_(0))
 
     def test_dont(self):
-        self.registry["a"] = 0
-        move = JumpOnNonZero()(self.registry, Var(self.registry, "a"), Scalar(3))
+        assert_that(run_line("jgz a 2\nadd b 1", {"a": 0})["b"], is_(1))
 
-        assert_that(move, is_(None))
+    def test_dont_negative(self):
+        assert_that(run_line("jgz a 2\nadd b 1", {"a": -5})["b"], is_(1))
 
 
-class Send(Instruction):
-    def __init__(self, queue):
-        self.queue = queue
-
-    def __call__(self, registry, source):
-        self.queue.append(source())
-
+class JumpOnNonZeroTest(unittest.TestCase):
+    def test_do(self):
+        assert_that(run_line("jnz a 2\nadd b 1", {"a": 5})["b"], is_(0))
 
-class SendTest(BaseInstructionTest):
-    def test(self):
-        queue = deque()
-        Send(queue)(self.registry, Scalar(1))
-        assert_that(queue.popleft(), is_(1))
+    def test_do_negative(self):
+        assert_that(run_line("jnz a 2\nadd b 1", {"a": -5})["b"], is_(0))
 
+    def test_dont(self):
+        assert_that(run_line("jnz a 2\nadd b 1", {"a": 0})["b"], is_(1))
 
-class Receive(Instruction):
-    def __init__(self, queue):
-        self.queue = queue
 
-    def __call__(self, registry, target):
-        try:
-            target(self.queue.popleft())
-        except IndexError as e:
-            raise Waiting from e
+class SendTest(unittest.TestCase):
+    def test(self):
+        assert_that(run_line("snd 1").outbox.popleft(), is_(1))
 
 
-class ReceiveTest(BaseInstructionTest):
+class ReceiveTest(unittest.TestCase):
     def test(self):
-        queue = deque((13,))
-        Receive(queue)(self.registry, Var(self.registry, "a"))
-        assert_that(self.registry["a"], is_(13))
+        machine = compile("rcv a")
+        machine.inbox.append(13)
+        machine.run()
+        assert_that(machine["a"], is_(13))
 
     def test_waiting(self):
-        queue = deque()
-        with self.assertRaises(Waiting):
-            Receive(queue)(self.registry, Var(self.registry, "a"))
-
-
-class Scalar:
-    def __init__(self, value):
-        self.value = value
-
-    def __call__(self):
-        return self.value
-
-
-class Var:
-    def __init__(self, registry, name):
-        self.registry = registry
-        self.name = name
-
-    def __call__(self, value=None):
-        if value is None:
-            return self.registry[self.name]
-        else:
-            self.registry[self.name] = value
-
-
-def parse(registry, val):
-    try:
-        value = int(val)
-    except ValueError:
-        return Var(registry, val)
-
-    return Scalar(value)
-
-
-def compile(registry, instructions, data):
-    def to_line(raw):
-        parts = raw.split(" ")
-        return instructions[parts[0]], [parse(registry, a) for a in parts[1:]]
-
-    lines = [to_line(line) for line in data.split("\n")]
-    return lines
-
-
-def run_program(registry, data, instructions):
-    lines = compile(registry, instructions, data)
-    cursor = 0
-
-    just_waited = False
-    while 0 <= cursor < len(lines):
-        instruction, args = lines[cursor]
-        #print("{} - {}".format(instruction, [e() for e in args]))
-        try:
-            move = instruction(registry, *args)
-            just_waited = False
-            cursor += move if move is not None else 1
-        except Waiting:
-            if just_waited:
-                yield STILL_WAITING
-
-            yield WAITING
-            just_waited = True
-
-        # print(str(registry))
-    while True:
-        yield DONE
-
-
-DONE = "DONE"
-WAITING = "WAITING"
-STILL_WAITING = "STILL_WAITING"
+        machine = compile("rcv a")
+        assert_that(machine.run(), is_(State.BLOCKED))
+        assert_that(machine.run(), is_(State.BLOCKED))
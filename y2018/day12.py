@@ -5,43 +5,46 @@ from textwrap import dedent
 
 from hamcrest import assert_that, is_
 
+from lib.cycles import fast_forward
+
 
 def compute(data):
     return compute_generations(data, 20)
 
 
-
 def compute2(data):
-    return compute_generations(data, 180)
+    return compute_generations(data, 50000000000)
 
 
 def compute_generations(data, generations):
-    check_up = int(generations / 10000000) or 1
     state, mutations = parse(data)
-    origin_index = 0
-    for gen in range(0, generations):
 
-        while not state.startswith("...."):
-            state = "." + state
-            origin_index += 1
+    plants, first = fast_forward(lambda s: generation(s, mutations),
+                                 trim(state, 0), generations,
+                                 key=lambda s: s[0], extrapolate=drift)
+
+    return sum(first + i for i, plant in enumerate(plants) if plant == "#")
+
 
-        while not state.endswith("...."):
-            state += "."
+def generation(state, mutations):
+    plants, first = state
+    padded = f"....{plants}...."
+    new_state = "".join(mutations.get(padded[i - 2:i + 3], ".")
+                        for i in range(2, len(padded) - 2))
+    return trim(new_state, first - 2)
 
-        new_state = []
-        for i in range(2, len(state) - 2):
-            context = state[i - 2:i + 3]
-            try:
-                new_state.append(mutations[context])
-            except KeyError:
-                new_state.append(".")
 
-        print(gen,state, origin_index)
+def trim(plants, first):
+    """Pots from the first to the last plant, and the number of the first."""
+    if "#" not in plants:
+        return "", 0
+    return plants.strip("."), first + plants.index("#")
 
-        state = f"..{''.join(new_state)}.."
 
+def drift(before, after, cycles):
+    """Once the pattern repeats it only slides along the pots."""
+    return before[0], before[1] + cycles * (after[1] - before[1])
 
-    return sum(i - origin_index for i, plant in enumerate(state) if plant == "#")
 
 def parse(data):
     lines = data.split("\n")
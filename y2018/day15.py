@@ -5,9 +5,9 @@ from textwrap import dedent
 from typing import Dict, List, Callable, TypeVar
 
 from hamcrest import assert_that, is_, has_key, not_
-from pypaths import astar
 
-from y2018 import Point, Directions
+from lib.search import bfs
+from y2018 import Point
 
 
 def compute(data):
@@ -81,6 +81,7 @@ class Game:
     keep_going = True
 
     def __post_init__(self):
+        self.width = max(x for x, _ in self.grid) + 1
         for f in self.fighters:
             f.game = self
 
@@ -118,6 +119,14 @@ class Game:
             if pos.tuple() in self.grid:
                 yield pos
 
+    def get_free_neighbors(self, point: Point):
+        for pos in self.get_neighbors(point):
+            if self.grid[pos.tuple()] is None:
+                yield pos
+
+    def key(self, point: Point):
+        return point.y * self.width + point.x
+
     def move(self, fighter, new_pos):
         # print(f"{fighter} moves to {new_pos}")
         self.grid[fighter.pos.tuple()] = None
@@ -170,53 +179,21 @@ class Fighter:
         return False
 
     def move(self):
-        start = self.pos
-
-        def reading_order_cost(current, neighbor):
-            if current == start:
-                try:
-                    if current.direction_to(neighbor) == Directions.UP:
-                        return 1
-                    elif current.direction_to(neighbor) == Directions.LEFT:
-                        return 2
-                    elif current.direction_to(neighbor) == Directions.RIGHT:
-                        return 3
-                    elif current.direction_to(neighbor) == Directions.DOWN:
-                        return 4
-                except ValueError:
-                    pass
-
-            return 10
-
-        targets = []
-        has_an_enemy = False
-        for fighter in self.game.fighters:
-            if fighter.team != self.team:
-                has_an_enemy = True
-
-                def get_free_neighbors(point):
-                    for neighbor in self.game.get_neighbors(point):
-                        if neighbor == fighter.pos or self.game.grid[neighbor.tuple()] is None:
-                            yield neighbor
-
-                find_path = astar.pathfinder(
-                    neighbors=get_free_neighbors,
-                    distance=lambda start, end: start.manhattan_dist(end),
-                    cost=reading_order_cost
-                )
-
-                length, path = find_path(self.pos, fighter.pos)
-                if length is not None:
-                    targets.append((length, path))
-
-        if len(targets) > 0:
-            targets = sorted(targets)
-            length, path = targets[0]
-            self.game.move(self, path[1])
-
-        if not has_an_enemy:
+        enemies = [f for f in self.game.fighters if f.team != self.team]
+        if not enemies:
             raise NoMoreEnemies
 
+        in_range = {n for e in enemies for n in self.game.get_free_neighbors(e.pos)}
+        reachable = bfs(self.pos, self.game.get_free_neighbors, key=self.game.key)
+        reached = [p for p in in_range if p in reachable]
+        if reached:
+            target = min(reached, key=lambda p: (reachable.distance(p), p.y, p.x))
+            steps = list(self.game.get_free_neighbors(self.pos))
+            back = bfs(target, self.game.get_free_neighbors, targets=steps, key=self.game.key)
+            self.game.move(self, min(
+                (p for p in steps if p in back), key=lambda p: (back.distance(p), p.y, p.x)
+            ))
+
         return True
 
     def __str__(self):
@@ -7,26 +7,39 @@ from typing import List, DefaultDict
 
 from hamcrest import assert_that, is_
 
+from lib.machine import Machine, Operation
+
+
+def _op(operands, function):
+    def execute(machine, registers, a, b, c):
+        registers[c] = function(registers, a, b)
+    return Operation(execute, operands)
+
+
 operations = {
-    "addr": lambda registry, a, b, c: registry.set(c, registry[a] + registry[b]),
-    "addi": lambda registry, a, b, c: registry.set(c, registry[a] + b),
-    "mulr": lambda registry, a, b, c: registry.set(c, registry[a] * registry[b]),
-    "muli": lambda registry, a, b, c: registry.set(c, registry[a] * b),
-    "banr": lambda registry, a, b, c: registry.set(c, registry[a] & registry[b]),
-    "bani": lambda registry, a, b, c: registry.set(c, registry[a] & b),
-    "borr": lambda registry, a, b, c: registry.set(c, registry[a] | registry[b]),
-    "bori": lambda registry, a, b, c: registry.set(c, registry[a] | b),
-    "setr": lambda registry, a, b, c: registry.set(c, registry[a]),
-    "seti": lambda registry, a, b, c: registry.set(c, a),
-    "gtir": lambda registry, a, b, c: registry.set(c, 1 if a > registry[b] else 0),
-    "gtri": lambda registry, a, b, c: registry.set(c, 1 if registry[a] > b else 0),
-    "gtrr": lambda registry, a, b, c: registry.set(c, 1 if registry[a] > registry[b] else 0),
-    "eqir": lambda registry, a, b, c: registry.set(c, 1 if a == registry[b] else 0),
-    "eqri": lambda registry, a, b, c: registry.set(c, 1 if registry[a] == b else 0),
-    "eqrr": lambda registry, a, b, c: registry.set(c, 1 if registry[a] == registry[b] else 0)
+    "addr": _op("rrr", lambda registry, a, b: registry[a] + registry[b]),
+    "addi": _op("rir", lambda registry, a, b: registry[a] + b),
+    "mulr": _op("rrr", lambda registry, a, b: registry[a] * registry[b]),
+    "muli": _op("rir", lambda registry, a, b: registry[a] * b),
+    "banr": _op("rrr", lambda registry, a, b: registry[a] & registry[b]),
+    "bani": _op("rir", lambda registry, a, b: registry[a] & b),
+    "borr": _op("rrr", lambda registry, a, b: registry[a] | registry[b]),
+    "bori": _op("rir", lambda registry, a, b: registry[a] | b),
+    "setr": _op("rir", lambda registry, a, b: registry[a]),
+    "seti": _op("iir", lambda registry, a, b: a),
+    "gtir": _op("irr", lambda registry, a, b: 1 if a > registry[b] else 0),
+    "gtri": _op("rir", lambda registry, a, b: 1 if registry[a] > b else 0),
+    "gtrr": _op("rrr", lambda registry, a, b: 1 if registry[a] > registry[b] else 0),
+    "eqir": _op("irr", lambda registry, a, b: 1 if a == registry[b] else 0),
+    "eqri": _op("rir", lambda registry, a, b: 1 if registry[a] == b else 0),
+    "eqrr": _op("rrr", lambda registry, a, b: 1 if registry[a] == registry[b] else 0)
 }
 
 
+def device(program, registers):
+    return Machine(program, operations, dict(enumerate(registers)))
+
+
 def compute(data):
     samples = parse(data)
 
@@ -64,15 +77,11 @@ def compute2(data):
 
     program = [list(map(int, line.split(" "))) for line in input2.split("\n")]
 
-    registry = Registry([0, 0, 0, 0])
+    machine = device([(fixed[opcode], args) for opcode, *args in program], [0, 0, 0, 0])
+    machine.run()
 
-    for line in program:
-        opcode = line[0]
-        args = line[1:]
-        operations[fixed[opcode]](registry, *args)
-
-    print(registry)
-    return registry[0]
+    print(machine.registry)
+    return machine[0]
 
 
 def parse(input):
@@ -94,17 +103,6 @@ class Sample:
     after: List[int]
 
 
-class Registry(dict):
-    def __init__(self, values) -> None:
-        super().__init__({i: value for i, value in enumerate(values)})
-
-    def set(self, registry, value):
-        self[registry] = value
-
-    def to_list(self):
-        return [self[i] for i in range(0, len(self))]
-
-
 class ParseTest(unittest.TestCase):
     def test_parse_samples(self):
         input = dedent("""\
@@ -129,10 +127,10 @@ class ParseTest(unittest.TestCase):
 
 def possible_opcodes(sample):
     possibilities = set()
-    for name, operation in operations.items():
-        registry = Registry(sample.before)
-        operation(registry, *sample.command[1:])
-        if registry.to_list() == sample.after:
+    for name in operations:
+        machine = device([(name, sample.command[1:])], sample.before)
+        machine.run()
+        if [machine[i] for i in range(len(sample.after))] == sample.after:
             possibilities.add(name)
 
     return possibilities
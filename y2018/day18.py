@@ -6,6 +6,7 @@ from textwrap import dedent
 
 from hamcrest import assert_that, is_
 
+from lib.cycles import fast_forward, fingerprint
 from y2018 import Point, group
 
 
@@ -15,13 +16,7 @@ class States(Enum):
     TREES = "|"
 
 def compute(data, iterations):
-    area = parse(data)
-
-    for i in range(0, iterations):
-        if i % 10000 == 0:
-            print(f"At {i / iterations * 100}%")
-        area = {point: next_state(area, point)
-                for point, actual in area.items()}
+    area = fast_forward(next_area, parse(data), iterations, key=landscape)
 
     states = {key: len(list(groups))
             for key, groups in groupby(sorted(area.values(), key=lambda e: e.value))}
@@ -29,6 +24,14 @@ def compute(data, iterations):
     return states[States.TREES] * states[States.LUMBERYARD]
 
 
+def next_area(area):
+    return {point: next_state(area, point) for point in area}
+
+
+def landscape(area):
+    return fingerprint("".join(state.value for state in area.values()))
+
+
 def parse(input):
     area = {}
     for y, line in enumerate(input.split("\n")):
@@ -0,0 +1,92 @@
+"""Steps per second of the compiled Intcode engine against the interpreter,
+and work saved on day 7 part 2 by forking amplifiers instead of rebooting.
+
+    python -m y2019.bench_intcode
+
+The y2019 package turns DEBUG logging on; it is lowered here so the
+interpreter is not measured writing its trace to stderr.
+"""
+import logging
+import time
+from itertools import permutations
+
+from lib.benchmark import throughput
+from y2019 import day07, day09
+from y2019.intcode import Intcode
+
+
+def _boost(method):
+    def run():
+        code = Intcode.from_input(day09.puzzle_input, stdin=[2])
+        getattr(code, method)()
+        return code.steps
+    return run
+
+
+def _amplifiers(method):
+    def run():
+        steps = 0
+        for _ in range(20):
+            runners = [Intcode.from_input(day07.puzzle_input, stdin=[v])
+                       for v in (9, 8, 7, 6, 5)]
+            signal = 0
+            while not runners[-1].is_halted:
+                for runner in runners:
+                    runner.stdin.append(signal)
+                    getattr(runner, method)()
+                    signal = runner.stdout.pop(0)
+            steps += sum(r.steps for r in runners)
+        return steps
+    return run
+
+
+class _TallyIntcode(Intcode):
+    """Counts steps actually executed, across every machine and fork."""
+    executed = 0
+
+    def run(self):
+        before = self.steps
+        super().run()
+        _TallyIntcode.executed += self.steps - before
+
+
+def _rebooting_search():
+    for seq in permutations(range(5, 10)):
+        runners = [_TallyIntcode.from_input(day07.puzzle_input, stdin=[v])
+                   for v in seq]
+        signal = 0
+        while not runners[-1].is_halted:
+            for runner in runners:
+                runner.stdin.append(signal)
+                runner.run()
+                signal = runner.stdout.pop(0)
+        yield seq, signal
+
+
+def _forking_search():
+    boot = _TallyIntcode.from_input(day07.puzzle_input)
+    return day07.search(boot, range(5, 10), feedback=True)
+
+
+def _compare_searches():
+    for label, search in (('reboot per permutation', _rebooting_search),
+                          ('fork shared prefixes', _forking_search)):
+        _TallyIntcode.executed = 0
+        start = time.perf_counter()
+        best = max(signal for _, signal in search())
+        seconds = time.perf_counter() - start
+        print(f'day07 part 2, {label:<25} {_TallyIntcode.executed:10,} steps '
+              f'executed ({seconds:.3f}s, best {best})')
+
+
+def main():
+    logging.getLogger().setLevel(logging.INFO)
+    for method in ('run_interpreted', 'run'):
+        throughput(f'day09 part 2: {method}', _boost(method), unit='steps')
+        throughput(f'day07 feedback loop x20: {method}', _amplifiers(method),
+                   unit='steps')
+    _compare_searches()
+
+
+if __name__ == '__main__':
+    main()
@@ -10,7 +10,11 @@ from y2019.intcode import Intcode
 
 
 def compute(data, noun=12, verb=2):
-    code = Intcode.from_input(data)
+    return run_with(Intcode.from_input(data), noun, verb)
+
+
+def run_with(boot: Intcode, noun, verb):
+    code = boot.fork()
     code[1] = noun
     code[2] = verb
 
@@ -19,9 +23,10 @@ def compute(data, noun=12, verb=2):
 
 
 def compute2(data):
+    boot = Intcode.from_input(data)
     for noun in range(99):
         for verb in range(99):
-            r = compute(data, noun, verb)
+            r = run_with(boot, noun, verb)
             logging.debug(f'testing {noun} {verb} == {r}')
             if r == 19690720:
                 return 100 * noun + verb
@@ -3,7 +3,8 @@ from collections import defaultdict
 
 import pytest
 from hamcrest import assert_that, is_
-from pypaths import astar
+
+from lib.search import bfs
 
 
 def compute(data):
@@ -19,17 +20,16 @@ def compute(data):
     return sum(orbits.values())
 
 def compute2(data):
+    ids = {}
     neighbors = defaultdict(list)
     for l in data.strip().splitlines():
-        obj, sat = l.split(')')
+        obj, sat = (ids.setdefault(name, len(ids)) for name in l.split(')'))
         neighbors[obj].append(sat)
         neighbors[sat].append(obj)
 
-    finder = astar.pathfinder(neighbors=lambda c: neighbors[c], distance=lambda *_: 1, cost=astar.fixed_cost(1))
-
-    length, path = finder('YOU', 'SAN')
+    you, santa = ids['YOU'], ids['SAN']
 
-    return length - 2
+    return bfs(you, neighbors.__getitem__, targets=[santa]).distance(santa) - 2
 
 
 @pytest.mark.parametrize('val,expect', [
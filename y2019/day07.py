@@ -1,54 +1,66 @@
 import sys
-from itertools import permutations
 
 import pytest
 from hamcrest import assert_that, is_
 
 from y2019.intcode import Intcode
+from y2019.network import chain, ring, run_amplifiers
 
 
 def compute(data):
-    signals = []
-    for seq in permutations(list(range(5)), 5):
-        signals.append(pipe(data, seq))
-
-    return max(signals)
+    return max(signal for _, signal in
+               search(Intcode.from_input(data), range(5)))
 
 
 def compute2(data):
-    signals = []
-    for seq in permutations(list(range(5, 10)), 5):
-        signals.append(pipe2(data, seq))
+    return max(signal for _, signal in
+               search(Intcode.from_input(data), range(5, 10), feedback=True))
 
-    return max(signals)
 
+def search(boot: Intcode, phases, feedback=False):
+    """Yield (phase sequence, signal) for every ordering of ``phases``.
 
-def pipe(prog, seq):
-    runners = [Intcode.from_input(prog, stdin=[v])
-               for v in seq]
+    Amplifiers are forked from machines already fed their phase, and the
+    first pass through the chain is shared by all orderings starting with
+    the same phases, so only the diverging part is executed again.
+    """
+    primed = {}
+    for phase in phases:
+        primed[phase] = boot.fork()
+        primed[phase].stdin.append(phase)
+        primed[phase].run()
 
-    signal = 0
-    for runner in runners:
-        runner.stdin.append(signal)
-        runner.run()
-        signal = runner.stdout[0]
+    def visit(seq, amps, signal):
+        if len(seq) == len(primed):
+            yield seq, close_loop(amps, signal) if feedback else signal
+            return
 
-    return signal
+        for phase in primed.keys() - set(seq):
+            amp = primed[phase].fork()
+            amp.stdin.append(signal)
+            amp.run()
+            yield from visit(seq + (phase,), amps + (amp,), amp.stdout.pop(0))
 
+    yield from visit((), (), 0)
 
-def pipe2(prog, seq):
-    runners = [Intcode.from_input(prog, stdin=[v])
-               for v in seq]
 
-    signal = 0
-    while True:
+def close_loop(amps, signal):
+    runners = [amp.fork() for amp in amps]
+    while not runners[-1].is_halted:
         for runner in runners:
             runner.stdin.append(signal)
             runner.run()
             signal = runner.stdout.pop(0)
 
-            if runner.is_halted and runner == runners[4]:
-                return signal
+    return signal
+
+
+def pipe(prog, seq):
+    return run_amplifiers(prog, seq, chain(len(seq))).signal
+
+
+def pipe2(prog, seq):
+    return run_amplifiers(prog, seq, ring(len(seq))).signal
 
 
 @pytest.mark.parametrize('prog,seq,expect', [
@@ -7,6 +7,7 @@ from itertools import combinations
 import pytest
 from hamcrest import assert_that, is_
 
+from lib.cycles import brent
 from y2019.lcm import lcm
 from y2019.point3d import Point3d
 
@@ -19,41 +20,33 @@ def compute(data, steps=1000):
     return sum(moon.energy for moon in moons)
 
 
-def compute2_lcm(data):
-    start = parse(data)
+def compute2(data):
+    """Axes evolve independently, so the system repeats every lcm of their
+    periods. The simulation is reversible: every axis cycles back to its
+    initial state."""
     moons = parse(data)
-    orbits = []
-    orbits_pending = [0, 1, 2, 3]
-
-    steps = 0
-    while True:
-        simulate(moons, 1)
-        steps += 1
-
-        for i in orbits_pending[:]:
-            if start[i] == moons[i]:
-                logging.info(f'Orbit of moon {i} == {steps} steps')
-                orbits.append(steps)
-                orbits_pending.remove(i) # impacting loop
+    periods = []
+    for axis in ['x', 'y', 'z']:
+        cycle = brent(axis_step, axis_state(moons, axis))
+        logging.info(f'Axis {axis} repeats every {cycle.length} steps')
+        periods.append(cycle.length)
 
-        if len(orbits_pending) == 0:
-            break
+    return lcm(*periods)
 
-    return lcm(*orbits)
 
+def axis_state(moons, axis):
+    return tuple(getattr(m.position, axis) for m in moons) + \
+        tuple(getattr(m.velocity, axis) for m in moons)
 
-def compute2(data):
-    start = parse(data)
-    logging.info("".join([f'{s.energy:<10}' for s in start]))
-    moons = parse(data)
 
-    steps = 0
-    while True:
-        simulate(moons, 1)
-        steps += 1
-        if all(s.energy == 0 for s in moons):
-            return steps
-        # logging.info(f"Step {steps}: " + "".join([f'{s.energy:<10}' for s in moons]))
+def axis_step(state):
+    count = len(state) // 2
+    positions, velocities = state[:count], state[count:]
+    velocities = tuple(
+        v + sum((other > p) - (other < p) for other in positions)
+        for p, v in zip(positions, velocities)
+    )
+    return tuple(p + v for p, v in zip(positions, velocities)) + velocities
 
 
 def simulate(moons, steps):
@@ -207,11 +200,11 @@ def test_compute(initial, steps, value):
 
 
 @pytest.mark.parametrize('initial,value', [
-#     ("""\
-# <x=-1, y=0, z=2>
-# <x=2, y=-10, z=-7>
-# <x=4, y=-8, z=8>
-# <x=3, y=5, z=-1>""", 2772),
+    ("""\
+<x=-1, y=0, z=2>
+<x=2, y=-10, z=-7>
+<x=4, y=-8, z=8>
+<x=3, y=5, z=-1>""", 2772),
     ("""\
 <x=-8, y=-10, z=0>
 <x=5, y=5, z=10>
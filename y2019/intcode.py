@@ -1,12 +1,15 @@
 import logging
 from abc import abstractmethod
 from dataclasses import dataclass, field
+from functools import cache
 from inspect import signature
-from typing import List, Mapping, Tuple, Callable, Type, Dict
+from typing import List, Mapping, Tuple, Callable, Type, Dict, Set
 
 import pytest
 from hamcrest import assert_that, is_, greater_than
 
+from y2019.memory import PAGE_MASK, PAGE_SHIFT, PagedMemory
+
 
 @dataclass
 class Parameter:
@@ -51,13 +54,17 @@ class Writer(Parameter):
 
 @dataclass
 class Intcode:
-    state: List[int]
+    state: PagedMemory
     stdin: List[int] = field(default_factory=list)
     stdout: List[int] = field(default_factory=list)
     _index: int = 0
     _relative_base: int = 0
     _operations: Dict[int, Tuple[Callable, List[Type['Parameter']]]] = None
     _is_halted: bool = False
+    _decoded: Dict[int, Callable[[], int]] = field(
+        default=None, compare=False, repr=False)
+    _code_cells: Set[int] = field(default=None, compare=False, repr=False)
+    _steps: int = field(default=0, compare=False, repr=False)
 
     class AwaitingInput(Exception):
         pass
@@ -67,33 +74,144 @@ class Intcode:
         return cls(list(map(int, raw.strip().split(','))), **kwargs)
 
     def __post_init__(self):
+        if not isinstance(self.state, PagedMemory):
+            self.state = PagedMemory(self.state)
         self._operations = {}
+        self._decoded = {}
+        self._code_cells = set()
 
-        for member in dir(self):
-            if member.startswith('op_'):
-                code = int(member.split('_')[1])
-                fn = getattr(self, member)
-                sig = signature(fn)
-                self._operations[code] = (
-                    fn, [p.annotation for p in sig.parameters.values()]
-                )
+        for code, (name, params) in _operation_signatures(type(self)).items():
+            self._operations[code] = (getattr(self, name), params)
 
     def __getitem__(self, item):
-        self._adapt_size(item)
         return self.state[item]
 
     def __setitem__(self, key, value):
-        self._adapt_size(key)
         self.state[key] = value
+        if key in self._code_cells:
+            self._invalidate(key)
+
+    def _invalidate(self, address):
+        self._code_cells.discard(address)
+        for start in range(address - _MAX_LENGTH + 1, address + 1):
+            self._decoded.pop(start, None)
+
+    @property
+    def steps(self):
+        """Instructions executed so far, blocked input reads excluded."""
+        return self._steps
 
-    def _adapt_size(self, index):
-        if index >= len(self.state):
-            self.state += [0 for _ in range(len(self.state), index + 1)]
+    @property
+    def peak_resident_pages(self):
+        return self.state.peak_pages
+
+    def snapshot(self) -> 'IntcodeSnapshot':
+        return IntcodeSnapshot(
+            memory=self.state.fork(),
+            stdin=tuple(self.stdin),
+            stdout=tuple(self.stdout),
+            index=self._index,
+            relative_base=self._relative_base,
+            is_halted=self._is_halted,
+            steps=self._steps,
+        )
+
+    def restore(self, snapshot: 'IntcodeSnapshot'):
+        self.state = snapshot.memory.fork()
+        self.stdin = list(snapshot.stdin)
+        self.stdout = list(snapshot.stdout)
+        self._index = snapshot.index
+        self._relative_base = snapshot.relative_base
+        self._is_halted = snapshot.is_halted
+        self._steps = snapshot.steps
+        self._decoded = {}
+        self._code_cells = set()
+
+    @classmethod
+    def from_snapshot(cls, snapshot: 'IntcodeSnapshot') -> 'Intcode':
+        code = cls([])
+        code.restore(snapshot)
+        return code
+
+    def fork(self) -> 'Intcode':
+        """Independent copy sharing memory pages until either side writes."""
+        return type(self)(
+            self.state.fork(),
+            stdin=list(self.stdin),
+            stdout=list(self.stdout),
+            _index=self._index,
+            _relative_base=self._relative_base,
+            _is_halted=self._is_halted,
+            _steps=self._steps,
+        )
 
     def run(self):
+        """Execute until halted, waiting on an empty stdin or, when stdout
+        reports itself ``full`` (see y2019.network.Channel), on a full stdout.
+
+        Instructions are decoded once into closures cached per address;
+        writes landing on a decoded cell drop the affected entries. Use
+        run_interpreted() to get a DEBUG trace of every step.
+        """
+        if self._is_halted:
+            return
+
+        decoded = self._decoded
+        decode = self._decode
+        index = self._index
+        steps = 0
+        while index >= 0:
+            try:
+                step = decoded[index]
+            except KeyError:
+                step = decode(index)
+            index = step()
+            steps += 1
+
+        self._steps += steps if index == _HALTED else steps - 1
+
+    def _decode(self, index) -> Callable[[], int]:
+        instruction = self[index]
+        opcode = instruction % 100
+        factory, length = _COMPILERS[opcode]
+        params = [self[index + i] for i in range(1, length)]
+        modes = [instruction // (10 ** (2 + i)) % 10 for i in range(length - 1)]
+
+        step = factory(self, index, index + length, *zip(modes, params))
+        self._decoded[index] = step
+        self._code_cells.update(range(index, index + length))
+        return step
+
+    def _reader(self, mode, value) -> Callable[[], int]:
+        if mode == 1:
+            return lambda: value
+
+        pages = self.state.pages
+        if mode == 0:
+            number, offset = value >> PAGE_SHIFT, value & PAGE_MASK
+
+            def read():
+                page = pages.get(number)
+                return 0 if page is None else page[offset]
+            return read
+
+        def read_relative():
+            address = self._relative_base + value
+            page = pages.get(address >> PAGE_SHIFT)
+            return 0 if page is None else page[address & PAGE_MASK]
+        return read_relative
+
+    def _writer(self, mode, value) -> Callable[[int], None]:
+        write = self.__setitem__
+        if mode == 0:
+            return lambda v: write(value, v)
+        return lambda v: write(self._relative_base + value, v)
+
+    def run_interpreted(self):
+        """Reference interpreter, decoding every instruction on each step."""
         try:
             while not self.is_halted:
-                logging.debug(f'i={self._index}; state={self.state}')
+                logging.debug('i=%s; state=%s', self._index, self.state)
                 instruction = self[self._index]
 
                 operation, op_params = self._operations[instruction % 100]
@@ -108,8 +226,10 @@ class Intcode:
                                             val=val,
                                             relative_base=self._relative_base))
 
-                logging.debug(f'  {instruction}: {operation.__name__} :: {",".join(map(str, args))}')
+                logging.debug('  %s: %s :: %s', instruction, operation.__name__,
+                              ','.join(map(str, args)))
                 jump = operation(*args)
+                self._steps += 1
                 if jump is not None:
                     self._index = jump
                 else:
@@ -158,6 +278,146 @@ class Intcode:
         self._index = len(self.state)
 
 
+@dataclass(frozen=True)
+class IntcodeSnapshot:
+    memory: PagedMemory
+    stdin: Tuple[int, ...]
+    stdout: Tuple[int, ...]
+    index: int
+    relative_base: int
+    is_halted: bool
+    steps: int
+
+
+@cache
+def _operation_signatures(cls) -> Dict[int, Tuple[str, List[Type[Parameter]]]]:
+    operations = {}
+    for member in dir(cls):
+        if member.startswith('op_'):
+            code = int(member.split('_')[1])
+            sig = signature(getattr(cls, member))
+            operations[code] = (
+                member, [p.annotation for p in sig.parameters.values()][1:]
+            )
+    return operations
+
+
+# Compiled counterparts of the op_* methods. Each factory receives the
+# machine, the instruction address, the fall-through address and one
+# (mode, raw value) pair per parameter, and returns a closure executing the
+# instruction and returning the next address, or a negative value to stop.
+
+_BLOCKED = -1
+_HALTED = -2
+
+
+def _compile_add(vm, _, after, a, b, target):
+    a, b, target = vm._reader(*a), vm._reader(*b), vm._writer(*target)
+
+    def step():
+        target(a() + b())
+        return after
+    return step
+
+
+def _compile_multiply(vm, _, after, a, b, target):
+    a, b, target = vm._reader(*a), vm._reader(*b), vm._writer(*target)
+
+    def step():
+        target(a() * b())
+        return after
+    return step
+
+
+def _compile_read_input(vm, index, after, target):
+    target = vm._writer(*target)
+
+    def step():
+        if not vm.stdin:
+            vm._index = index
+            return _BLOCKED
+        target(vm.stdin.pop(0))
+        return after
+    return step
+
+
+def _compile_output(vm, index, after, a):
+    a = vm._reader(*a)
+
+    def step():
+        if getattr(vm.stdout, 'full', False):
+            vm._index = index
+            return _BLOCKED
+        vm.stdout.append(a())
+        return after
+    return step
+
+
+def _compile_jump_if_true(vm, _, after, v, jump):
+    v, jump = vm._reader(*v), vm._reader(*jump)
+
+    def step():
+        return jump() if v() != 0 else after
+    return step
+
+
+def _compile_jump_if_false(vm, _, after, v, jump):
+    v, jump = vm._reader(*v), vm._reader(*jump)
+
+    def step():
+        return jump() if v() == 0 else after
+    return step
+
+
+def _compile_less_than(vm, _, after, a, b, target):
+    a, b, target = vm._reader(*a), vm._reader(*b), vm._writer(*target)
+
+    def step():
+        target(1 if a() < b() else 0)
+        return after
+    return step
+
+
+def _compile_equals(vm, _, after, a, b, target):
+    a, b, target = vm._reader(*a), vm._reader(*b), vm._writer(*target)
+
+    def step():
+        target(1 if a() == b() else 0)
+        return after
+    return step
+
+
+def _compile_update_relative_base(vm, _, after, a):
+    a = vm._reader(*a)
+
+    def step():
+        vm._relative_base += a()
+        return after
+    return step
+
+
+def _compile_end(vm, _, __):
+    def step():
+        vm._is_halted = True
+        vm._index = len(vm.state)
+        return _HALTED
+    return step
+
+
+_COMPILERS = {
+    1: (_compile_add, 4),
+    2: (_compile_multiply, 4),
+    3: (_compile_read_input, 2),
+    4: (_compile_output, 2),
+    5: (_compile_jump_if_true, 3),
+    6: (_compile_jump_if_false, 3),
+    7: (_compile_less_than, 4),
+    8: (_compile_equals, 4),
+    9: (_compile_update_relative_base, 2),
+    99: (_compile_end, 1),
+}
+_MAX_LENGTH = max(length for _, length in _COMPILERS.values())
+
 
 @dataclass
 class PositionalReader(Reader):
@@ -299,3 +559,79 @@ def test_output_big_digits():
     code.run()
     assert_that(code.stdout[0], is_(1125899906842624))
 
+
+
+def test_self_modifying_code_is_redecoded():
+    program = [104, 7, 1101, 0, 8, 1, 1006, 17, 16, 1101, 0, 0, 17,
+               1105, 1, 0, 99, 1]
+    code = Intcode(program[:])
+    code.run()
+    assert_that(code.stdout, is_([7, 8]))
+
+
+@pytest.mark.parametrize('program', [
+    [109, 1, 204, -1, 1001, 100, 1, 100, 1008, 100, 16, 101, 1006, 101, 0, 99],
+    [104, 7, 1101, 0, 8, 1, 1006, 17, 16, 1101, 0, 0, 17, 1105, 1, 0, 99, 1],
+    list(map(int, EQUAL_TO_0_JUMP_POS.split(','))),
+])
+def test_compiled_matches_interpreter(program):
+    compiled = Intcode(program[:], stdin=[3])
+    compiled.run()
+    interpreted = Intcode(program[:], stdin=[3])
+    interpreted.run_interpreted()
+
+    assert_that(compiled.stdout, is_(interpreted.stdout))
+    assert_that(compiled.state, is_(interpreted.state))
+    assert_that(compiled.steps, is_(interpreted.steps))
+
+
+def test_high_relative_write_stays_sparse():
+    code = Intcode.from_input('109,1000000000,21101,7,8,0,204,0,99')
+    code.run()
+    assert_that(code.stdout, is_([15]))
+    assert_that(code.peak_resident_pages, is_(2))
+
+
+def test_resumes_after_awaiting_input():
+    code = Intcode.from_input('3,9,4,9,3,9,4,9,99,0')
+    code.run()
+    assert_that(code.steps, is_(0))
+    code.stdin.append(4)
+    code.run()
+    assert_that(code.stdout, is_([4]))
+    code.stdin.append(5)
+    code.run()
+    assert_that(code.stdout, is_([4, 5]))
+    assert_that(code.is_halted, is_(True))
+    assert_that(code.steps, is_(5))
+
+
+def test_fork_is_independent():
+    code = Intcode.from_input('3,11,3,12,1,11,12,13,4,13,99,0,0,0')
+    code.stdin.append(1)
+    code.run()
+
+    other = code.fork()
+    code.stdin.append(2)
+    code.run()
+    other.stdin.append(40)
+    other.run()
+
+    assert_that(code.stdout, is_([3]))
+    assert_that(other.stdout, is_([41]))
+    assert_that(other.steps, is_(code.steps))
+
+
+def test_restore_snapshot():
+    code = Intcode.from_input('3,11,3,12,1,11,12,13,4,13,99,0,0,0', stdin=[1])
+    code.run()
+    snapshot = code.snapshot()
+
+    for second, expected in ((2, 3), (5, 6)):
+        code.restore(snapshot)
+        code.stdin.append(second)
+        code.run()
+        assert_that(code.stdout, is_([expected]))
+        assert_that(code.is_halted, is_(True))
+
+    assert_that(Intcode.from_snapshot(snapshot).is_halted, is_(False))
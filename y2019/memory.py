@@ -0,0 +1,177 @@
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from typing import Dict, Set, Union
+
+import pytest
+from hamcrest import assert_that, is_
+
+PAGE_SHIFT = 10
+PAGE_SIZE = 1 << PAGE_SHIFT
+PAGE_MASK = PAGE_SIZE - 1
+
+Page = Union[array, list]
+
+
+class PagedMemory:
+    """Intcode memory made of fixed-size pages allocated on first write.
+
+    Pages are ``array('q')`` and are swapped for a plain list the first time
+    a value does not fit in 64 bits (or is not an int at all). Reading an
+    address whose page was never written returns 0 without allocating.
+
+    fork() shares every page with the copy; whichever side writes to a shared
+    page first copies it.
+    """
+
+    def __init__(self, image: Iterable[int] = ()):
+        self.pages: Dict[int, Page] = {}
+        self.peak_pages = 0
+        self._size = 0
+        self._owned: Set[int] = set()
+
+        image = list(image)
+        for start in range(0, len(image), PAGE_SIZE):
+            chunk = image[start:start + PAGE_SIZE]
+            chunk += [0] * (PAGE_SIZE - len(chunk))
+            self._store_page(start >> PAGE_SHIFT, _new_page(chunk))
+        self._size = len(image)
+
+    @property
+    def resident_pages(self) -> int:
+        return len(self.pages)
+
+    def __getitem__(self, address: int) -> int:
+        if address < 0:
+            raise IndexError(address)
+        page = self.pages.get(address >> PAGE_SHIFT)
+        if page is None:
+            return 0
+        return page[address & PAGE_MASK]
+
+    def __setitem__(self, address: int, value: int):
+        if address < 0:
+            raise IndexError(address)
+        number = address >> PAGE_SHIFT
+        page = self.pages.get(number)
+        if page is None:
+            page = self._store_page(number, array('q', bytes(8 * PAGE_SIZE)))
+        elif number not in self._owned:
+            page = self._store_page(number, page[:])
+
+        try:
+            page[address & PAGE_MASK] = value
+        except (OverflowError, TypeError):
+            page = self._store_page(number, list(page))
+            page[address & PAGE_MASK] = value
+
+        if address >= self._size:
+            self._size = address + 1
+
+    def _store_page(self, number: int, page: Page) -> Page:
+        self.pages[number] = page
+        self._owned.add(number)
+        self.peak_pages = max(self.peak_pages, len(self.pages))
+        return page
+
+    def fork(self) -> 'PagedMemory':
+        clone = PagedMemory()
+        clone.pages = dict(self.pages)
+        clone.peak_pages = len(clone.pages)
+        clone._size = self._size
+        self._owned = set()
+        return clone
+
+    def __len__(self):
+        """One past the highest address of the image or of any write."""
+        return self._size
+
+    def __iter__(self) -> Iterator[int]:
+        return (self[i] for i in range(self._size))
+
+    def __eq__(self, other):
+        if isinstance(other, PagedMemory):
+            return self._size == other._size and all(
+                self._page_values(number) == other._page_values(number)
+                for number in self.pages.keys() | other.pages.keys())
+        if isinstance(other, Sequence):
+            return self._size == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def _page_values(self, number: int) -> list:
+        page = self.pages.get(number)
+        return [0] * PAGE_SIZE if page is None else list(page)
+
+    def __repr__(self):
+        return f'PagedMemory(size={self._size}, pages={len(self.pages)}, touched={sorted(self.pages)})'
+
+
+def _new_page(values: list) -> Page:
+    try:
+        return array('q', values)
+    except (OverflowError, TypeError):
+        return values
+
+
+def test_untouched_reads_do_not_allocate():
+    memory = PagedMemory([1, 2, 3])
+    assert_that(memory[10 ** 9], is_(0))
+    assert_that(memory.resident_pages, is_(1))
+    assert_that(len(memory), is_(3))
+
+
+def test_high_write_allocates_a_single_page():
+    memory = PagedMemory([1, 2, 3])
+    memory[10 ** 9] = 7
+    assert_that(memory[10 ** 9], is_(7))
+    assert_that(memory.resident_pages, is_(2))
+    assert_that(memory.peak_pages, is_(2))
+    assert_that(len(memory), is_(10 ** 9 + 1))
+
+
+def test_big_values_fall_back_to_python_ints():
+    memory = PagedMemory([2 ** 70, 1])
+    memory[1] = -(2 ** 80)
+    memory[PAGE_SIZE] = 2 ** 64
+    assert_that(memory[0], is_(2 ** 70))
+    assert_that(memory[1], is_(-(2 ** 80)))
+    assert_that(memory[PAGE_SIZE], is_(2 ** 64))
+
+
+def test_compares_like_a_list():
+    memory = PagedMemory([1, 2])
+    memory[3] = 4
+    assert_that(memory, is_([1, 2, 0, 4]))
+
+
+def test_high_write_compares_and_prints_by_page():
+    memory = PagedMemory([1, 2])
+    memory[10 ** 9] = 7
+    other = memory.fork()
+    assert_that(memory == other, is_(True))
+
+    other[10 ** 9 - 1] = 7
+    assert_that(memory == other, is_(False))
+    other[10 ** 9 - 1] = 0
+    assert_that(memory == other, is_(True))
+    assert_that(repr(memory), is_(f'PagedMemory(size={10 ** 9 + 1}, pages=2, '
+                                  f'touched=[0, {10 ** 9 >> PAGE_SHIFT}])'))
+
+
+def test_fork_copies_pages_on_write():
+    memory = PagedMemory([1, 2])
+    clone = memory.fork()
+    assert_that(clone.pages[0], is_(memory.pages[0]))
+
+    clone[0] = 10
+    memory[1] = 20
+    clone[PAGE_SIZE] = 30
+
+    assert_that(memory, is_([1, 20]))
+    assert_that(list(clone)[:2], is_([10, 2]))
+    assert_that(clone[PAGE_SIZE], is_(30))
+    assert_that(memory.resident_pages, is_(1))
+
+
+def test_negative_address():
+    with pytest.raises(IndexError):
+        PagedMemory([1])[-1]
@@ -0,0 +1,193 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import permutations, repeat
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import pytest
+from hamcrest import assert_that, is_, has_properties, contains_exactly
+
+from y2019.intcode import Intcode
+
+Link = Tuple[int, int]
+
+
+class ChannelFull(Exception):
+    pass
+
+
+class Channel:
+    """Bounded FIFO standing in for an Intcode machine's stdin or stdout.
+
+    It offers the ``append``/``pop(0)`` pair the machine uses on lists, and a
+    ``full`` flag the machine checks to block on output instead of writing.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.capacity = capacity
+        self.last: Optional[int] = None
+        self._items = deque()
+
+    @property
+    def full(self) -> bool:
+        return len(self._items) >= self.capacity
+
+    def append(self, value: int):
+        if self.full:
+            raise ChannelFull(value)
+        self._items.append(value)
+        self.last = value
+
+    def pop(self, index: int = 0) -> int:
+        if index != 0:
+            raise IndexError('Channels can only be read from the front')
+        return self._items.popleft()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+
+def chain(size: int) -> List[Link]:
+    return [(i, i + 1) for i in range(size - 1)]
+
+
+def ring(size: int) -> List[Link]:
+    return chain(size) + [(size - 1, 0)]
+
+
+class Network:
+    """Intcode machines wired output-to-input through bounded channels.
+
+    Every machine reads from its own channel; a link (a, b) makes a write to
+    the channel of b. Machines whose output is not linked get a private
+    channel, readable through ``output(i)``.
+    """
+
+    def __init__(self, machines: Sequence[Intcode], links: Iterable[Link],
+                 capacity: int = 64):
+        self.machines = list(machines)
+        inputs = [Channel(capacity) for _ in self.machines]
+        outputs = {}
+        for source, target in links:
+            if source in outputs:
+                raise ValueError(f'Machine {source} already has an output')
+            outputs[source] = inputs[target]
+
+        for i, machine in enumerate(self.machines):
+            machine.stdin = inputs[i]
+            machine.stdout = outputs.get(i, Channel(capacity))
+
+    def feed(self, machine: int, value: int):
+        self.machines[machine].stdin.append(value)
+
+    def output(self, machine: int) -> Channel:
+        return self.machines[machine].stdout
+
+    @property
+    def instructions(self) -> Tuple[int, ...]:
+        return tuple(m.steps for m in self.machines)
+
+    def run(self) -> bool:
+        """Round-robin every machine until it blocks, until none can progress.
+
+        Returns whether every machine halted, False meaning a deadlock.
+        """
+        progress = True
+        while progress:
+            progress = False
+            for machine in self.machines:
+                if machine.is_halted:
+                    continue
+                before = machine.steps
+                machine.run()
+                progress |= machine.steps != before or machine.is_halted
+
+        return all(m.is_halted for m in self.machines)
+
+
+@dataclass(frozen=True)
+class PhaseResult:
+    sequence: Tuple[int, ...]
+    signal: int
+    instructions: Tuple[int, ...]
+
+
+def run_amplifiers(program: str, sequence: Sequence[int],
+                   links: Sequence[Link]) -> PhaseResult:
+    network = Network([Intcode.from_input(program) for _ in sequence], links)
+    for i, phase in enumerate(sequence):
+        network.feed(i, phase)
+    network.feed(0, 0)
+    network.run()
+
+    return PhaseResult(tuple(sequence), network.output(len(sequence) - 1).last,
+                       network.instructions)
+
+
+def best_phase_setting(program: str, phases: Sequence[int],
+                       links: Sequence[Link],
+                       workers: Optional[int] = None) -> PhaseResult:
+    """Evaluate every ordering of ``phases``, spread over a process pool.
+
+    ``workers=1`` evaluates in this process.
+    """
+    sequences = list(permutations(phases))
+    args = (repeat(program), sequences, repeat(links))
+    if workers == 1:
+        results = map(run_amplifiers, *args)
+        return max(results, key=lambda r: r.signal)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(run_amplifiers, *args, chunksize=8)
+        return max(results, key=lambda r: r.signal)
+
+
+FEEDBACK_EXAMPLE = '3,26,1001,26,-4,26,3,27,1002,27,2,27,1,27,26,27,4,27,' \
+                   '1001,28,-1,28,1005,28,6,99,0,0,5'
+
+
+def test_channel_is_bounded():
+    channel = Channel(capacity=2)
+    channel.append(1)
+    channel.append(2)
+    assert_that(channel.full, is_(True))
+    with pytest.raises(ChannelFull):
+        channel.append(3)
+    assert_that(channel.pop(0), is_(1))
+    assert_that(channel.last, is_(2))
+
+
+def test_machine_blocks_on_full_output():
+    network = Network([Intcode.from_input('104,1,104,2,104,3,99')], [],
+                      capacity=2)
+    assert_that(network.run(), is_(False))
+    assert_that(list(network.output(0)), is_([1, 2]))
+
+    network.output(0).pop(0)
+    assert_that(network.run(), is_(True))
+    assert_that(list(network.output(0)), is_([2, 3]))
+    assert_that(network.instructions, is_((4,)))
+
+
+@pytest.mark.parametrize('program,links,sequence,signal', [
+    ('3,15,3,16,1002,16,10,16,1,16,15,15,4,15,99,0,0', chain(5),
+     (4, 3, 2, 1, 0), 43210),
+    (FEEDBACK_EXAMPLE, ring(5), (9, 8, 7, 6, 5), 139629729),
+])
+def test_run_amplifiers(program, links, sequence, signal):
+    assert_that(run_amplifiers(program, sequence, links),
+                has_properties(signal=signal, sequence=sequence))
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_best_phase_setting(workers):
+    result = best_phase_setting(FEEDBACK_EXAMPLE, range(5, 10), ring(5),
+                                workers=workers)
+    assert_that(result, has_properties(
+        sequence=(9, 8, 7, 6, 5),
+        signal=139629729,
+        instructions=contains_exactly(*[33] * 5),
+    ))
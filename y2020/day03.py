@@ -4,12 +4,12 @@ from functools import reduce, partial
 import pytest
 from hamcrest import assert_that, is_, has_entries
 
-from lib.maps import Map
+from lib.maps import DenseGrid
 from lib.point import Point
 
 TREE = '#'
 def compute(data):
-    field = Map.from_input(data, [TREE])
+    field = DenseGrid.from_input(data, [TREE])
 
     return check_slope(field)
 
@@ -19,13 +19,13 @@ def check_slope(field, move_x = 3, move_y = 1):
     x = 0
     for y in range(move_y, field.rect.height, move_y):
         x = (x + move_x) % field.rect.width
-        if field.features.get(Point(x, y)) == TREE:
+        if field.get(Point(x, y)) == TREE:
             trees += 1
     return trees
 
 
 def compute2(data):
-    field = Map.from_input(data, [TREE])
+    field = DenseGrid.from_input(data, [TREE])
     return reduce((lambda x, y: x * y),
                   map(
                       lambda e: check_slope(field, e[0], e[1]), [
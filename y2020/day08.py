@@ -1,132 +1,81 @@
-import dataclasses
-import re
 import sys
-from abc import ABC, ABCMeta
 from dataclasses import dataclass
-from typing import ClassVar, List, Mapping, Pattern, Type
+from typing import List
 
 import pytest
 from hamcrest import assert_that, has_properties, is_
 
+from lib.machine import Line, Machine, State, operation, parse
 
-@dataclass(frozen=True)
-class Registry(metaclass=ABCMeta):
-    cursor: int = 0
-    accumulator: int = 0
-
-
-@dataclass(frozen=True)
-class Line():
-    def __call__(self, registry: Registry) -> Registry:
-        return dataclasses.replace(registry, cursor=registry.cursor + 1)
-
-    @classmethod
-    def from_args(cls, args: str):
-        return cls()
-
-
-@dataclass(frozen=True)
-class IntArg(Line, ABC):
-    amount: int
-    parser: ClassVar[Pattern] = re.compile(r'^\+?(-?\d+)$')
-
-    @classmethod
-    def from_args(cls, args: str):
-        return cls(int(cls.parser.match(args).group()))
+ACCUMULATOR = 0
+"""Slot of the accumulator, the only register of the handheld."""
 
 
-@dataclass(frozen=True)
-class Nop(IntArg):
+@operation("i")
+def nop(machine, registers, amount):
     """Do nothing."""
 
 
-@dataclass(frozen=True)
-class Acc(IntArg):
-    def __call__(self, registry: Registry) -> Registry:
-        return dataclasses.replace(
-            super().__call__(registry),
-            accumulator=registry.accumulator + self.amount,
-        )
+@operation("i")
+def acc(machine, registers, amount):
+    registers[ACCUMULATOR] += amount
 
 
-@dataclass(frozen=True)
-class Jmp(IntArg):
-    def __call__(self, registry: Registry) -> Registry:
-        return dataclasses.replace(
-            registry, cursor=registry.cursor + self.amount,
-        )
+@operation("i")
+def jmp(machine, registers, amount):
+    return amount
 
 
-default_instructions: Mapping[str, Type[Line]] = {
-    'nop': Nop,
-    'acc': Acc,
-    'jmp': Jmp,
+default_instructions = {
+    'nop': nop,
+    'acc': acc,
+    'jmp': jmp,
 }
 
 
-@dataclass(frozen=True)
-class Code:
-    lines: List[Line]
-
-    @classmethod
-    def compile(cls, data, instructions=default_instructions):
-        return cls([
-            instructions[op].from_args(args)
-            for op, args in map(lambda e: e.split(' ', maxsplit=1),
-                                data.strip().splitlines())
-        ])
-
-
-def run(code: Code, registry_factory=Registry):
-    registry = registry_factory()
-    while True:
-        registry = code.lines[registry.cursor](registry)
-        yield registry
+def boot(lines: List[Line], instructions=default_instructions) -> Machine:
+    return Machine(lines, instructions, {'accumulator': 0})
 
 
 def compute(data):
-    code = Code.compile(data)
-
     try:
-        run_without_loop(code)
+        run_without_loop(parse(data))
     except InfiniteLoop as e:
-        return e.regitry.accumulator
+        return e.machine['accumulator']
 
 
 @dataclass(frozen=True)
 class InfiniteLoop(Exception):
-    regitry: Registry
+    machine: Machine
 
 
-def run_without_loop(code: Code):
-    visited_lines = set()
-    for registry in iter(run(code)):
-        if registry.cursor in visited_lines:
-            raise InfiniteLoop(registry)
-        elif registry.cursor >= len(code.lines):
-            return registry
+def run_without_loop(lines: List[Line]) -> Machine:
+    machine = boot(lines)
+    while machine.step() is not State.HALTED:
+        if machine.hits[machine.pc]:
+            raise InfiniteLoop(machine)
 
-        visited_lines.add(registry.cursor)
+    return machine
 
 
 def compute2(data):
-    code = Code.compile(data)
-
-    for i, line in enumerate(code.lines):
-        new_lines = code.lines[:]
-        if isinstance(line, Nop) and line.amount != 0:
-            new_lines[i] = Jmp(line.amount)
-        elif isinstance(line, Jmp):
-            new_lines[i] = Nop(0)
+    lines = parse(data)
+
+    for i, (op, args) in enumerate(lines):
+        new_lines = lines[:]
+        if op == 'nop' and int(args[0]) != 0:
+            new_lines[i] = ('jmp', args)
+        elif op == 'jmp':
+            new_lines[i] = ('nop', ['0'])
         else:
             continue
 
         try:
-            registry = run_without_loop(Code(new_lines))
+            machine = run_without_loop(new_lines)
         except InfiniteLoop:
             pass
         else:
-            return registry.accumulator
+            return machine['accumulator']
 
 
 @pytest.mark.parametrize('val,expect', [
@@ -138,29 +87,32 @@ acc +1
 acc -99
 jmp +4
 jmp -20
-""", Code([
-        Nop(0),
-        Nop(-10),
-        Nop(+10),
-        Acc(1),
-        Acc(-99),
-        Jmp(4),
-        Jmp(-20),
-    ]))
+""", [
+        ('nop', ['+0']),
+        ('nop', ['-10']),
+        ('nop', ['+10']),
+        ('acc', ['+1']),
+        ('acc', ['-99']),
+        ('jmp', ['+4']),
+        ('jmp', ['-20']),
+    ])
 ])
 def test_compile(val, expect):
-    assert_that(Code.compile(val), is_(expect))
+    assert_that(parse(val), is_(expect))
 
 
-@pytest.mark.parametrize('instruction,registry,matches', [
-    (Nop(123), Registry(), has_properties(cursor=1, accumulator=0)),
-    (Acc(1), Registry(), has_properties(cursor=1, accumulator=1)),
-    (Acc(-1), Registry(), has_properties(cursor=1, accumulator=-1)),
-    (Jmp(2), Registry(), has_properties(cursor=2, accumulator=0)),
-    (Jmp(-2), Registry(), has_properties(cursor=-2, accumulator=0)),
+@pytest.mark.parametrize('line,pc,accumulator', [
+    ('nop +123', 1, 0),
+    ('acc +1', 1, 1),
+    ('acc -1', 1, -1),
+    ('jmp +2', 2, 0),
+    ('jmp -2', -2, 0),
 ])
-def test_instructions(instruction, registry, matches):
-    assert_that(instruction(registry), matches)
+def test_instructions(line, pc, accumulator):
+    machine = boot(parse(line))
+    machine.step()
+    assert_that(machine, has_properties(pc=pc))
+    assert_that(machine['accumulator'], is_(accumulator))
 
 
 @pytest.mark.parametrize('val,expect', [
@@ -1,54 +1,53 @@
 import dataclasses
 import sys
 from functools import partial
-from typing import Iterator, Iterable
+from typing import Sequence
 
 import pytest
 from hamcrest import assert_that, is_
 
-from lib.maps import Map
+from lib.maps import DenseGrid
 from lib.point import Point, Directions
 
+SEAT = ord('L')
+OCCUPIED = ord('#')
 
-def close_neighbors(area, point):
-    return point.extended_neighbors
 
+def close_neighbors(area: DenseGrid) -> Sequence[Sequence[int]]:
+    return area.neighbor_table(Directions)
 
-def evolve(area: Map, point: Point, lookup: Iterable[Point], vacancy_trigger=4):
-    current = area.features.get(point, '.')
-    neighbors = ''.join(
-        area.features.get(p, '.') for
-        p in lookup
-    )
 
-    if current == 'L' and neighbors.count('#') == 0:
-        return '#'
-    elif current == '#' and neighbors.count('#') >= vacancy_trigger:
-        return 'L'
+def evolve(area: DenseGrid, index: int, lookup: Sequence[int], vacancy_trigger=4):
+    cells = area.cells
+    current = cells[index]
+    occupied = sum(1 for i in lookup if cells[i] == OCCUPIED)
+
+    if current == SEAT and occupied == 0:
+        return OCCUPIED
+    elif current == OCCUPIED and occupied >= vacancy_trigger:
+        return SEAT
     else:
         return current
 
 
 def compute(data, neighbors_fn=close_neighbors, evolve_fn=evolve):
     area = None
-    new_area = Map.from_input(data, features=['L'])
+    new_area = DenseGrid.from_input(data, features=['L'])
 
-    neighbors_cache = {}
-    for p in new_area.features.keys():
-        neighbors_cache[p] = neighbors_fn(new_area, p)
+    neighbors_cache = neighbors_fn(new_area)
+    seats = [i for i, c in enumerate(new_area.cells) if c]
 
     while area != new_area:
         area = new_area
 
         evolver = partial(evolve_fn, area)
-        new_features = {
-            point: evolver(point, neighbors_cache[point])
-            for point in area.features.keys()
-        }
+        new_cells = bytearray(area.cells)
+        for index in seats:
+            new_cells[index] = evolver(index, neighbors_cache[index])
 
-        new_area = dataclasses.replace(area, features=new_features)
+        new_area = dataclasses.replace(area, cells=new_cells)
 
-    return sum(1 for v in new_area.features.values() if v == '#')
+    return new_area.cells.count(OCCUPIED)
 
 
 def compute2(data):
@@ -57,23 +56,36 @@ def compute2(data):
                    evolve_fn=partial(evolve, vacancy_trigger=5))
 
 
-def raytraced_neighbors(area, point):
-    neighbors = []
-    for direction in Directions:
-        edge = area.rect.find_edge(point, direction)
-        first = first_point(area, point.raytrace(edge))
-        if first is not None:
-            neighbors.append(first)
-        elif edge != point and area.features.get(edge) is not None:
-            neighbors.append(edge)
+def raytraced_neighbors(area: DenseGrid) -> Sequence[Sequence[int]]:
+    stride, cells = area.stride, area.cells
+    rows = len(cells) // stride
+
+    table = []
+    for index, content in enumerate(cells):
+        neighbors = []
+        if content:
+            y, x = divmod(index, stride)
+            for direction in Directions:
+                seen = first_seat(cells, stride, rows, x, y, direction)
+                if seen is not None:
+                    neighbors.append(seen)
+        table.append(neighbors)
+
+    return table
+
 
-    return neighbors
+def first_seat(cells, stride, rows, x, y, direction: Point):
+    x, y = x + direction.x, y + direction.y
+    while 0 <= x < stride and 0 <= y < rows:
+        if cells[y * stride + x]:
+            return y * stride + x
+        x, y = x + direction.x, y + direction.y
 
 
-def first_point(area: Map, raytracing: Iterator[Point]):
-    for point in raytracing:
-        if area.features.get(point) is not None:
-            return point
+def _evolve_symbol(area: DenseGrid, point: Point, table, vacancy_trigger=4):
+    index = area.index(point)
+    result = evolve(area, index, table[index], vacancy_trigger=vacancy_trigger)
+    return chr(result) if result else '.'
 
 
 @pytest.mark.parametrize('val,expect', [
@@ -109,10 +121,10 @@ LLL
 """, "L"),
 ])
 def test_evolve(val, expect):
-    area = Map.from_input(val, features=['L', '#'])
+    area = DenseGrid.from_input(val, features=['L', '#'])
     point = Point(1, 1)
-    lookup = close_neighbors(area, point)
-    assert_that(evolve(area, point, lookup), is_(expect))
+    table = close_neighbors(area)
+    assert_that(_evolve_symbol(area, point, table), is_(expect))
 
 
 @pytest.mark.parametrize('val,expect', [
@@ -206,10 +218,11 @@ LLLLL
 """, "L"),
 ])
 def test_raytracing(val, expect):
-    area = Map.from_input(val, features=['L', '#'])
+    area = DenseGrid.from_input(val, features=['L', '#'])
     point = Point(2, 2)
-    lookup = raytraced_neighbors(area, point)
-    assert_that(evolve(area, point, lookup, vacancy_trigger=5), is_(expect))
+    table = raytraced_neighbors(area)
+    assert_that(_evolve_symbol(area, point, table, vacancy_trigger=5),
+                is_(expect))
 
 
 @pytest.mark.parametrize('val,expect', [
@@ -4,9 +4,10 @@ from collections import defaultdict
 import pytest
 from hamcrest import assert_that, is_
 
-from lib.profiling import reporting
+from lib.profiling import profiled, sampled
 
 
+@profiled
 def compute(data, turns=2020):
     return play_the_game(data, turns)[0]
 
@@ -19,7 +20,7 @@ def play_the_game(data, turns):
         last_called[n].insert(0, i + 1)
     last_turn_num = numbers[-1]
 
-    for i in reporting(range(i + 2, turns + 1), every=10000):
+    for i in sampled(range(i + 2, turns + 1), "turns"):
         if len(last_called[last_turn_num]) == 1:
             last_turn_num = 0
         else:
@@ -31,6 +32,7 @@ def play_the_game(data, turns):
     return last_turn_num, last_called
 
 
+@profiled
 def compute2(data, turns=30000000):
     return play_the_game(data, turns)[0]
 
@@ -9,7 +9,7 @@ import pytest
 import sys
 from hamcrest import assert_that, has_properties, is_
 
-from lib.maps import Map
+from lib.maps import DenseGrid
 from lib.point import Directions, Point
 from lib.rectangle import Rectangle
 
@@ -25,13 +25,13 @@ BORDERS = {
 class Image:
     number: int
     borders: Tuple[str]
-    data: Map
+    data: DenseGrid
 
     @classmethod
     def from_raw(cls, raw: str) -> 'Image':
         title, content = raw.split('\n', maxsplit=1)
         number = re.match(r'^Tile (\d+):$', title).group(1)
-        image_data = Map.from_input(content, features=('#', '.'))
+        image_data = DenseGrid.from_input(content, features=('#', '.'))
 
         borders = []
         for att_a, att_b in BORDERS.values():
@@ -72,23 +72,23 @@ def compute(data):
     return reduce(mul, corners, 1)
 
 
+def _rows(data: DenseGrid):
+    stride = data.stride
+    return [data.cells[i:i + stride] for i in range(0, len(data.cells), stride)]
+
+
 def flip(image):
-    new_features = {
-        Point(p.x, image.data.rect.height - p.y): v
-        for p, v in image.data.features.items()
-    }
+    rows = _rows(image.data)
+    new_cells = bytearray().join(reversed(rows))
 
-    return replace(image, data=replace(image.data, features=new_features))
+    return replace(image, data=replace(image.data, cells=new_cells))
 
 
 def rot(image):
-    new_features = {
-        p + Point(image.data.rect.width - p.x - p.y,
-                  image.data.rect.height - p.y - image.data.rect.width + p.x): v
-        for p, v in image.data.features.items()
-    }
+    rows = _rows(image.data)
+    new_cells = bytearray(c for column in zip(*reversed(rows)) for c in column)
 
-    return replace(image, data=replace(image.data, features=new_features))
+    return replace(image, data=replace(image.data, cells=new_cells))
 
 
 transforms = [
@@ -111,7 +111,7 @@ def all_transforms(image) -> Generator[Image, None, None]:
         yield new_image
 
 
-SERPENT = Map.from_input("""\
+SERPENT = DenseGrid.from_input("""\
                   # 
 #    ##    ##    ###
  #  #  #  #  #  #   """, features=('#',))
@@ -141,14 +141,14 @@ def compute2(data):
     for version in all_transforms(final_image):
         rough = remove_serpents(version, serpent)
 
-        if rough != version.data.features:
-            return sum(1 for f in rough.values() if f == '#')
+        if rough != version.data:
+            return rough.cells.count(ord('#'))
 
     return None
 
 
 def remove_serpents(version, serpent):
-    rough = version.data.features.copy()
+    rough = version.data.copy()
     for y in range(version.data.rect.height - serpent.rect.height - 1):
         for x in range(version.data.rect.width - serpent.rect.width - 1):
             offset = Point(x, y)
@@ -171,9 +171,9 @@ def get_final_image(full_map, height, width):
                                        y * chunks_size + i_y - 1)
                     # print(writing_at)
                     image_parts[writing_at] = img.data[Point(i_x, i_y)]
-    final_image = Image(0, tuple(), Map(image_parts,
-                                        Rectangle.by_size(chunks_size * width,
-                                                          chunks_size * height)))
+    final_image = Image(0, tuple(), DenseGrid.from_features(
+        image_parts,
+        Rectangle.by_size(chunks_size * width, chunks_size * height)))
     return final_image
 
 
@@ -4,9 +4,10 @@ from hamcrest import assert_that, is_
 from itertools import chain
 
 from lib.circle import Circle
-from lib.profiling import reporting
+from lib.profiling import profiled, sampled
 
 
+@profiled
 def compute(data, moves=100):
     circle = Circle.from_iterable(map(int, data))
 
@@ -21,7 +22,7 @@ def play_game(circle, moves):
     lowest = min(all_elements)
     highest = max(all_elements)
 
-    for _ in reporting(range(moves), every=10000):
+    for _ in sampled(range(moves), "moves"):
         current = circle.current
         circle.turn_cw()
         pickup = [circle.pop() for _ in range(3)]
@@ -40,6 +41,7 @@ def play_game(circle, moves):
         circle.seek(current).turn_cw()
 
 
+@profiled
 def compute2(data):
     numbers = list(map(int, data))
     circle = Circle.from_iterable(chain(numbers,
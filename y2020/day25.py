@@ -2,15 +2,15 @@ import pytest
 import sys
 from hamcrest import assert_that, is_
 
-from lib.profiling import reporting
+from lib.profiling import profiled, sampled
 
 
+@profiled
 def compute(data, public_key_root=7):
     public_keys = set(map(int, data.strip().splitlines()))
 
     secret_loops = {}
-    for loops, number in reporting(enumerate(transform(public_key_root)),
-                                   every=1000):
+    for loops, number in sampled(enumerate(transform(public_key_root)), "loops"):
         if number in public_keys:
             print(f'Found {number}')
             secret_loops[number] = loops
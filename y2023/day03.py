@@ -11,7 +11,7 @@ from typing import Optional
 import pytest
 from hamcrest import assert_that, is_, contains_exactly, any_of
 
-from lib.maps import Map
+from lib.maps import DenseGrid
 from lib.point import Point
 from lib.rectangle import Rectangle
 
@@ -20,7 +20,7 @@ puzzle_input = Path(__file__.replace(".py", ".txt")).read_text()
 
 def compute(data: str) -> int | str:
     symbols = re.findall("[^0-9.\n]", data.strip())
-    symbol_map = Map.from_input(data, symbols)
+    symbol_map = DenseGrid.from_input(data, symbols)
 
     part_numbers = extract_numbers(data)
     pn_with_symbols = filter(partial(has_adjacent_symbol, symbol_map), part_numbers)
@@ -28,7 +28,7 @@ def compute(data: str) -> int | str:
 
 
 def compute2(data: str) -> int | str:
-    symbol_map = Map.from_input(data, "*")
+    symbol_map = DenseGrid.from_input(data, "*")
 
     gears = defaultdict(list)
     for part_number in extract_numbers(data):
@@ -63,7 +63,7 @@ def extract_numbers(raw: str) -> Iterable[PartNumber]:
 
 
 def get_adjacent_symbol_point(
-    symbol_map: Map, part_number: PartNumber
+    symbol_map: DenseGrid, part_number: PartNumber
 ) -> Optional[Point]:
     rect = part_number.location.expand()
     for point in (
@@ -82,7 +82,7 @@ def get_adjacent_symbol_point(
     return None
 
 
-def has_adjacent_symbol(symbol_map: Map, part_number: PartNumber) -> bool:
+def has_adjacent_symbol(symbol_map: DenseGrid, part_number: PartNumber) -> bool:
     return get_adjacent_symbol_point(symbol_map, part_number) is not None
 
 
@@ -126,7 +126,9 @@ def test_extract_numbers(raw: str, expected: set[PartNumber]):
     ids=str,
 )
 def test_adjacency(symbols: Sequence[Point], expected: bool):
-    symbols_map = Map(features={p: "*" for p in symbols}, rect=Rectangle(0, 0, 0, 0))
+    symbols_map = DenseGrid.from_features(
+        {p: "*" for p in symbols}, rect=Rectangle.by_size(6, 4)
+    )
     part_number = PartNumber(number=12, location=Rectangle(2, 3, 2, 2))
 
     assert_that(has_adjacent_symbol(symbols_map, part_number), is_(expected))
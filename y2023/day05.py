@@ -1,6 +1,6 @@
 from dataclasses import dataclass
-from functools import reduce, partial
-from itertools import batched, count
+from functools import cached_property, reduce, partial
+from itertools import batched
 from typing import Sequence, Iterable, Generator
 
 import sys
@@ -10,6 +10,8 @@ from textwrap import dedent
 import pytest
 from hamcrest import assert_that, is_
 
+from lib.intervals import IntervalSet, PiecewiseShift
+
 puzzle_input = Path(__file__.replace(".py", ".txt")).read_text()
 
 
@@ -24,23 +26,9 @@ def compute(data: str) -> int | str:
 
 def compute2(data: str) -> int | str:
     almanac = parse_almanac(data)
-
-    # Get from location instead of from seed
-
-    valid_seed_ranges = list(seed_ranges(almanac.seeds))
-
-    reversed_mappers = [
-        RangeMapper(
-            ranges=frozenset({MapRange(r.dest, r.src, r.length) for r in mapper.ranges})
-        )
-        for mapper in reversed(almanac.mappers)
-    ]
-    seed_from_location = partial(map_value, reversed_mappers)
-
-    for location in count():
-        final_seed = seed_from_location(location)
-        if any(final_seed in rng for rng in valid_seed_ranges):
-            return location
+    seeds = IntervalSet((r.src, r.src + r.length) for r in seed_ranges(almanac.seeds))
+    locations = reduce(lambda current, mapper: mapper.shift.map(current), almanac.mappers, seeds)
+    return locations.min
 
 
 @dataclass(frozen=True)
@@ -63,6 +51,12 @@ class RangeMapper:
                 return range.dest + item - range.src
         return item
 
+    @cached_property
+    def shift(self) -> PiecewiseShift:
+        return PiecewiseShift(
+            tuple((r.src, r.src + r.length, r.dest - r.src) for r in self.ranges)
+        )
+
 
 @dataclass(frozen=True)
 class Almanac:
@@ -7,7 +7,7 @@ from types import MappingProxyType
 import pytest
 from hamcrest import assert_that, is_
 
-from lib.maps import Map
+from lib.maps import DenseGrid
 from lib.point import Point
 from lib.rectangle import Rectangle
 
@@ -26,7 +26,7 @@ _PIPE_ENDS = MappingProxyType(
 
 
 def compute(data: str) -> int | str:
-    pipe_map = Map.from_input(data, features=["S", *_PIPE_ENDS.keys()])
+    pipe_map = DenseGrid.from_input(data, features=["S", *_PIPE_ENDS.keys()])
     path = _get_loop(pipe_map)
 
     return int(len(path) / 2)
@@ -35,7 +35,7 @@ def compute(data: str) -> int | str:
 
 
 def compute2(data: str) -> int | str:
-    pipe_map = Map.from_input(data, features=["S", *_PIPE_ENDS.keys()])
+    pipe_map = DenseGrid.from_input(data, features=["S", *_PIPE_ENDS.keys()])
     path = _get_loop(pipe_map)
 
     main_loop = set(path)
@@ -67,7 +67,7 @@ def _get_loop(pipe_map) -> Sequence[Point]:
     return path
 
 
-def get_any_connection(pipe_map: Map, start: Point) -> Point:
+def get_any_connection(pipe_map: DenseGrid, start: Point) -> Point:
     for neighbor in start.neighbors:
         if pipe := pipe_map.get(neighbor):
             if any(neighbor + pipe_end == start for pipe_end in _PIPE_ENDS[pipe]):
@@ -98,7 +98,7 @@ def get_any_connection(pipe_map: Map, start: Point) -> Point:
 def test_get_any_connection(
     features: Mapping[Point, str], start: Point, expected: Point
 ):
-    pipe_map = Map(features=features, rect=Rectangle(0, 0, 0, 0))
+    pipe_map = DenseGrid.from_features(features, rect=Rectangle.by_size(4, 4))
     assert_that(get_any_connection(pipe_map, start), is_(expected))
 
 